@@ -1,8 +1,11 @@
-import requests
 from abc import ABC, abstractmethod
+from coza.api import ratelimit, transport
 from .exception import ExchangeAPIException
 
 
+THROTTLE_RETRIES = 3
+
+
 def private_api(func):
 	def check_keys(self, *args, **kwargs):
 		assert (self.api_key and self.secret_key), "This API requires valid api_key and secret_key"
@@ -17,8 +20,16 @@ class BaseAPIWrapper(ABC):
 		self.secret_key = secret_key
 
 	def request(self, method, endpoint, **kwargs):
-		req = self.prepare_request(method, endpoint, **kwargs)
-		resp = session = requests.Session().send(req)
+		limiter = ratelimit.limiter(self.exchange)
+		group, priority = self.get_rate_group(method, endpoint, **kwargs)
+		for attempt in range(THROTTLE_RETRIES + 1):
+			limiter.acquire(group, priority)
+			# prepared again on each attempt, for a fresh nonce
+			req = self.prepare_request(method, endpoint, **kwargs)
+			resp = transport.session().send(req)
+			if not self.is_throttled(resp):
+				break
+			limiter.throttle(group)
 
 		if resp.status_code == 405:
 			raise ExchangeAPIException(self.exchange, req, resp, resp.status_code, 'Coinone Server Error')
@@ -27,6 +38,15 @@ class BaseAPIWrapper(ABC):
 		else:
 			return resp
 
+	def get_rate_group(self, method, endpoint, **kwargs):
+		"""
+			return: tuple : endpoint group and priority of the request, see coza.api.ratelimit
+		"""
+		return 'default', ratelimit.DATA
+
+	def is_throttled(self, resp):
+		return resp.status_code == 429
+
 	@abstractmethod
 	def prepare_request(self, method, endpoint, **kwargs):
 		raise NotImplementedError
@@ -7,6 +7,7 @@ import base64
 import time
 import math
 
+from coza.api import ratelimit
 from .base import BaseAPIWrapper, private_api
 from .exception import ExchangeAPIException
 
@@ -120,16 +121,30 @@ class CoinoneAPIWrapper(BaseAPIWrapper):
 		try:
 			data = resp.json()
 			return int(data.get('errorCode')) == 0
-		except Exception as e:
+		except Exception:
 			return json.loads(resp.content.decode('utf-8').replace('“','"').replace('”','"')).get("errorCode") == 0
 
 	def get_error_message(self, resp):
 		try:
 			data = resp.json()
 			return self.error_messages.get(str(data.get('errorCode')))
-		except Exception as e:
+		except Exception:
 			return self.error_messages.get(json.loads(resp.content.decode('utf-8').replace('“','"').replace('”','"')).get("errorCode"))
 
+	def get_rate_group(self, method, endpoint, **kwargs):
+		group = 'private' if kwargs.get('private', True) else 'public'
+		if endpoint in ('v2/order/limit_buy/', 'v2/order/limit_sell/', 'v2/order/cancel/'):
+			return group, ratelimit.ORDER
+		return group, ratelimit.DATA
+
+	def is_throttled(self, resp):
+		if resp.status_code == 429:
+			return True
+		try:
+			return str(resp.json().get('errorCode')) == '429'
+		except Exception:
+			return False
+
 	def get_ticker(self, currency, *args, **kwargs):
 		endpoint = 'ticker/'
 		resp = self.request('GET', endpoint, additional_params={
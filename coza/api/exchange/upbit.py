@@ -1,4 +1,3 @@
-import requests
 import time
 import jwt
 import re
@@ -7,11 +6,19 @@ import pandas as pd
 from collections import defaultdict
 from urllib.parse import urlencode
 from datetime import datetime
+from coza.api import ratelimit, transport
+
+
+THROTTLE_RETRIES = 3
+# orders of a page of the order lists
+ORDER_PAGE = 100
 
 
 class UpbitAPI:
 
     host = 'https://api.upbit.com/v1/'
+    # endpoint group of (method, endpoint), learned from the Remaining-Req headers
+    _groups = dict()
 
     def __init__(self, api_key=None, secret_key=None):
         self.exchange='upbit'
@@ -20,24 +27,67 @@ class UpbitAPI:
 
     def request(self, method, endpoint, **kwargs):
         """
+        Requests are paced by the token bucket of their endpoint group, which
+        follows the Remaining-Req headers. A request rejected with 429 is sent
+        again when it is not signed.
 
         Args:
+            method(str): HTTP method.
+            endpoint(str): path after host, with its query.
 
         Returns:
-
+            requests.Response
         """
-        try:
-            resp = requests.request(method, self.host + endpoint, **kwargs)
-
-            if resp.status_code < 400:
-                return resp
-            else:
-                print(resp.status_code)
-        except Exception as e:
-            print(e)
+        limiter = ratelimit.limiter(self.exchange)
+        group = self.get_group(method, endpoint)
+        priority = ratelimit.ORDER if method in ('POST', 'DELETE') else ratelimit.DATA
+        resp = None
+        for attempt in range(THROTTLE_RETRIES + 1):
+            limiter.acquire(group, priority)
+            try:
+                resp = transport.session().request(method, self.host + endpoint, **kwargs)
+
+                self.observe_remain_req(method, endpoint, resp.headers)
+                if resp.status_code < 400:
+                    return resp
+                else:
+                    print(resp.status_code)
+            except Exception as e:
+                print(e)
+
+            if resp is None or resp.status_code != 429 or 'headers' in kwargs:
+                break
+            limiter.throttle(group)
 
         return resp
 
+    def get_group(self, method, endpoint):
+        """
+            return: str : endpoint group of the request, as named by the Remaining-Req header
+        """
+        root = endpoint.split('?')[0].split('/')[0]
+        group = self._groups.get((method, root))
+        if group is not None:
+            return group
+        if root in ('orders', 'order') and method in ('POST', 'DELETE'):
+            return 'order'
+        if root in ('accounts', 'orders', 'order', 'deposits', 'withdraws'):
+            return 'default'
+        return root
+
+    def observe_remain_req(self, method, endpoint, headers):
+        remain_req = self.get_remain_req(headers)
+        if 'error' in remain_req or 'group' not in remain_req:
+            return
+
+        root = endpoint.split('?')[0].split('/')[0]
+        self._groups[(method, root)] = remain_req['group']
+        limiter = ratelimit.limiter(self.exchange)
+        if isinstance(remain_req.get('sec'), int):
+            limiter.observe(remain_req['group'], remain_req['sec'])
+        if remain_req.get('min') == 0:
+            limiter.throttle(remain_req['group'], 60 - time.time() % 60)
+
     def get_remain_req(self, headers):
         """
 
@@ -49,7 +99,7 @@ class UpbitAPI:
         remain_req = {}
         try:
             for i in headers['Remaining-Req'].split(';'):
-                k, v = i.split('=')
+                k, v = i.strip().split('=')
                 remain_req[k] = int(v) if re.match('[0-9]+', v) else v
         except KeyError as e:
             return dict(error=e)
@@ -173,6 +223,40 @@ class UpbitAPI:
         return data
 
 
+    # 주문 일괄 조회
+    def get_orders(self, order_ids, states=('wait', 'done', 'cancel'), page=1, order_by='desc'):
+        """
+        Args:
+            order_ids(list): uuids of the orders, at most ORDER_PAGE.
+            states(tuple): states of the orders returned.
+
+        Returns:
+            dict: orders by uuid.
+        """
+        query = urlencode(
+            [('uuids[]', order_id) for order_id in order_ids] +
+            [('states[]', state) for state in states] +
+            [('page', page), ('order_by', order_by)])
+
+        endpoint = 'orders?'
+        data = {}
+        try:
+            resp = self.request(
+                method='GET',
+                endpoint=endpoint + query,
+                headers={'Authorization': self.get_token(query=query)},
+            )
+            data = dict()
+            for i in resp.json():
+                data[i.get('uuid')] = i
+            data['remain_req'] = self.get_remain_req(resp.headers)
+        except Exception as e:
+            print(e)
+            data = dict(error=e)
+
+        return data
+
+
     # 주문하기
     def get_order(self, market_id, side, volume, price, ord_type='limit'):
         """
@@ -293,6 +377,29 @@ class UpbitAPI:
         return data
 
 
+    def get_orderbooks(self, market_ids):
+        endpoint = 'orderbook'
+        query = {'markets': ','.join(market_ids)}
+        try:
+            resp = self.request(method='GET', endpoint=endpoint, params=query)
+            orderbooks = dict()
+            for market in resp.json():
+                dump = defaultdict(list)
+                for i in market['orderbook_units']:
+                    for k, v in i.items():
+                        dump[k.replace('size', 'quantity')].append(v)
+                orderbooks[market['market']] = pd.DataFrame(dump)
+
+            data = dict(
+                orderbooks = orderbooks,
+                remain_req = self.get_remain_req(resp.headers)
+            )
+        except Exception as e:
+            return dict(error=e)
+
+        return data
+
+
     def get_candle(self, currency, fiat, interval, end_date=None, period=200):
         minutes = {1, 3, 5, 10, 15, 30, 60, 240}
         if end_date is not None:
@@ -3,6 +3,7 @@ import time
 import base64
 import requests
 
+from coza.api import transport
 from coza.config import COZA_SECRET, COZA_HOST
 from coza.errors import CozaRequestException
 
@@ -27,7 +28,7 @@ def _request(url, method, user_uuid, **kwargs):
     try_cnt = 0
     while try_cnt != 5:
         try:
-            resp = requests.Session().send(req)
+            resp = transport.session().send(req)
             if resp.status_code >= 400:
                 raise CozaRequestException(req, resp)
             return resp.json()
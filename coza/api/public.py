@@ -3,6 +3,7 @@ import requests
 import datetime
 import pandas as pd
 
+from coza.api import transport
 from coza.config import COZA_HOST
 from coza.utils import now
 from coza.errors import (CozaRequestException, CozaCurrencyException, CozaExchangeException)
@@ -18,7 +19,7 @@ def _request(url, method, **kwargs):
     try_cnt = 0
     while try_cnt != 5:
         try:
-            resp = requests.Session().send(req)
+            resp = transport.session().send(req)
             if resp.status_code >= 400:
                 raise CozaRequestException(req, resp)
             return resp.json()
@@ -0,0 +1,126 @@
+import threading
+import time
+
+
+# priorities: orders go before the other requests of their group
+ORDER = 0
+DATA = 1
+
+THROTTLE_SECONDS = 1.0
+
+RATES = {
+    # requests per second by endpoint group, as reported by the Remaining-Req headers
+    'upbit': dict(order=8, default=30, market=10, candles=10, ticker=10, orderbook=10, trades=10),
+    'coinone': dict(public=5, private=10),
+}
+DEFAULT_RATE = 10
+
+_limiters = dict()
+_lock = threading.Lock()
+
+
+class TokenBucket(object):
+    """Token bucket pacing the requests of one endpoint group.
+
+    A request takes a token; tokens come back at `rate` per second, up to
+    `capacity`. The exchange may report fewer remaining requests than the
+    bucket holds (observe) or reject a request (throttle), in which case the
+    bucket is drained accordingly.
+
+    Args:
+        rate(float): requests per second.
+        capacity(float): burst size, defaults to `rate`.
+    """
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity or rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._cond = threading.Condition()
+        self._waiting = [0, 0]
+
+    def _refill(self):
+        t = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (t - self.updated) * self.rate)
+        self.updated = t
+
+    def acquire(self, priority=DATA):
+        """Block until a request of `priority` may be sent."""
+        with self._cond:
+            self._waiting[priority] += 1
+            try:
+                while True:
+                    self._refill()
+                    ahead = any(self._waiting[:priority])
+                    if not ahead and self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    # with a request of higher priority waiting, wait for it to take its token
+                    self._cond.wait((1 - self.tokens) / self.rate if self.tokens < 1 else None)
+            finally:
+                self._waiting[priority] -= 1
+                self._cond.notify_all()
+
+    def observe(self, remaining):
+        """Keep no more tokens than the requests the exchange still accepts."""
+        with self._cond:
+            self._refill()
+            self.tokens = min(self.tokens, remaining)
+
+    def throttle(self, seconds=THROTTLE_SECONDS):
+        """Send nothing for `seconds`, e.g. after a 429 response."""
+        with self._cond:
+            self._refill()
+            self.tokens = min(self.tokens, 1 - self.rate * seconds)
+
+
+class RateLimiter(object):
+    """Token buckets of the endpoint groups of an exchange.
+
+    Args:
+        rates(dict): requests per second by group.
+        default_rate(float): rate of the groups missing from `rates`.
+    """
+    def __init__(self, rates=None, default_rate=DEFAULT_RATE):
+        self.rates = dict(rates or {})
+        self.default_rate = default_rate
+        self.buckets = dict()
+        self._lock = threading.Lock()
+
+    def bucket(self, group):
+        with self._lock:
+            bucket = self.buckets.get(group)
+            if bucket is None:
+                bucket = self.buckets[group] = TokenBucket(self.rates.get(group, self.default_rate))
+            return bucket
+
+    def acquire(self, group, priority=DATA):
+        self.bucket(group).acquire(priority)
+
+    def observe(self, group, remaining):
+        self.bucket(group).observe(remaining)
+
+    def throttle(self, group, seconds=THROTTLE_SECONDS):
+        self.bucket(group).throttle(seconds)
+
+
+def configure(exchange, default_rate=DEFAULT_RATE, **rates):
+    """Set the request rates of an exchange, e.g. configure('coinone', public=3, private=6).
+
+    Args:
+        exchange(str): exchange name.
+        default_rate(float): rate of the groups missing from `rates`.
+        rates: requests per second by endpoint group.
+    """
+    with _lock:
+        _limiters[exchange] = RateLimiter(dict(RATES.get(exchange, {}), **rates), default_rate)
+
+
+def limiter(exchange):
+    """
+        return: RateLimiter : limiter shared by the API clients of `exchange` in the process
+    """
+    with _lock:
+        if exchange not in _limiters:
+            _limiters[exchange] = RateLimiter(RATES.get(exchange), DEFAULT_RATE)
+        return _limiters[exchange]
@@ -0,0 +1,55 @@
+import threading
+import requests
+
+from requests.adapters import HTTPAdapter
+
+
+POOL_CONNECTIONS = 10
+POOL_MAXSIZE = 10
+
+_config = dict(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE, pool_block=False, hosts={})
+_session = None
+_lock = threading.Lock()
+
+
+def configure(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE, pool_block=False, hosts=None):
+    """Set up the connection pools shared by the COZA and exchange API clients.
+
+    Args:
+        pool_connections(int): number of hosts whose connections are kept alive.
+        pool_maxsize(int): connections kept alive per host.
+        pool_block(bool): if True, requests wait for a free connection instead of
+            opening one beyond pool_maxsize.
+        hosts(dict): connections per host prefix, e.g. {'https://api.upbit.com/': 4}.
+            These limits always block.
+    """
+    global _session
+    with _lock:
+        _config.update(pool_connections=pool_connections, pool_maxsize=pool_maxsize, pool_block=pool_block,
+                       hosts=dict(hosts or {}))
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def session():
+    """
+        return: requests.Session : session of the process, keeping its connections alive
+    """
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                _session = _make_session()
+    return _session
+
+
+def _make_session():
+    s = requests.Session()
+    adapter = HTTPAdapter(pool_connections=_config['pool_connections'], pool_maxsize=_config['pool_maxsize'],
+                          pool_block=_config['pool_block'])
+    s.mount('https://', adapter)
+    s.mount('http://', adapter)
+    for prefix, maxsize in _config['hosts'].items():
+        s.mount(prefix, HTTPAdapter(pool_connections=1, pool_maxsize=maxsize, pool_block=True))
+    return s
@@ -104,6 +104,7 @@ class BacktestContext(Context):
                     currency_list=trade_info['currency'], interval_list=trade_info['interval'],
                     fiat=trade_info['fiat'], slippage_rate=slippage_rate, use_data=self.use_data,
                     data_path=self.data_path)
+                self.exchanges[exchange].set_warmup(trade_info.get('warmup'))
                 return self.backtest(self.exchanges[exchange])
             else:
                 return dict(result=False, msg=f'입력한 거래소 {exchange}가 Context Trade Info에 없습니다.')
@@ -220,4 +221,10 @@ class BacktestContext(Context):
     def clear_balance(self, exchange):
         return self.exchanges[exchange].clear_balance()
 
+    def get_timeframes(self, exchange):
+        return self.exchanges[exchange].get_timeframes()
+
+    def get_features(self, exchange, candle):
+        return self.exchanges[exchange].get_features(candle)
+
 
@@ -1,4 +1,5 @@
 from apscheduler.schedulers.blocking import BlockingScheduler
+from concurrent.futures import ThreadPoolExecutor
 from coza.errors import InputValueValidException
 from coza.objects import Context
 from coza.logger import logger
@@ -23,6 +24,8 @@ class BotContext(Context):
         self.context = dict()
         self.exchanges = dict()
         self.running_stat = 't'
+        self.pipeline = ThreadPoolExecutor(max_workers=2)
+        self.reporting = None
         self.api_key = api_key
         self.secret_key = secret_key
 
@@ -101,6 +104,11 @@ class BotContext(Context):
             logger.debug(f"지원하지 않는 거래소 입니다. {self.exchange}")
             self._exit(msg=f'지원하지 않는 거래소 입니다. {self.exchange}')
 
+        self.exchanges[self.exchange].set_warmup(trade_info.get('warmup'))
+        self.exchanges[self.exchange].set_max_rows(trade_info.get('max_rows'))
+        self.exchanges[self.exchange].set_market_data_ttl(trade_info.get('market_data_ttl'))
+        if trade_info.get('feed') and use_data == 'LIVE':
+            self.exchanges[self.exchange].start_feed()
         self.exchanges[self.exchange].init_dataframe()
         self.run_strategy(
             self, is_update=self.exchanges[self.exchange].is_update, trade_info=self.context['trade_info'],
@@ -110,9 +118,21 @@ class BotContext(Context):
             self.exchanges[self.exchange].is_update[curr_inter] = True
 
 
-    def run(self):
+    def run(self, runtime='scheduler'):
+        """Trade at every minute.
+
+        Args:
+            runtime(str): 'scheduler' runs each tick from an APScheduler
+                cron job, 'asyncio' runs them on coza.runtime.AsyncRuntime.
+        """
         logger.debug('Start trade')
-        
+
+        if runtime == 'asyncio':
+            from coza.runtime import AsyncRuntime
+            return AsyncRuntime(self).run()
+        elif runtime != 'scheduler':
+            raise InputValueValidException(msg='at run', runtime=runtime)
+
         sched = BlockingScheduler()
         sched.add_job(func=self._trade,
                       trigger='cron',
@@ -123,12 +143,52 @@ class BotContext(Context):
 
 
     def _trade(self):
+        """One tick. The order reconciliation and the estimate run in the
+        background while candles are fetched. run_strategy and make_orders
+        start once both are done, so that strategies reading the balances or
+        the order list do not race with their update. The profit report is
+        left to finish in the background.
+        """
         logger.debug('Trading...')
         
+        exchange = self.exchange
+        self._wait_report()
+        balance = self.pipeline.submit(self._refresh_balance)
+
+        evaluated = self.running_stat == 't'
+        try:
+            if evaluated:
+                logger.debug('Updating dataframes...')
+                self.exchanges[exchange].update_dataframe()
+        finally:
+            balance.result()
+
+        if evaluated:
+            self._evaluate()
+        self._check_safety()
+
+        if self.running_stat == 't' and evaluated:
+            self._order()
+
+        elif self.running_stat == 'c':
+            self._clear()
+
+    def _refresh_balance(self):
         exchange = self.exchange
         self.exchanges[exchange].update_balance()
         self.estimated = self.exchanges[exchange].calc_estimated()
+        self.reporting = self.pipeline.submit(self._report_profit)
+
+    def _wait_report(self):
+        if self.reporting is not None:
+            try:
+                self.reporting.result()
+            except Exception as e:
+                logger.error(msg=e)
+            self.reporting = None
 
+    def _report_profit(self):
+        exchange = self.exchange
         if self.running_mode == 'LIVE':
             data = dict(
                 use_balance= self.estimated.get('estimated'),
@@ -142,6 +202,7 @@ class BotContext(Context):
                 logger.error(msg=e)
                 TradeApi.error(error_msg='Failed send Bot profit.')
 
+    def _check_safety(self):
         if hasattr(self, 'safety'):
             if self.safety.chk_safety:
                 logger.debug('Checking the Safety conditions...')
@@ -149,29 +210,30 @@ class BotContext(Context):
                     logger.info('estimated : {}'.format(self.estimated.get('estimated')))
                     self.running_stat = 'c'
 
-        if self.running_stat == 't':
-            logger.debug('Updating dataframes...')
-            self.exchanges[exchange].update_dataframe()
-            
-            logger.debug('Running run_strategy...')
-            self.run_strategy(
-                self, is_update=self.exchanges[exchange].is_update, trade_info=self.context['trade_info'],
-                update_len=self.exchanges[exchange].updated_len, data=self.exchanges[exchange].data)
-            
-            logger.debug('Running make_orders...')
-            self.make_orders(
-                self, is_update=self.exchanges[exchange].is_update, trade_info=self.context['trade_info'],
-                update_len=self.exchanges[exchange].updated_len, data=self.exchanges[exchange].data)
-            
-            logger.debug('Sending orders...')
-            self.exchanges[exchange].send_orders()
+    def _evaluate(self):
+        exchange = self.exchange
+        logger.debug('Running run_strategy...')
+        self.run_strategy(
+            self, is_update=self.exchanges[exchange].is_update, trade_info=self.context['trade_info'],
+            update_len=self.exchanges[exchange].updated_len, data=self.exchanges[exchange].data)
 
-        elif self.running_stat == 'c':
-            if self.estimated.get('currency_ratio') < 0.01:
-                self._stop_bot()
-            logger.debug(f'Clear balance \n Current balance : {self.get_balance(exchange)}')
-            self.exchanges[exchange].clear_balance()
-            logger.info(f'Balance after clear_balance : {self.get_balance(exchange)}')
+    def _order(self):
+        exchange = self.exchange
+        logger.debug('Running make_orders...')
+        self.make_orders(
+            self, is_update=self.exchanges[exchange].is_update, trade_info=self.context['trade_info'],
+            update_len=self.exchanges[exchange].updated_len, data=self.exchanges[exchange].data)
+        
+        logger.debug('Sending orders...')
+        self.exchanges[exchange].send_orders()
+
+    def _clear(self):
+        exchange = self.exchange
+        if self.estimated.get('currency_ratio') < 0.01:
+            self._stop_bot()
+        logger.debug(f'Clear balance \n Current balance : {self.get_balance(exchange)}')
+        self.exchanges[exchange].clear_balance()
+        logger.info(f'Balance after clear_balance : {self.get_balance(exchange)}')
 
     def set_order(self, exchange, o, t=None):
         return self.exchanges[exchange].set_order(o=o, t=t)
@@ -197,6 +259,12 @@ class BotContext(Context):
     def clear_balance(self, exchange):
         return self.exchanges[exchange].clear_balance()
 
+    def get_timeframes(self, exchange):
+        return self.exchanges[exchange].get_timeframes()
+
+    def get_features(self, exchange, candle):
+        return self.exchanges[exchange].get_features(candle)
+
     def get_orderbook(self, exchange, currency):
         return self.exchanges[exchange].get_orderbook(currency=currency)
 
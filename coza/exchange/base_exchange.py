@@ -1,19 +1,63 @@
 from abc import ABC, abstractmethod
 from coza.api import TradeApi, CandleApi
 from coza.utils import now
-from coza.objects import Order
+from coza.objects import Order, Timeframes
+from coza.exchange.readiness import CandleReadiness
+from coza.runtime import SharedData
 from coza.errors import InputValueValidException
 from coza.logger import logger
+from coza.ta.lazy import LazyFeatures
+from coza.ta.utils import as_precision, CANDLE_COLUMNS
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from time import sleep
 
 import pandas as pd
-import numpy as np
 import os
 import sys
 
 
-class TradeBase(ABC):
+MARKET_DATA_WORKERS = 4
+MARKET_DATA_TTL = 0.5
+
+
+def _has_orderbook(data):
+    return isinstance(data, dict) and 'orderbook' in data
+
+
+def _per_candle(value, candle):
+    if isinstance(value, dict):
+        return value.get(candle, value.get(int(candle.split('_')[1])))
+    return value
+
+
+class ExchangeBase(ABC):
+    """Candle frames of the trading and backtesting exchanges."""
+    def set_warmup(self, warmup):
+        """Candles preceding the current one that the strategy reads, e.g. the
+        largest coza.ta.get_warmup of its indicators. Only those are kept.
+
+        Args:
+            warmup(int or dict): for every candle, or per 'currency_interval'
+                or interval. None keeps whole frames.
+        """
+        self.warmup = warmup
+
+    def get_history(self, candle):
+        warmup = _per_candle(self.warmup, candle)
+        return None if warmup is None else int(warmup) + 1
+
+    def get_timeframes(self):
+        if self.timeframes is None or self.timeframes.data is not self.data:
+            self.timeframes = Timeframes(self.data)
+        return self.timeframes
+
+    def get_features(self, candle):
+        if candle not in self.features:
+            self.features[candle] = LazyFeatures(self.data[candle])
+        return self.features[candle].update(self.data[candle])
+
+
+class TradeBase(ExchangeBase):
     def __init__(self, name, init_budget, currency_list, interval_list, use_data, data_path, tz, r_off, fiat=None):
         self.name=name
         self.fiat=fiat
@@ -21,11 +65,22 @@ class TradeBase(ABC):
         self.r_off = r_off
         self.updated_len = dict()
         self.is_update = dict()
+        self.kept_rows = dict()
         self.init_budget = init_budget
         self.currencies = tuple(currency_list)
         self.intervals = tuple(interval_list)
         self.use_data = use_data
         self.data_path = data_path
+        self.readiness = CandleReadiness(self._fetch_shared_candles)
+        self.shared = None
+        self.cache = SharedData()
+        self.feed = None
+        self.bid_prices = None
+        self.warmup = None
+        self.max_rows = None
+        self.market_data_ttl = None
+        self.timeframes = None
+        self.features = dict()
 
     def init_dataframe(self):
         logger.debug('Initializing dataframe...')
@@ -53,9 +108,15 @@ class TradeBase(ABC):
                         logger.debug(f'{currency}_{interval}.csv 파일이 존재하지 않습니다.')
 
                 if df is not None:
+                    df = as_precision(df, CANDLE_COLUMNS)
                     df['datetime'] = [datetime.fromtimestamp(t).astimezone(self.tz) for t in df['timestamp']]
                     df.set_index(keys='datetime', inplace=True)
-                    self.data[f'{currency}_{interval}'] = df
+                    history = self.get_history(f'{currency}_{interval}')
+                    if history is not None:
+                        df = df.tail(history)
+                    max_rows = self.get_max_rows(f'{currency}_{interval}')
+                    self.kept_rows[f'{currency}_{interval}'] = int(max_rows) if max_rows else len(df)
+                    self.data[f'{currency}_{interval}'] = df.tail(self.kept_rows[f'{currency}_{interval}'])
                     self.is_update[f'{currency}_{interval}'] = False
                     self.updated_len[f'{currency}_{interval}'] = len(self.data[f'{currency}_{interval}'])
 
@@ -66,63 +127,138 @@ class TradeBase(ABC):
 
 
     def update_dataframe(self):
-        decay_time = 0.0
-        cur_date = now(exchange=self.name, rounding_seconds=True)
-        
-        if self.use_data == 'LOCAL':
+        date = now(exchange=self.name)
+        return self._apply_candles(self.readiness.wait(self._last_dates(), date), date)
+
+    async def update_dataframe_async(self, run, timeout=None):
+        """update_dataframe fetching every currency_interval concurrently.
+
+        Args:
+            run(callable): run(func, *args) returns an awaitable of func(*args).
+            timeout(float): seconds after which missing candles wait for the next tick.
+        """
+        date = now(exchange=self.name)
+        updates = await self.readiness.wait_async(self._last_dates(), date, run, timeout)
+        return self._apply_candles(updates, date)
+
+    def share(self, shared):
+        """Download candles and orderbooks through `shared`, e.g. the
+        coza.runtime.SharedData of a BotHost, with the other bots of a process.
+        """
+        self.shared = shared
+
+    def _market_data(self, key, fetch, keep=None, ttl=None):
+        shared = self.shared
+        if shared is None and ttl is not None:
+            shared = self.cache
+        if shared is None:
+            return fetch()
+        return shared.get((self.name, self.fiat, self.use_data) + key, fetch, keep, ttl)
+
+    def _put_market_data(self, key, value, ttl):
+        shared = self.cache if self.shared is None else self.shared
+        shared.put((self.name, self.fiat, self.use_data) + key, value, ttl)
+
+    def _orderbook(self, key, fetch):
+        # key is (source, currency)
+        if self.feed is not None:
+            orderbook = self.feed.orderbook(key[-1])
+            if orderbook is not None:
+                return dict(orderbook=orderbook)
+
+        # orderbooks are reused for get_market_data_ttl() seconds by every caller of the bot, or of the BotHost
+        return self._market_data(('orderbook',) + key, fetch, _has_orderbook, self.get_market_data_ttl())
+
+    def start_feed(self):
+        """Read candles and orderbooks from the websocket feed of the exchange,
+        see coza.exchange.feed. Exchanges without one keep requesting them.
+        """
+        try:
+            feed = self._make_feed()
+        except ImportError as e:
+            logger.warning(f'{e}, candles and orderbooks are requested')
+            return
+        if feed is None:
+            logger.warning(f'{self.name} has no websocket feed, candles and orderbooks are requested')
+            return
+        self.feed = feed.start()
+
+    def _make_feed(self):
+        return None
+
+    def _fetch_shared_candles(self, candle, last_date):
+        def closed(df):
+            return df is not None and len(df) > 0 and df.index[-1] >= self.readiness.expected(candle, now(exchange=self.name))
+        return self._market_data(('candles', candle, last_date), lambda: self._fetch_candles(candle, last_date), closed)
+
+    def _last_dates(self):
+        return {candle: df.index[-1] for candle, df in self.data.items()}
+
+    def _apply_candles(self, updates, date):
+        for candle in self.data.keys():
+            df = updates.get(candle)
+            if df is None:
+                self.updated_len[candle] = 0
+                continue
+
+            self.updated_len[candle] = len(df)
+            # one copy of the rows kept, the columns added by the strategy are nan on the new rows
+            old, kept = self.data[candle], self.kept_rows[candle]
+            self.data[candle] = pd.concat([old.iloc[max(len(old) - kept + len(df), 0):], df.iloc[-kept:]])
+            logger.debug(f'Completed updating dataframe of {candle} at {self.data[candle].index[-1]}')
+
+        return all(self.data[candle].index[-1] >= self.readiness.expected(candle, date) for candle in self.data)
+
+    def _fetch_candles(self, candle, last_date):
+        currency, interval = candle.split('_')
+        interval = int(interval)
+
+        if self.use_data == 'LIVE':
+            df = self.feed.candles(currency, interval, last_date) if self.feed is not None else None
+            if df is None:
+                df = CandleApi.get_df(
+                    exchange=self.name, currency=currency, fiat=self.fiat, interval=interval, from_date=last_date)
+        elif self.use_data == 'LOCAL':
             path = f'{self.data_path}/candles/{self.name}/{self.fiat}'
+            df = pd.read_csv(os.path.join(path, f'{candle}.csv')).sort_values(by=['timestamp'])
+            df = df[df['timestamp'] >= self.data[candle]['timestamp'].loc[last_date]]
 
-        while decay_time > -0.8:
-            sleep_time = round(0.3 * np.random.rand() + 0.7, 3) + self.delay_time - decay_time
-            sleep(sleep_time)
-
-            for candle in self.data.keys():
-                get_candle = False
-                currency, interval = candle.split('_')
-                interval = int(interval)
-                last_date = self.data[candle].index[-1]
-                
-                if interval * 60 - ((cur_date - last_date).total_seconds() - interval * 60) <= 0:
-                    get_candle = True
-
-                if get_candle:
-                    if self.use_data == 'LIVE':
-                        df = CandleApi.get_df(
-                            exchange=self.name, currency=currency, fiat=self.fiat, interval=interval,
-                            from_date=last_date)
-                        
-                    elif self.use_data == 'LOCAL':
-                        filename = f'{candle}.csv'
-                        df = pd.read_csv(os.path.join(path, filename)).sort_values(by=['timestamp'])
-                        df = df.loc[df[df['timestamp']>=self.data[candle]['timestamp'].loc[last_date]].index[0]:]
-                        
-                    update_len = len(df) - 1
-            
-                    if update_len < 1:
-                        logger.debug(self.data[candle].tail(3))
-                        logger.debug(f'Failed to update dataframe of {candle} at {self.data[candle].index[-1]}')
-                        logger.debug(f'Sleep Time : {sleep_time}')
-                        self.updated_len[candle] = 0
-                        self.delay_time += 0.1
-                        decay_time -= 0.2
-                        break
-
-                    else:
-                        df['datetime'] = [datetime.fromtimestamp(t).astimezone(self.tz) for t in df['timestamp']]
-                        df.set_index(keys='datetime', inplace=True)
-                        df.drop(df.index[0], inplace=True)
-                        self.updated_len[candle] = update_len
-                        self.data[candle].drop(self.data[candle].index[range(self.updated_len[candle])], inplace=True)
-                        self.data[candle] = self.data[candle].append(df)
-
-                        logger.debug(f'Completed updating dataframe of {candle} at {self.data[candle].index[-1]}')
-                else:
-                    self.updated_len[candle] = 0
+        if not isinstance(df, pd.DataFrame) or not len(df):
+            return None
 
-            self.delay_time -= 0.2 if self.delay_time - 0.2 > 0.7 else self.delay_time
-            return True
+        df = as_precision(df, CANDLE_COLUMNS)
+        df['datetime'] = [datetime.fromtimestamp(t).astimezone(self.tz) for t in df['timestamp']]
+        df.set_index(keys='datetime', inplace=True)
+        return df[df.index > last_date]
+
+    def get_bid_prices(self, currencies):
+        """Best bid of each currency, downloaded once per tick.
+
+        Args:
+            currencies(list): currencies to price, e.g. the ones held.
+
+        Returns:
+            dict: best bid by currency. A currency whose orderbook could not be
+                downloaded is missing.
+        """
+        tick = now(exchange=self.name, rounding_seconds=True)
+        if self.bid_prices is None or self.bid_prices[0] != tick:
+            self.bid_prices = (tick, dict())
+        bids = self.bid_prices[1]
+
+        missing = [currency for currency in currencies if currency not in bids]
+        if missing:
+            bids.update(self._fetch_bid_prices(missing))
+        return {currency: bids[currency] for currency in currencies if currency in bids}
 
-        return False
+    def _fetch_bid_prices(self, currencies):
+        # one orderbook per currency, fetched in parallel. Exchanges serving many
+        # markets in one request override it.
+        with ThreadPoolExecutor(max_workers=min(len(currencies), MARKET_DATA_WORKERS)) as pool:
+            orderbooks = list(pool.map(lambda currency: self.get_orderbook(currency=currency), currencies))
+
+        return {currency: orderbook['bid_price'][0] for currency, orderbook in zip(currencies, orderbooks)
+                if 'error' not in orderbook}
 
 
     def init_balance(self):
@@ -261,6 +397,30 @@ class TradeBase(ABC):
     def get_time(self):
         return now(exchange=self.name)
 
+    def set_max_rows(self, max_rows):
+        """Rows kept in the candle frames of the bot.
+
+        Args:
+            max_rows(int or dict): for every candle, or per 'currency_interval'
+                or interval. None keeps the rows loaded at start.
+        """
+        self.max_rows = max_rows
+
+    def get_max_rows(self, candle):
+        return _per_candle(self.max_rows, candle)
+
+    def set_market_data_ttl(self, ttl):
+        """Seconds an orderbook is reused by get_orderbook, calc_estimated and
+        clear_balance before being downloaded again.
+
+        Args:
+            ttl(float): None for MARKET_DATA_TTL, 0 to always download.
+        """
+        self.market_data_ttl = ttl
+
+    def get_market_data_ttl(self):
+        return MARKET_DATA_TTL if self.market_data_ttl is None else self.market_data_ttl
+
     @abstractmethod
     def update_balance(self):
         raise NotImplementedError
@@ -274,7 +434,7 @@ class TradeBase(ABC):
         raise NotImplementedError
 
 
-class BacktestBase(ABC):
+class BacktestBase(ExchangeBase):
     def __init__(self, init_budget, currency_list, interval_list, fiat=None):
         self.fiat = fiat
         self.updated_len = dict()
@@ -282,6 +442,9 @@ class BacktestBase(ABC):
         self.init_budget = init_budget
         self.currencies = tuple(currency_list)
         self.intervals = tuple(interval_list)
+        self.warmup = None
+        self.timeframes = None
+        self.features = dict()
 
     def set_waiting_time(self, set_time):
         self.wait_time = set_time
@@ -6,6 +6,7 @@ from coza.errors import InputValueValidException
 from coza.objects import Order
 from coza.utils import truncate, KST
 from coza.logger import logger
+from coza.ta.utils import as_precision, CANDLE_COLUMNS
 from copy import deepcopy
 from collections import defaultdict
 from time import sleep
@@ -82,7 +83,6 @@ class CoinoneTrade(TradeBase):
         self.data = dict()
         self.orders = defaultdict(list)
         self.ubtime = 0.0
-        self.delay_time = 0.0
         self.fee_rate = FEE_RATE
         self.order_list = {f'{currency}': dict() for currency in currency_list}
         
@@ -521,18 +521,19 @@ class CoinoneTrade(TradeBase):
                         estimated += round(order_c['price'] * order_c['quantity'], R_OFF)
                         _balance[order_c['currency']]['balance'] -= order_c['quantity']
 
+        currencies = [k for k in _balance.keys() if k != 'fiat']
+        bids = self.get_bid_prices(currencies)
+
         for k in _balance.keys():
             if k == 'fiat':
                 estimated += _balance[k]
+            elif k not in bids:
+                e = f'Bid price of {k} is not available'
+                logger.critical(msg=e)
+                self.exit(msg=e)
+                raise KeyError(k)
             else:
-                sleep(0.035)
-                try:
-                    current_orderbook = self.get_orderbook(currency=k)
-
-                except Exception as e:
-                    logger.critical(msg=e)
-                    self.exit(msg=e)
-                currency_estimated += round(_balance[k]['balance'] * current_orderbook['bid_price'][0], R_OFF)
+                currency_estimated += round(_balance[k]['balance'] * bids[k], R_OFF)
 
         self.estimated = estimated + currency_estimated
         self.currency_ratio = round(currency_estimated / self.estimated, R_OFF)
@@ -547,10 +548,7 @@ class CoinoneTrade(TradeBase):
                 continue
             else:
                 try:
-                    if self.using_api == 'EXCHANGE':
-                        price = self.api.get_orderbook(currency=k, fiat=self.fiat, limit=30)['orderbook']['bid_price'][0]
-                    elif self.using_api == 'CATSLAB':
-                        price = ExchangeApi.get_orderbook(exchange=NAME, currency=k)['orderbook']['bid_price'][0]
+                    price = self.get_orderbook(currency=k)['bid_price'][0]
                     self._send_order(
                         Order(
                             exchange=NAME, currency=k, order_type='SELL', fiat=self.fiat, price=price, quantity=self.balance[k]['balance'])
@@ -563,9 +561,13 @@ class CoinoneTrade(TradeBase):
     def get_orderbook(self, currency):
         try:
             if self.using_api == 'CATSLAB':
-                orderbook = pd.DataFrame(ExchangeApi.get_orderbook(exchange=NAME, currency=currency)['orderbook'])
+                orderbook = pd.DataFrame(self._orderbook(
+                    (self.using_api, currency),
+                    lambda: ExchangeApi.get_orderbook(exchange=NAME, currency=currency))['orderbook'])
             elif self.using_api == 'EXCHANGE':
-                orderbook = self.api.get_orderbook(currency=currency, fiat=self.fiat, limit=20)['orderbook']
+                orderbook = self._orderbook(
+                    (self.using_api, currency),
+                    lambda: self.api.get_orderbook(currency=currency, fiat=self.fiat, limit=20))['orderbook']
         except Exception as e:
             logger.error(e)
             self._send_error(msg=e)
@@ -638,7 +640,9 @@ class CoinoneBacktest(BacktestBase):
         until_date = {}
 
         for interval in self.intervals:
-            from_date[interval] = self.start_date - timedelta(minutes=interval * forward_candle_frame[interval])
+            history = [self.get_history(f'{currency}_{interval}') for currency in self.currencies]
+            forward = forward_candle_frame[interval] if None in history else max(history) + 1
+            from_date[interval] = self.start_date - timedelta(minutes=interval * forward)
             until_date[interval] = self.end_date - timedelta(minutes=interval)
 
         if self.use_data == 'LOCAL':
@@ -651,6 +655,7 @@ class CoinoneBacktest(BacktestBase):
                         df = CandleApi.get_df(
                             exchange=NAME, currency=currency, fiat=self.fiat, interval=interval,
                             from_date=from_date[interval], until_date=until_date[interval])
+                        df = as_precision(df, CANDLE_COLUMNS)
                         df['datetime'] = [datetime.fromtimestamp(t).astimezone(KST) for t in df['timestamp']]
                         df.set_index(keys='datetime', inplace=True)
                         self.data[f'{currency}_{interval}'] = df
@@ -662,6 +667,7 @@ class CoinoneBacktest(BacktestBase):
                     filename = f'{currency}_{interval}_{self.fiat}.csv'
                     try:
                         df = pd.read_csv(os.path.join(path, filename)).sort_values(by=['timestamp'])
+                        df = as_precision(df, CANDLE_COLUMNS)
                     except FileNotFoundError:
                         print(f"{filename} 파일이 존재하지 않습니다.")
 
@@ -687,6 +693,9 @@ class CoinoneBacktest(BacktestBase):
         for curr_inter in self.test_df.keys():
             interval = int(curr_inter.split('_')[1])
             self.data[curr_inter] = self.test_df[curr_inter][:self.start_date - timedelta(minutes=2*interval)]
+            history = self.get_history(curr_inter)
+            if history is not None:
+                self.data[curr_inter] = self.data[curr_inter].tail(history)
 
 
     def update_dataframe(self, _datetime):
@@ -701,6 +710,9 @@ class CoinoneBacktest(BacktestBase):
             else:
                 self.updated_len[curr_inter] = len(df)
                 self.data[curr_inter] = self.data[curr_inter].append(df)
+                history = self.get_history(curr_inter)
+                if history is not None:
+                    self.data[curr_inter] = self.data[curr_inter].tail(history)
                 has_updated = True
 
         return has_updated
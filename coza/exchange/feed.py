@@ -0,0 +1,230 @@
+"""Websocket market data of the exchanges.
+
+A feed subscribes to the trades and orderbooks of the markets of a bot. It
+builds 1-minute candles from the trades, and candles of any interval from
+those, and keeps the last orderbook of each market. TradeBase reads candles
+and orderbooks from its feed, once started, instead of requesting them:
+
+    >>> exchange.start_feed()
+
+websocket-client is an optional dependency. Without it, or for the candles
+preceding the connection of the feed, candles and orderbooks are requested
+from the APIs as before.
+"""
+from coza.logger import logger
+from uuid import uuid4
+
+import json
+import math
+import threading
+import time
+import pandas as pd
+
+try:
+    import websocket
+except ImportError:
+    websocket = None
+
+
+class CandleBuilder(object):
+    """1-minute candles of a market, built from its trades.
+
+    Args:
+        max_minutes(int): minutes kept.
+    """
+    def __init__(self, max_minutes=1440):
+        self.max_minutes = max_minutes
+        self.minutes = dict()
+        self.price = None
+
+    def add(self, price, volume, timestamp, covered_from):
+        minute = int(timestamp // 60 * 60)
+        if covered_from is None or minute < covered_from:
+            # trades of the minute the feed connected in open the first candles
+            self.price = price
+            return
+
+        candle = self.minutes.get(minute)
+        if candle is None:
+            self.minutes[minute] = [price, price, price, price, volume]
+            if len(self.minutes) > self.max_minutes:
+                del self.minutes[min(self.minutes)]
+        else:
+            candle[1] = max(candle[1], price)
+            candle[2] = min(candle[2], price)
+            candle[3] = price
+            candle[4] += volume
+
+    def clear(self):
+        self.minutes.clear()
+
+    def candles(self, start, interval, end):
+        """
+            Args:
+                start(int): timestamp of the first candle.
+                interval(int): minutes of a candle.
+                end(int): candles closed before `end` are built.
+
+            return: list : rows of timestamp, open, high, low, close, volume.
+                A minute without trades repeats the last price, with no volume.
+        """
+        before = [minute for minute in self.minutes if minute < start]
+        price = self.minutes[max(before)][3] if before else self.price
+
+        rows = list()
+        t = start
+        while t + interval * 60 <= end:
+            minutes = [self.minutes[m] for m in range(t, t + interval * 60, 60) if m in self.minutes]
+            if minutes:
+                rows.append((t, minutes[0][0], max(m[1] for m in minutes), min(m[2] for m in minutes),
+                             minutes[-1][3], sum(m[4] for m in minutes)))
+                price = minutes[-1][3]
+            elif price is not None:
+                rows.append((t, price, price, price, price, 0.0))
+            t += interval * 60
+        return rows
+
+
+class MarketFeed(object):
+    """Websocket feed of the trades and orderbooks of some markets.
+
+    It runs in a daemon thread and connects again after `reconnect` seconds
+    when the connection drops. Candles are only built for the minutes after
+    the last connection, and orderbooks only read while connected.
+
+    Args:
+        markets(dict): market id of each currency, e.g. {'btc': 'KRW-BTC'}.
+        grace(float): seconds after its close that a candle waits for late trades.
+        reconnect(float): seconds before connecting again.
+        url(str): websocket url, defaults to the feed of the exchange.
+        clock(callable): current timestamp in seconds, defaults to time.time.
+    """
+    url = None
+
+    def __init__(self, markets, grace=0.3, reconnect=1.0, url=None, clock=time.time):
+        if websocket is None:
+            raise ImportError('MarketFeed requires websocket-client, pip install coza[websocket]')
+        self.url = url or self.url
+        self.clock = clock
+        self.markets = dict(markets)
+        self.currencies = {market: currency for currency, market in self.markets.items()}
+        self.grace = grace
+        self.reconnect = reconnect
+        self.builders = {currency: CandleBuilder() for currency in self.markets}
+        self.orderbooks = dict()
+        self.covered_from = None
+        self.connected = False
+        self.ws = None
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+
+    def start(self):
+        """
+            return: MarketFeed : self, connecting in the background
+        """
+        threading.Thread(target=self._run, name=f'{type(self).__name__}', daemon=True).start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        if self.ws is not None:
+            self.ws.close()
+        # the close callback may not run once the connection is closed from this side
+        self._on_close(self.ws)
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self.ws = websocket.WebSocketApp(
+                self.url, on_open=self._on_open, on_message=self._on_message, on_error=self._on_error,
+                on_close=self._on_close)
+            self.ws.run_forever()
+            self._stopped.wait(self.reconnect)
+
+    def _on_open(self, ws):
+        with self._lock:
+            # the minutes before the connection may miss trades
+            self.covered_from = int(math.ceil(self.clock() / 60) * 60)
+            for builder in self.builders.values():
+                builder.clear()
+            self.connected = True
+        ws.send(json.dumps(self.subscription()))
+        logger.debug(f'{type(self).__name__} connected')
+
+    def _on_message(self, ws, message):
+        try:
+            if isinstance(message, bytes):
+                message = message.decode('utf-8')
+            self.parse(json.loads(message))
+        except Exception as e:
+            logger.error(f'{type(self).__name__} message not read: {e}')
+
+    def _on_error(self, ws, error):
+        logger.error(f'{type(self).__name__} error: {error}')
+
+    def _on_close(self, ws, *args):
+        with self._lock:
+            self.connected = False
+            self.orderbooks.clear()
+        logger.debug(f'{type(self).__name__} disconnected')
+
+    def on_trade(self, market, price, volume, timestamp):
+        currency = self.currencies.get(market)
+        if currency is None:
+            return
+        with self._lock:
+            self.builders[currency].add(price, volume, timestamp, self.covered_from)
+
+    def on_orderbook(self, market, orderbook):
+        currency = self.currencies.get(market)
+        if currency is None:
+            return
+        with self._lock:
+            self.orderbooks[currency] = orderbook
+
+    def candles(self, currency, interval, last_date):
+        """Candles closed after `last_date`, in the columns of CandleApi.get_df.
+
+        Args:
+            currency(str): currency of the candles.
+            interval(int): minutes of a candle.
+            last_date(datetime.datetime): last candle of the frame.
+
+        Returns:
+            pandas.DataFrame: None when the feed did not receive all their trades.
+        """
+        start = int(last_date.timestamp()) + interval * 60
+        with self._lock:
+            if not self.connected or self.covered_from is None or start < self.covered_from:
+                return None
+            rows = self.builders[currency].candles(start, interval, self.clock() - self.grace)
+        return pd.DataFrame(rows, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+
+    def orderbook(self, currency):
+        """
+            return: pandas.DataFrame : last orderbook of `currency`, None when not connected
+        """
+        with self._lock:
+            return self.orderbooks.get(currency) if self.connected else None
+
+    def subscription(self):
+        raise NotImplementedError
+
+    def parse(self, message):
+        raise NotImplementedError
+
+
+class UpbitFeed(MarketFeed):
+    url = 'wss://api.upbit.com/websocket/v1'
+
+    def subscription(self):
+        codes = list(self.currencies)
+        return [{'ticket': str(uuid4())}, {'type': 'trade', 'codes': codes}, {'type': 'orderbook', 'codes': codes}]
+
+    def parse(self, message):
+        if message.get('type') == 'trade':
+            self.on_trade(message['code'], float(message['trade_price']), float(message['trade_volume']),
+                          message['trade_timestamp'] / 1000)
+        elif message.get('type') == 'orderbook':
+            orderbook = pd.DataFrame(message['orderbook_units'])
+            orderbook.columns = [column.replace('size', 'quantity') for column in orderbook.columns]
+            self.on_orderbook(message['code'], orderbook)
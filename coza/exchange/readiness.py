@@ -0,0 +1,117 @@
+from coza.logger import logger
+from coza.utils import align_date
+from datetime import timedelta
+from time import sleep
+
+import asyncio
+
+
+class CandleReadiness(object):
+    """Waits until the candles closed at the current tick are available.
+
+    The last closed candle of an interval opened at
+    align_date(now, interval) - interval. Candles older than that one and
+    newer than the last row of a frame are due; they are fetched right away
+    and fetched again, with a growing pause, only while the source does not
+    have them yet.
+
+    Args:
+        fetch(callable): fetch(candle, last_date) returns the candles of
+            `candle` ('btc_1') after `last_date`, as a DataFrame indexed by
+            datetime. It may poll an API or read a pushed feed.
+        poll_interval(float): seconds before the first retry, doubled on each
+            retry up to max_poll_interval.
+        max_poll_interval(float): longest pause between two retries.
+        retries(int): retries after the first fetch before giving up until
+            the next tick.
+    """
+    def __init__(self, fetch, poll_interval=0.05, max_poll_interval=1.0, retries=8):
+        self.fetch = fetch
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.retries = retries
+
+    @staticmethod
+    def expected(candle, date):
+        """
+            return: datetime : index of the last candle of `candle` closed at `date`
+        """
+        interval = int(candle.split('_')[1])
+        return align_date(date, interval) - timedelta(minutes=interval)
+
+    def _due(self, last_dates, date):
+        pending = {candle: self.expected(candle, date) for candle in last_dates}
+        return {candle: expected for candle, expected in pending.items() if expected > last_dates[candle]}
+
+    def wait(self, last_dates, date):
+        """Fetch the candles due at `date`.
+
+        Args:
+            last_dates(dict): last index of each frame, by candle.
+            date(datetime.datetime): current time.
+
+        Returns:
+            dict: new closed candles by candle, for the candles that were due.
+                A candle whose last due row never came holds the rows that did.
+        """
+        pending = self._due(last_dates, date)
+
+        updates = dict()
+        pause = self.poll_interval
+        for attempt in range(self.retries + 1):
+            for candle in list(pending):
+                df = self.fetch(candle, last_dates[candle])
+                if df is None:
+                    continue
+                df = df[df.index <= pending[candle]]
+                if len(df):
+                    updates[candle] = df
+                if len(df) and df.index[-1] == pending[candle]:
+                    del pending[candle]
+            if not pending or attempt == self.retries:
+                break
+            sleep(pause)
+            pause = min(2 * pause, self.max_poll_interval)
+
+        for candle, expected in pending.items():
+            logger.debug(f'Candle {candle} at {expected} is not available after {self.retries} retries')
+        return updates
+
+    async def wait_async(self, last_dates, date, run, timeout=None):
+        """wait, polling every due candle concurrently.
+
+        Args:
+            last_dates(dict): last index of each frame, by candle.
+            date(datetime.datetime): current time.
+            run(callable): run(func, *args) returns an awaitable of func(*args),
+                e.g. functools.partial(loop.run_in_executor, executor).
+            timeout(float): seconds after which the candles still missing are
+                given up until the next tick.
+
+        Returns:
+            dict: as wait.
+        """
+        updates = dict()
+
+        async def poll(candle, expected):
+            pause = self.poll_interval
+            for attempt in range(self.retries + 1):
+                df = await run(self.fetch, candle, last_dates[candle])
+                if df is not None:
+                    df = df[df.index <= expected]
+                    if len(df):
+                        updates[candle] = df
+                    if len(df) and df.index[-1] == expected:
+                        return
+                if attempt < self.retries:
+                    await asyncio.sleep(pause)
+                    pause = min(2 * pause, self.max_poll_interval)
+            logger.debug(f'Candle {candle} at {expected} is not available after {self.retries} retries')
+
+        polls = [poll(candle, expected) for candle, expected in self._due(last_dates, date).items()]
+        if polls:
+            try:
+                await asyncio.wait_for(asyncio.gather(*polls), timeout)
+            except asyncio.TimeoutError:
+                logger.debug(f'Candles not available after {timeout} seconds')
+        return updates
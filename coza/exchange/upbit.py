@@ -1,11 +1,14 @@
 from .base_exchange import TradeBase, BacktestBase
+from .feed import UpbitFeed
 from datetime import datetime, timedelta
 from coza.api.exchange import UpbitAPI
+from coza.api.exchange.upbit import ORDER_PAGE
 from coza.api import TradeApi, ExchangeApi, CandleApi
 from coza.errors import InputValueValidException
 from coza.objects import Order
 from coza.utils import truncate, KST
 from coza.logger import logger
+from coza.ta.utils import as_precision, CANDLE_COLUMNS
 from copy import deepcopy
 from collections import defaultdict
 from time import sleep
@@ -52,7 +55,6 @@ class UpbitTrade(TradeBase):
         self.data = dict()
         self.orders = defaultdict(list)
         self.uptime = 0.0
-        self.delay_time = 0.0
         self.order_list = {f'{currency}': dict() for currency in currency_list}
         
         try:
@@ -85,90 +87,119 @@ class UpbitTrade(TradeBase):
 
 
     def update_balance(self):
-        update_type = "FILLED"
+        # index of the open orders, by order id
+        open_orders = {
+            order_id: currency for currency in self.order_list.keys() for order_id in self.order_list[currency].keys()}
+        if not open_orders:
+            return
 
-        for currency in self.order_list.keys():
-            if self.order_list[currency].keys():
-                try:
-                    if self.using_api == 'EXCHANGE':
-                        c_order = self.api.get_order_list(market_id=self.market_table[currency]['id'], state='done', order_by='desc')
-                    elif self.using_api == 'CATSLAB':
-                        c_order = TradeApi.order_list(
-                            {
-                                'market_id':self.market_table[currency]['id'],
-                                'state':'done',
-                                'page': 1,
-                                'order_by':'desc'
-                            })
-
-                except Exception as e:
-                    logger.critical(msg=e)
-                    self.exit(msg=e, stop_bot=True)
+        try:
+            states = self._order_states(open_orders)
+        except Exception as e:
+            logger.critical(msg=e)
+            self.exit(msg=e, stop_bot=True)
+            return 0
+        if states is None:
+            return 0
+
+        for order_id, currency in open_orders.items():
+            order_stat = states.get(order_id)
+            if order_stat is None:
+                # not reported yet, checked again at the next tick
+                continue
 
-                if not c_order.get('error'):
-                    pop_q = set()
-                    for order_id in self.order_list[currency].keys():
-                        if order_id in c_order.keys():
-                            order_ = self.order_list[currency][order_id]
-                            if order_['order_type'] == 'BUY':
-                                self._update_quantity(
-                                    update_type=update_type, order_id=order_id, currency=currency,
-                                    order_type=order_['order_type'], price=order_['price'],
-                                    quantity=order_['remain_qty'], use_balance=0, avail=order_['remain_qty'], balance=0)
-                            elif order_['order_type'] == 'SELL':
-                                use_balance = round((order_['price']*order_['remain_qty'])*(1-self.market_table[currency]['ask_fee']), R_OFF)
-                                self._update_quantity(
-                                    update_type=update_type, order_id=order_id, currency=currency,
-                                    order_type=order_['order_type'], price=order_['price'],
-                                    quantity=order_['remain_qty'], use_balance=use_balance,
-                                    avail=0, balance=-round(order_['remain_qty'], R_OFF))
-                            else:
-                                # Raise Exception.
-                                pass
-                            pop_q.add(order_id)
-                        else:
-                            if self.using_api == 'EXCHANGE':
-                                order_stat = self.api.get_order_stat(order_id=order_id)
-                            elif self.using_api == 'CATSLAB':
-                                order_stat = TradeApi.order_status({'order_id':order_id})
-                            try:
-                                if order_stat.get('state') == 'wait' and len(order_stat.get('trades')) != 0:
-                                    update_id = False
-                                    for trade in order_stat.get('trades'):
-                                        if order_['last_trade_id'] == trade['uuid']:
-                                            break
-                                        if trade['side'] == 'bid':
-                                            self._update_quantity(
-                                                update_type=update_type, order_id=order_id, currency=currency,
-                                                order_type='BUY', price=float(trade['price']), quantity=float(trade['volume']),
-                                                use_balance=0, avail=float(trade['volume']), balance=0)
-                                        elif trade['side'] == 'ask':
-                                            use_balance = round(float(trade['funds'])*(1-self.market_table[currency]['ask_fee']), R_OFF)
-                                            self._update_quantity(
-                                                update_type=update_type, order_id=order_id, currency=currency,
-                                                order_type='SELL', price=float(trade['price']), quantuty=float(trade['volume']),
-                                                use_balance=use_balance, avail=0, balance=-float(trade['volume']))
-                                        else:
-                                            #
-                                            pass
-                                        update_id = True
-
-                                    if update_id:
-                                        self.order_list[currency][order_id]['last_trade_id'] = order_stat.get('trades')[0]
-                                elif order_stat.get('state') == 'cancel':
-                                    # Todo
-                                    # Cancel된 Order 반영.
-                                    
-                                    
-                                    pass
-                            except:
-                                # Raise Exception
-                                pass
-
-                    for pop_i in pop_q:
-                        self.order_list[currency].pop(pop_i)
-                else:
-                    return 0
+            order_ = self.order_list[currency][order_id]
+            if order_stat.get('state') == 'done':
+                filled = order_['remain_qty']
+            else:
+                filled = round(order_['remain_qty'] - float(order_stat.get('remaining_volume')), R_OFF)
+            if filled > 0:
+                self._update_filled(currency=currency, order_id=order_id, quantity=filled)
+
+            if order_stat.get('state') == 'done':
+                self.order_list[currency].pop(order_id)
+            elif order_stat.get('state') == 'cancel':
+                self._update_canceled(currency=currency, order_id=order_id)
+                self.order_list[currency].pop(order_id)
+
+    def _order_states(self, open_orders):
+        """
+            Args:
+                open_orders(dict): currency of each open order, by order id.
+
+            return: dict : order status by order id, None on error. Orders missing are not known yet.
+        """
+        states = dict()
+        if self.using_api == 'EXCHANGE':
+            # status of ORDER_PAGE orders per request, whatever their market
+            order_ids = list(open_orders.keys())
+            for i in range(0, len(order_ids), ORDER_PAGE):
+                orders = self.api.get_orders(order_ids=order_ids[i:i + ORDER_PAGE])
+                if orders.get('error'):
+                    return None
+                states.update(orders)
+            return states
+
+        # the order lists of each market are read page by page, newest first, until every
+        # open order is found or the pages are older than the oldest open order
+        for currency in set(open_orders.values()):
+            missing = {order_id for order_id, c in open_orders.items() if c == currency}
+            oldest = min(self.order_list[currency][order_id]['datetime'] for order_id in missing)
+            for state in ('wait', 'done', 'cancel'):
+                page = 1
+                while missing:
+                    orders = TradeApi.order_list(
+                        {
+                            'market_id': self.market_table[currency]['id'],
+                            'state': state,
+                            'page': page,
+                            'order_by': 'desc'
+                        })
+                    if orders.get('error'):
+                        return None
+                    orders.pop('remain_req', None)
+
+                    found = missing & set(orders.keys())
+                    states.update({order_id: orders[order_id] for order_id in found})
+                    missing -= found
+                    if len(orders) < ORDER_PAGE or min(
+                            datetime.strptime(o['created_at'][:19], '%Y-%m-%dT%H:%M:%S') for o in orders.values()) < oldest:
+                        break
+                    page += 1
+        return states
+
+    def _update_filled(self, currency, order_id, quantity):
+        order_c = self.order_list[currency][order_id]
+        update_type = "FILLED"
+        if order_c['order_type'] == 'BUY':
+            self._update_quantity(
+                update_type=update_type, order_id=order_id, use_balance=0, currency=currency,
+                order_type=order_c['order_type'], price=order_c['price'], quantity=quantity,
+                avail=round(quantity, R_OFF), balance=0)
+        elif order_c['order_type'] == 'SELL':
+            use_balance = round((quantity*order_c['price'])*(1-self.market_table[currency]['ask_fee']), R_OFF)
+            self._update_quantity(
+                update_type=update_type, order_id=order_id, use_balance=use_balance, currency=currency,
+                order_type=order_c['order_type'], price=order_c['price'], quantity=quantity,
+                avail=0, balance=-round(quantity, R_OFF))
+        order_c['remain_qty'] = round(order_c['remain_qty'] - quantity, R_OFF)
+
+    def _update_canceled(self, currency, order_id):
+        order_c = self.order_list[currency][order_id]
+        remainQty = order_c['remain_qty']
+        update_type = "CANCEL"
+        if order_c['order_type'] == 'BUY':
+            use_balance = round((remainQty * order_c['price'])*(1+self.market_table[currency]['bid_fee']), R_OFF)
+            self._update_quantity(
+                update_type=update_type, order_id=order_id, use_balance=use_balance, currency=currency,
+                order_type=order_c['order_type'], price=order_c['price'], quantity=remainQty,
+                avail=0, balance=-round(remainQty, R_OFF))
+        elif order_c['order_type'] == 'SELL':
+            self._update_quantity(
+                update_type=update_type, order_id=order_id, use_balance=0, currency=currency,
+                order_type=order_c['order_type'], price=order_c['price'], quantity=remainQty,
+                avail=round(remainQty, R_OFF), balance=0)
+        order_c['remain_qty'] = 0
 
 
     def _send_order(self, order, _datetime=None):
@@ -462,19 +493,19 @@ class UpbitTrade(TradeBase):
                         estimated += round(order_c['price'] * order_c['quantity'], R_OFF)
                         _balance[order_c['currency']]['balance'] -= order_c['quantity']
 
+        currencies = [k for k in _balance.keys() if k != 'fiat']
+        bids = self.get_bid_prices(currencies)
+
         for k in _balance.keys():
             if k == 'fiat':
                 estimated += _balance[k]
+            elif k not in bids:
+                e = f'Bid price of {k} is not available'
+                logger.critical(msg=e)
+                self.exit(msg=e)
+                raise KeyError(k)
             else:
-                sleep(0.035)
-                try:
-                    current_orderbook = self.get_orderbook(currency=k)
-
-                except Exception as e:
-                    logger.critical(msg=e)
-                    self.exit(msg=e)
-
-                currency_estimated += round(_balance[k]['balance'] * current_orderbook['bid_price'][0], R_OFF)
+                currency_estimated += round(_balance[k]['balance'] * bids[k], R_OFF)
 
         self.estimated = estimated + currency_estimated
         self.currency_ratio = round(currency_estimated / self.estimated, R_OFF)
@@ -489,10 +520,7 @@ class UpbitTrade(TradeBase):
                 continue
             else:
                 try:
-                    if self.using_api == 'EXCHANGE':
-                        price = self.api.get_orderbook(market_id=self.market_table[k]['id'])['orderbook']['bid_price'][0]
-                    elif self.using_api == 'CATSLAB':
-                        price = ExchangeApi.get_orderbook(exchange=NAME, currency=k)['orderbook']['bid_price'][0]
+                    price = self.get_orderbook(currency=k)['bid_price'][0]
                     self._send_order(
                         Order(
                             exchange=NAME, currency=k, order_type='SELL', fiat=self.fiat, price=price, quantity=self.balance[k]['balance'])
@@ -505,9 +533,13 @@ class UpbitTrade(TradeBase):
     def get_orderbook(self, currency):
         try:
             if self.using_api == 'CATSLAB':
-                orderbook = pd.DataFrame(ExchangeApi.get_orderbook(exchange=NAME, currency=currency)['orderbook'])
+                orderbook = pd.DataFrame(self._orderbook(
+                    (self.using_api, currency),
+                    lambda: ExchangeApi.get_orderbook(exchange=NAME, currency=currency))['orderbook'])
             elif self.using_api == 'EXCHANGE':
-                orderbook = self.api.get_orderbook(market_id=self.market_table[currency]['id'])['orderbook']
+                orderbook = self._orderbook(
+                    (self.using_api, currency),
+                    lambda: self.api.get_orderbook(market_id=self.market_table[currency]['id']))['orderbook']
         except Exception as e:
             logger.error(msg=e)
             self._send_error(msg=e)
@@ -515,6 +547,30 @@ class UpbitTrade(TradeBase):
 
         return orderbook
 
+    def _make_feed(self):
+        return UpbitFeed({currency: self.market_table[currency]['id'] for currency in self.currencies})
+
+    def _fetch_bid_prices(self, currencies):
+        if self.using_api != 'EXCHANGE' or self.feed is not None:
+            return super()._fetch_bid_prices(currencies)
+
+        # the orderbooks of every market come in one request
+        markets = {self.market_table[currency]['id']: currency for currency in currencies}
+        data = self.api.get_orderbooks(market_ids=list(markets))
+        if 'error' in data:
+            logger.error(msg=data['error'])
+            self._send_error(msg=data['error'])
+            return dict()
+
+        bids = dict()
+        for market_id, orderbook in data['orderbooks'].items():
+            currency = markets[market_id]
+            # later get_orderbook calls of the tick reuse them
+            self._put_market_data(
+                ('orderbook', self.using_api, currency), dict(orderbook=orderbook), self.get_market_data_ttl())
+            bids[currency] = orderbook['bid_price'][0]
+        return bids
+
 
 class UpbitBacktest(BacktestBase):
 
@@ -567,7 +623,9 @@ class UpbitBacktest(BacktestBase):
         until_date = {}
 
         for interval in self.intervals:
-            from_date[interval] = self.start_date - timedelta(minutes=interval * forward_candle_frame[interval])
+            history = [self.get_history(f'{currency}_{interval}') for currency in self.currencies]
+            forward = forward_candle_frame[interval] if None in history else max(history) + 1
+            from_date[interval] = self.start_date - timedelta(minutes=interval * forward)
             until_date[interval] = self.end_date - timedelta(minutes=interval)
 
         if self.use_data == 'LOCAL':
@@ -580,6 +638,7 @@ class UpbitBacktest(BacktestBase):
                     df = CandleApi.get_df(
                         exchange=NAME, currency=currency, fiat=self.fiat, interval=interval,
                         from_date=from_date[interval], until_date=until_date[interval])
+                    df = as_precision(df, CANDLE_COLUMNS)
                     df['datetime'] = [datetime.fromtimestamp(t).astimezone(KST) for t in df['timestamp']]
                     df.set_index(keys='datetime', inplace=True)
                     self.data[f'{currency}_{interval}'] = df
@@ -588,6 +647,7 @@ class UpbitBacktest(BacktestBase):
                     filename = f'{currency}_{interval}_{self.fiat}.csv'
                     try:
                         df = pd.read_csv(os.path.join(path, filename)).sort_values(by=['timestamp'])
+                        df = as_precision(df, CANDLE_COLUMNS)
                     except FileNotFoundError:
                         print(f"{filename} 파일이 존재하지 않습니다.")
 
@@ -618,6 +678,9 @@ class UpbitBacktest(BacktestBase):
         for curr_inter in self.test_df.keys():
             interval = int(curr_inter.split('_')[1])
             self.data[curr_inter] = self.test_df[curr_inter][:self.start_date - timedelta(minutes=2 * interval)]
+            history = self.get_history(curr_inter)
+            if history is not None:
+                self.data[curr_inter] = self.data[curr_inter].tail(history)
 
     def update_dataframe(self, _datetime):
         has_updated = False
@@ -631,6 +694,9 @@ class UpbitBacktest(BacktestBase):
             else:
                 self.updated_len[curr_inter] = len(df)
                 self.data[curr_inter] = self.data[curr_inter].append(df)
+                history = self.get_history(curr_inter)
+                if history is not None:
+                    self.data[curr_inter] = self.data[curr_inter].tail(history)
                 has_updated = True
 
         return has_updated
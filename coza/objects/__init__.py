@@ -1,3 +1,4 @@
 from .order import Order
 from .context import Context
-from .result import Result
\ No newline at end of file
+from .result import Result
+from .timeframe import Timeframes
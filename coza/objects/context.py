@@ -72,4 +72,12 @@ class Context(ABC):
     def clear_balance(self, exchange):
         raise NotImplementedError
 
+    @abstractmethod
+    def get_timeframes(self, exchange):
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_features(self, exchange, candle):
+        raise NotImplementedError
+
 
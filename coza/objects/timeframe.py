@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+
+
+NANOSECONDS_PER_MINUTE = 60 * 10**9
+
+
+class Timeframes(object):
+    """Aligned view of the candle frames of an exchange `data` dict.
+
+    Maps every row of a base frame (e.g. 'btc_1') to the last candle of another
+    frame (e.g. 'btc_60') closed when the base candle closed, so nothing is
+    read ahead of time. The mappings are kept between calls and only the rows
+    touched by the last update are searched again, so reading the current
+    60 minute value at a 1 minute tick is a lookup:
+
+        >>> tf = context.get_timeframes('upbit')
+        >>> tf.at('btc_1', 'btc_60', 'rsi')                 # value for the last 1 minute candle
+        >>> tf.align('btc_1', 'btc_60', ['rsi', 'macd'])   # columns of btc_60 indexed like btc_1
+    """
+    def __init__(self, data):
+        self.data = data
+        self._maps = dict()
+
+    def _close_times(self, candle):
+        interval = int(candle.split('_')[1])
+        return self.data[candle].index.asi8 + interval * NANOSECONDS_PER_MINUTE
+
+    def _state(self, candle):
+        df = self.data[candle]
+        return (len(df), df.index[0], df.index[-1]) if len(df) else (0,)
+
+    def positions(self, base, other):
+        """Row of `other` aligned with each row of `base`.
+
+        Args:
+            base(str): key of the base frame, e.g. 'btc_1'.
+            other(str): key of the aligned frame, e.g. 'btc_60'.
+
+        Returns:
+            numpy.ndarray: positions in `other`, -1 where no candle was closed yet.
+        """
+        state = (self._state(base), self._state(other))
+        cached = self._maps.get((base, other))
+        if cached is not None and cached[0] == state:
+            return cached[-1]
+
+        base_times = self._close_times(base)
+        other_times = self._close_times(other)
+
+        start, kept = 0, np.empty(0, dtype='int64')
+        if cached is not None and len(base_times) and len(other_times):
+            _, old_base, old_other, old_positions = cached
+            b_drop = np.searchsorted(old_base, base_times[0])
+            n_kept = len(old_base) - b_drop
+            if 0 < n_kept <= len(base_times) and old_base[-1] == base_times[n_kept - 1] \
+                    and len(old_other) and old_other[0] <= other_times[0]:
+                o_drop = np.searchsorted(old_other, other_times[0])
+                kept = np.maximum(old_positions[b_drop:] - o_drop, -1)
+                # only rows closed after the last known candle of `other` can change
+                start = min(n_kept, np.searchsorted(base_times, old_other[-1], side='right'))
+
+        positions = np.concatenate((kept[:start], np.searchsorted(other_times, base_times[start:], side='right') - 1))
+        self._maps[(base, other)] = (state, base_times, other_times, positions)
+        return positions
+
+    def align(self, base, other, columns=None):
+        """Columns of `other` aligned with the rows of `base`.
+
+        Args:
+            base(str): key of the base frame.
+            other(str): key of the aligned frame.
+            columns(list): columns of `other`, defaults to all of them.
+
+        Returns:
+            pandas.DataFrame: indexed like `base`, nan where no candle was closed yet.
+        """
+        positions = self.positions(base, other)
+        df = self.data[other] if columns is None else self.data[other][columns]
+        aligned = df.iloc[np.maximum(positions, 0)].set_index(self.data[base].index)
+        return aligned.where(pd.Series(positions >= 0, index=aligned.index), axis=0)
+
+    def at(self, base, other, column=None, i=-1):
+        """Value of `other` aligned with row `i` of `base`.
+
+        Args:
+            base(str): key of the base frame.
+            other(str): key of the aligned frame.
+            column(str): column of `other`, defaults to the whole row.
+            i(int): row of `base`, defaults to the last one.
+
+        Returns:
+            Value or pandas.Series, None where no candle was closed yet.
+        """
+        position = self.positions(base, other)[i]
+        if position < 0:
+            return None
+        if column is None:
+            return self.data[other].iloc[position]
+        return self.data[other][column].iat[position]
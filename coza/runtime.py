@@ -0,0 +1,223 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from coza.logger import logger
+
+import asyncio
+import threading
+import time
+
+
+class AsyncRuntime(object):
+    """Runs a BotContext on an asyncio event loop.
+
+    At every minute, the balance refresh (update_balance and calc_estimated)
+    and the candle fetches of every currency_interval run concurrently in a
+    thread pool, each bounded by `timeout`. run_strategy and make_orders start
+    once both are done, and the profit report finishes in the background, so
+    a tick lasts about as long as its slowest request instead of the sum of
+    all of them.
+
+        >>> bot.run(runtime='asyncio')
+
+    A call that times out is not interrupted: its thread finishes in the
+    background and the tick goes on with the values it had.
+
+    Args:
+        bot(BotContext): initialized bot.
+        timeout(float): seconds allowed to the balance refresh and to the
+            candle fetches of a tick.
+        max_workers(int): threads running the blocking HTTP calls.
+        loop(asyncio.AbstractEventLoop): defaults to asyncio.get_event_loop().
+    """
+    def __init__(self, bot, timeout=20.0, max_workers=None, loop=None):
+        self.bot = bot
+        self.timeout = timeout
+        self.loop = loop or asyncio.get_event_loop()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    def call(self, func, *args):
+        """
+            return: asyncio.Future : func(*args) run in the thread pool
+        """
+        return self.loop.run_in_executor(self.executor, func, *args)
+
+    async def bounded(self, awaitable, name):
+        try:
+            return await asyncio.wait_for(awaitable, self.timeout)
+        except asyncio.TimeoutError:
+            logger.error(f'{name} timed out after {self.timeout} seconds')
+
+    async def refresh_balance(self, bot):
+        exchange = bot.exchanges[bot.exchange]
+        await self.call(exchange.update_balance)
+        bot.estimated = await self.call(exchange.calc_estimated)
+        # the profit report finishes in the background
+        self.loop.create_task(self.bounded(self.call(bot._report_profit), 'Profit report'))
+
+    async def tick_bot(self, bot):
+        logger.debug('Trading...')
+
+        balance = self.loop.create_task(self.bounded(self.refresh_balance(bot), 'Balance refresh'))
+        evaluated = bot.running_stat == 't'
+        try:
+            if evaluated:
+                exchange = bot.exchanges[bot.exchange]
+                await self.bounded(exchange.update_dataframe_async(self.call, self.timeout), 'Candle update')
+        finally:
+            # strategies may read the balances and the order list
+            await balance
+
+        if evaluated:
+            await self.call(bot._evaluate)
+
+        bot._check_safety()
+        if bot.running_stat == 't' and evaluated:
+            await self.call(bot._order)
+        elif bot.running_stat == 'c':
+            await self.call(bot._clear)
+
+    async def tick(self):
+        await self.tick_bot(self.bot)
+
+    async def run_forever(self):
+        while True:
+            await asyncio.sleep(60 - time.time() % 60)
+            try:
+                await self.tick()
+            except Exception as e:
+                logger.error(f'Trade failed: {e}')
+
+    def run(self):
+        self.loop.run_until_complete(self.run_forever())
+
+
+class BotStopped(Exception):
+    pass
+
+
+def _stoppable(func, *args):
+    # a bot stopping with sys.exit must not stop the other bots of the host
+    try:
+        return func(*args)
+    except SystemExit:
+        raise BotStopped()
+
+
+class SharedData(object):
+    """Downloads shared by the bots of a BotHost, or by the components of a bot.
+
+    Callers requesting the same key at the same time wait for one download
+    instead of each making their own. Values are kept until clear(), e.g. at
+    the next tick, or for `ttl` seconds after their download, unless `keep`
+    rejects them, e.g. candles fetched before the last one closed.
+
+    Args:
+        ttl(float): default lifetime of the values in seconds, None for no limit.
+    """
+    def __init__(self, ttl=None):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._flights = dict()
+
+    def clear(self):
+        with self._lock:
+            self._flights.clear()
+
+    def _purge(self, t):
+        for key in [key for key, (_, expires) in self._flights.items() if expires <= t]:
+            del self._flights[key]
+
+    def put(self, key, value, ttl=None):
+        """Keep a value downloaded otherwise, e.g. in a bulk request."""
+        ttl = self.ttl if ttl is None else ttl
+        future = Future()
+        future.set_result(value)
+        with self._lock:
+            self._flights[key] = (future, float('inf') if ttl is None else time.monotonic() + ttl)
+
+    def get(self, key, fetch, keep=None, ttl=None):
+        """
+            Args:
+                key(tuple): what is downloaded, e.g. ('upbit', 'KRW', 'LIVE', 'candles', 'btc_1', last_date).
+                fetch(callable): downloads the value.
+                keep(callable): keep(value) is False when later callers must download it again.
+                ttl(float): lifetime of the value, defaults to the ttl of the SharedData.
+
+            return: value returned by fetch()
+        """
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            self._purge(time.monotonic())
+            future, _ = self._flights.get(key, (None, None))
+            owner = future is None
+            if owner:
+                future = Future()
+                self._flights[key] = (future, float('inf'))
+        if not owner:
+            return future.result()
+
+        try:
+            value = fetch()
+        except BaseException as e:
+            with self._lock:
+                self._flights.pop(key, None)
+            future.set_exception(e)
+            raise
+        with self._lock:
+            if self._flights.get(key, (None,))[0] is future:
+                if keep is not None and not keep(value):
+                    del self._flights[key]
+                elif ttl is not None:
+                    self._flights[key] = (future, time.monotonic() + ttl)
+        future.set_result(value)
+        return value
+
+
+class BotHost(AsyncRuntime):
+    """Runs many BotContexts in one process, on one event loop.
+
+    Each bot keeps its own exchange, with its balances, orders and candle
+    frames, and its ticks run concurrently with the other bots. Candle
+    downloads and orderbooks are fetched once per tick for all the bots
+    watching the same exchange, currency and interval.
+
+        >>> host = BotHost([bot_a, bot_b])
+        >>> host.add(bot_c)
+        >>> host.run()
+
+    A bot that stops, e.g. on its safety settings, leaves the host; an error in
+    a bot is logged and the bot trades again at the next tick.
+
+    Args:
+        bots(list): initialized BotContexts.
+        timeout(float): seconds allowed to the balance refresh and to the
+            candle fetches of a tick.
+        max_workers(int): threads running the blocking HTTP calls and the strategies.
+        loop(asyncio.AbstractEventLoop): defaults to asyncio.get_event_loop().
+    """
+    def __init__(self, bots=(), timeout=20.0, max_workers=None, loop=None):
+        super().__init__(bot=None, timeout=timeout, max_workers=max_workers, loop=loop)
+        self.bots = list()
+        self.shared = SharedData()
+        for bot in bots:
+            self.add(bot)
+
+    def add(self, bot):
+        for exchange in bot.exchanges.values():
+            exchange.share(self.shared)
+        self.bots.append(bot)
+
+    def call(self, func, *args):
+        return self.loop.run_in_executor(self.executor, _stoppable, func, *args)
+
+    async def _tick_bot(self, bot):
+        try:
+            await self.tick_bot(bot)
+        except BotStopped:
+            logger.info(f'Bot {getattr(bot, "bot_id", id(bot))} stopped')
+            self.bots.remove(bot)
+        except Exception as e:
+            logger.error(f'Trade of bot {getattr(bot, "bot_id", id(bot))} failed: {e}')
+
+    async def tick(self):
+        self.shared.clear()
+        await asyncio.gather(*(self._tick_bot(bot) for bot in list(self.bots)))
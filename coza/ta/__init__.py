@@ -9,3 +9,4 @@ Reference: https://github.com/bukosabino/ta
 """
 from .wrapper import *
 from .utils import *
+from .lazy import LazyFeatures
@@ -0,0 +1,1202 @@
+# -*- coding: utf-8 -*-
+"""
+.. module:: batch
+   :synopsis: Batched (multi-symbol) Indicators.
+
+Every function takes wide frames (time x symbols), one column per currency,
+and computes the indicator for all symbols in a single vectorized call. The
+result is a frame with the same index and columns as the input. 2-D numpy
+arrays are accepted as well and are wrapped into frames.
+
+    >>> close = wide_frame(data, 'close', interval=1)
+    >>> rsi(close, n=14)
+
+"""
+import numpy as np
+import pandas as pd
+
+from .utils import *
+
+
+def wide_frame(data, field='close', interval=None):
+    """Stack one column of every candle dataframe into a wide frame.
+
+    Args:
+        data(dict): candle dataframes keyed by '{currency}_{interval}'.
+        field(str): column to stack, e.g. 'close'.
+        interval(int): if given, only use frames of that interval and name
+            the columns by currency.
+
+    Returns:
+        pandas.DataFrame: time x symbols frame.
+    """
+    columns = {}
+    for key, df in data.items():
+        currency, _interval = key.split('_')
+        if interval is None:
+            columns[key] = df[field]
+        elif int(_interval) == int(interval):
+            columns[currency] = df[field]
+    return pd.DataFrame(columns)
+
+
+def _frame(x, like=None):
+    if isinstance(x, pd.DataFrame):
+        return x
+    if isinstance(x, pd.Series):
+        return x.to_frame()
+    x = np.asarray(x, dtype='float64')
+    if x.ndim == 1:
+        x = x.reshape(-1, 1)
+    if like is not None:
+        return pd.DataFrame(x, index=like.index, columns=like.columns)
+    return pd.DataFrame(x)
+
+
+def _frames(*args):
+    first = _frame(args[0])
+    return [first] + [_frame(x, like=first) for x in args[1:]]
+
+
+def _max(a, b):
+    # same semantics as Series.combine(other, max)
+    return a.mask(b > a, b)
+
+
+def _min(a, b):
+    # same semantics as Series.combine(other, min)
+    return a.mask(b < a, b)
+
+
+def _finish(x, fillna, value=0, is_update=False, update_number=None):
+    x = as_precision(x)
+    if fillna:
+        x = x.replace([np.inf, -np.inf], np.nan)
+        if value == 'backfill':
+            x = x.fillna(method='backfill')
+        else:
+            x = x.fillna(value)
+
+    if is_update:
+        return x.tail(update_number)
+    else:
+        return x
+
+
+def _rolling_arg(x, n, func):
+    values = x.values
+    out = np.full(values.shape, np.nan)
+    if len(values) >= n:
+        rows, cols = values.shape
+        stride_r, stride_c = values.strides
+        windows = np.lib.stride_tricks.as_strided(
+            values, shape=(rows - n + 1, n, cols), strides=(stride_r, stride_r, stride_c))
+        arg = func(windows, axis=1).astype('float64')
+        arg[np.isnan(windows).any(axis=1)] = np.nan
+        out[n - 1:] = arg
+    return pd.DataFrame(out, index=x.index, columns=x.columns)
+
+
+# ======================================
+# Volume
+
+def acc_dist_index(high, low, close, volume, fillna=True, is_update=False, update_number=None):
+    """Batched Accumulation/Distribution Index (ADI)
+
+    Args:
+        high(pandas.DataFrame): 'High' columns (time x symbols).
+        low(pandas.DataFrame): 'Low' columns.
+        close(pandas.DataFrame): 'Close' columns.
+        volume(pandas.DataFrame): 'Volume' columns.
+        fillna(bool): if True, fill nan values.
+
+    Returns:
+        pandas.DataFrame: New feature generated.
+    """
+    high, low, close, volume = _frames(high, low, close, volume)
+    clv = ((close - low) - (high - close)) / (high - low)
+    clv = clv.fillna(0.0) # float division by zero
+    ad = clv * volume
+    ad = ad + ad.shift(1)
+    return _finish(ad, fillna, 0, is_update, update_number)
+
+
+def on_balance_volume(close, volume, fillna=True, is_update=False, update_number=None):
+    """Batched On-balance volume (OBV)
+
+    Args:
+        close(pandas.DataFrame): 'Close' columns (time x symbols).
+        volume(pandas.DataFrame): 'Volume' columns.
+        fillna(bool): if True, fill nan values.
+
+    Returns:
+        pandas.DataFrame: New feature generated.
+    """
+    close, volume = _frames(close, volume)
+    obv = _obv(close, volume)
+    return _finish(obv, fillna, 0, is_update, update_number)
+
+
+def _obv(close, volume):
+    obv = volume * 0.0
+    obv = obv.mask(close > close.shift(1), volume)
+    obv = obv.mask(close < close.shift(1), -volume)
+    return obv.where(volume.notnull() | (obv != 0), 0.0)
+
+
+def on_balance_volume_mean(close, volume, n=10, fillna=True, is_update=False, update_number=None):
+    """Batched On-balance volume mean (OBV mean)
+
+    Args:
+        close(pandas.DataFrame): 'Close' columns (time x symbols).
+        volume(pandas.DataFrame): 'Volume' columns.
+        n(int): n period.
+        fillna(bool): if True, fill nan values.
+
+    Returns:
+        pandas.DataFrame: New feature generated.
+    """
+    close, volume = _frames(close, volume)
+    obv = _obv(close, volume).rolling(n).mean()
+    return _finish(obv, fillna, 0, is_update, update_number)
+
+
+def chaikin_money_flow(high, low, close, volume, n=20, fillna=True, is_update=False, update_number=None):
+    """Batched Chaikin Money Flow (CMF)
+
+    Args:
+        high(pandas.DataFrame): 'High' columns (time x symbols).
+        low(pandas.DataFrame): 'Low' columns.
+        close(pandas.DataFrame): 'Close' columns.
+        volume(pandas.DataFrame): 'Volume' columns.
+        n(int): n period.
+        fillna(bool): if True, fill nan values.
+
+    Returns:
+        pandas.DataFrame: New feature generated.
+    """
+    high, low, close, volume = _frames(high, low, close, volume)
+    mfv = ((close - low) - (high - close)) / (high - low)
+    mfv = mfv.fillna(0.0) # float division by zero
+    mfv *= volume
+    cmf = mfv.rolling(n).sum() / volume.rolling(n).sum()
+    return _finish(cmf, fillna, 0, is_update, update_number)
+
+
+def force_index(close, volume, n=2, fillna=True, is_update=False, update_number=None):
+    """Batched Force Index (FI)
+
+    Args:
+        close(pandas.DataFrame): 'Close' columns (time x symbols).
+        volume(pandas.DataFrame): 'Volume' columns.
+        n(int): n period.
+        fillna(bool): if True, fill nan values.
+
+    Returns:
+        pandas.DataFrame: New feature generated.
+    """
+    close, volume = _frames(close, volume)
+    fi = close.diff(n) * volume.diff(n)
+    return _finish(fi, fillna, 0, is_update, update_number)
+
+
+def ease_of_movement(high, low, close, volume, n=20, fillna=True, is_update=False, update_number=None):
+    """Batched Ease of movement (EoM, EMV)
+
+    Args:
+        high(pandas.DataFrame): 'High' columns (time x symbols).
+        low(pandas.DataFrame): 'Low' columns.
+        close(pandas.DataFrame): 'Close' columns.
+        volume(pandas.DataFrame): 'Volume' columns.
+        n(int): n period.
+        fillna(bool): if True, fill nan values.
+
+    Returns:
+        pandas.DataFrame: New feature generated.
+    """
+    high, low, close, volume = _frames(high, low, close, volume)
+    emv = (high.diff(1) + low.diff(1)) * (high - low) / (2 * volume)
+    emv = emv.rolling(n).mean()
+    return _finish(emv, fillna, 0, is_update, update_number)
+
+
+def volume_price_trend(close, volume, fillna=True, is_update=False, update_number=None):
+    """Batched Volume-price trend (VPT)
+
+    Args:
+        close(pandas.DataFrame): 'Close' columns (time x symbols).
+        volume(pandas.DataFrame): 'Volume' columns.
+        fillna(bool): if True, fill nan values.
+
+    Returns:
+        pandas.DataFrame: New feature generated.
+    """
+    close, volume = _frames(close, volume)
+    vpt = volume * ((close - close.shift(1)) / close.shift(1))
+    vpt = vpt.shift(1) + vpt
+    return _finish(vpt, fillna, 0, is_update, update_number)
+
+
+def negative_volume_index(close, volume, fillna=True, is_update=False, update_number=None):
+    """Batched Negative Volume Index (NVI)
+
+    The running product of the price changes on days with decreasing volume,
+    starting at 1000.
+
+    Args:
+        close(pandas.DataFrame): 'Close' columns (time x symbols).
+        volume(pandas.DataFrame): 'Volume' columns.
+        fillna(bool): if True, fill nan values with 1000.
+
+    Returns:
+        pandas.DataFrame: New feature generated.
+    """
+    close, volume = _frames(close, volume)
+    factor = (1.0 + close.pct_change()).where(volume.shift(1) > volume, 1.0)
+    factor.iloc[0] = 1.0
+    nvi = 1000 * factor.cumprod()
+    return _finish(nvi, fillna, 1000, is_update, update_number)
+
+
+# ======================================
+# Volatility
+
+def average_true_range(high, low, close, n=14, fillna=True, is_update=False, update_number=None):
+    """Batched Average True Range (ATR)
+
+    Args:
+        high(pandas.DataFrame): 'High' columns (time x symbols).
+        low(pandas.DataFrame): 'Low' columns.
+        close(pandas.DataFrame): 'Close' columns.
+        n(int): n period.
+        fillna(bool): if True, fill nan values.
+
+    Returns:
+        pandas.DataFrame: New feature generated.
+    """
+    high, low, close = _frames(high, low, close)
+    cs = close.shift(1)
+    tr = _max(high, cs) - _min(low, cs)
+
+    # atr[i] = (atr[i - 1] * (n - 1) + tr[i]) / n, seeded with the mean true range
+    seed = tr.copy()
+    seed.iloc[0] = tr.iloc[1:].mean()
+    atr = seed.ewm(alpha=1.0 / n, adjust=False).mean()
+    return _finish(atr, fillna, 0, is_update, update_number)
+
+
+def bollinger_mavg(close, n=20, fillna=True, is_update=False, update_number=None):
+    """Batched Bollinger Bands (BB) N-period simple moving average
+
+    Args:
+        close(pandas.DataFrame): 'Close' columns (time x symbols).
+        n(int): n period.
+
+    Returns:
+        pandas.DataFrame: New feature generated.
+    """
+    close = _frame(close)
+    mavg = close.rolling(n).mean()
+    return _finish(mavg, fillna, 'backfill', is_update, update_number)
+
+
+def bollinger_hband(close, n=20, ndev=2, fillna=True, is_update=False, update_number=None):
+    """Batched Bollinger Bands (BB) upper band
+
+    Args:
+        close(pandas.DataFrame): 'Close' columns (time x symbols).
+        n(int): n period.
+        ndev(int): n factor standard deviation
+
+    Returns:
+        pandas.DataFrame: New feature generated.
+    """
+    close = _frame(close)
+    hband = close.rolling(n).mean() + ndev*close.rolling(n).std()
+    return _finish(hband, fillna, 'backfill', is_update, update_number)
+
+
+def bollinger_lband(close, n=20, ndev=2, fillna=True, is_update=False, update_number=None):
+    """Batched Bollinger Bands (BB) lower band
+
+    Args:
+        close(pandas.DataFrame): 'Close' columns (time x symbols).
+        n(int): n period.
+        ndev(int): n factor standard deviation
+
+    Returns:
+        pandas.DataFrame: New feature generated.
+    """
+    close = _frame(close)
+    lband = close.rolling(n).mean() - ndev*close.rolling(n).std()
+    return _finish(lband, fillna, 'backfill', is_update, update_number)
+
+
+def bollinger_hband_indicator(close, n=20, ndev=2, fillna=True, is_update=False, update_number=None):
+    """Batched Bollinger High Band Indicator
+
+    Args:
+        close(pandas.DataFrame): 'Close' columns (time x symbols).
+        n(int): n period.
+        ndev(int): n factor standard deviation
+
+    Returns:
+        pandas.DataFrame: New feature generated.
+    """
+    close = _frame(close)
+    hband = close.rolling(n).mean() + ndev*close.rolling(n).std()
+    hband = (close > hband).astype('float64')
+    return _finish(hband, fillna, 0, is_update, update_number)
+
+
+def bollinger_lband_indicator(close, n=20, ndev=2, fillna=True, is_update=False, update_number=None):
+    """Batched Bollinger Low Band Indicator
+
+    Args:
+        close(pandas.DataFrame): 'Close' columns (time x symbols).
+        n(int): n period.
+        ndev(int): n factor standard deviation
+
+    Returns:
+        pandas.DataFrame: New feature generated.
+    """
+    close = _frame(close)
+    lband = close.rolling(n).mean() - ndev*close.rolling(n).std()
+    lband = (close < lband).astype('float64')
+    return _finish(lband, fillna, 0, is_update, update_number)
+
+
+def keltner_channel_central(high, low, close, n=10, fillna=True, is_update=False, update_number=None):
+    """Batched Keltner channel (KC) central line
+
+    Args:
+        high(pandas.DataFrame): 'High' columns (time x symbols).
+        low(pandas.DataFrame): 'Low' columns.
+        close(pandas.DataFrame): 'Close' columns.
+        n(int): n period.
+
+    Returns:
+        pandas.DataFrame: New feature generated.
+    """
+    high, low, close = _frames(high, low, close)
+    tp = ((high + low + close) / 3.0).rolling(n).mean()
+    return _finish(tp, fillna, 'backfill', is_update, update_number)
+
+
+def keltner_channel_hband(high, low, close, n=10, fillna=True, is_update=False, update_number=None):
+    """Batched Keltner channel (KC) high band
+
+    Args:
+        high(pandas.DataFrame): 'High' columns (time x symbols).
+        low(pandas.DataFrame): 'Low' columns.
+        close(pandas.DataFrame): 'Close' columns.
+        n(int): n period.
+
+    Returns:
+        pandas.DataFrame: New feature generated.
+    """
+    high, low, close = _frames(high, low, close)
+    tp = (((4*high) - (2*low) + close) / 3.0).rolling(n).mean()
+    return _finish(tp, fillna, 'backfill', is_update, update_number)
+
+
+def keltner_channel_lband(high, low, close, n=10, fillna=True, is_update=False, update_number=None):
+    """Batched Keltner channel (KC) low band
+
+    Args:
+        high(pandas.DataFrame): 'High' columns (time x symbols).
+        low(pandas.DataFrame): 'Low' columns.
+        close(pandas.DataFrame): 'Close' columns.
+        n(int): n period.
+
+    Returns:
+        pandas.DataFrame: New feature generated.
+    """
+    high, low, close = _frames(high, low, close)
+    tp = (((-2*high) + (4*low) + close) / 3.0).rolling(n).mean()
+    return _finish(tp, fillna, 'backfill', is_update, update_number)
+
+
+def keltner_channel_hband_indicator(high, low, close, n=10, fillna=True, is_update=False, update_number=None):
+    """Batched Keltner Channel High Band Indicator (KC)
+
+    Args:
+        high(pandas.DataFrame): 'High' columns (time x symbols).
+        low(pandas.DataFrame): 'Low' columns.
+        close(pandas.DataFrame): 'Close' columns.
+        n(int): n period.
+
+    Returns:
+        pandas.DataFrame: New feature generated.
+    """
+    high, low, close = _frames(high, low, close)
+    hband = ((4*high) - (2*low) + close) / 3.0
+    hband = (close > hband).astype('float64')
+    return _finish(hband, fillna, 0, is_update, update_number)
+
+
+def keltner_channel_lband_indicator(high, low, close, n=10, fillna=True, is_update=False, update_number=None):
+    """Batched Keltner Channel Low Band Indicator (KC)
+
+    Args:
+        high(pandas.DataFrame): 'High' columns (time x symbols).
+        low(pandas.DataFrame): 'Low' columns.
+        close(pandas.DataFrame): 'Close' columns.
+        n(int): n period.
+
+    Returns:
+        pandas.DataFrame: New feature generated.
+    """
+    high, low, close = _frames(high, low, close)
+    lband = ((-2*high) + (4*low) + close) / 3.0
+    lband = (close < lband).astype('float64')
+    return _finish(lband, fillna, 0, is_update, update_number)
+
+
+def donchian_channel_hband(close, n=20, fillna=True, is_update=False, update_number=None):
+    """Batched Donchian channel (DC) upper band
+
+    Args:
+        close(pandas.DataFrame): 'Close' columns (time x symbols).
+        n(int): n period.
+
+    Returns:
+        pandas.DataFrame: New feature generated.
+    """
+    close = _frame(close)
+    hband = close.rolling(n).max()
+    return _finish(hband, fillna, 'backfill', is_update, update_number)
+
+
+def donchian_channel_lband(close, n=20, fillna=True, is_update=False, update_number=None):
+    """Batched Donchian channel (DC) lower band
+
+    Args:
+        close(pandas.DataFrame): 'Close' columns (time x symbols).
+        n(int): n period.
+
+    Returns:
+        pandas.DataFrame: New feature generated.
+    """
+    close = _frame(close)
+    lband = close.rolling(n).min()
+    return _finish(lband, fillna, 'backfill', is_update, update_number)
+
+
+def donchian_channel_hband_indicator(close, n=20, fillna=True, is_update=False, update_number=None):
+    """Batched Donchian High Band Indicator
+
+    Args:
+        close(pandas.DataFrame): 'Close' columns (time x symbols).
+        n(int): n period.
+
+    Returns:
+        pandas.DataFrame: New feature generated.
+    """
+    close = _frame(close)
+    hband = (close >= close.rolling(n).max()).astype('float64')
+    return _finish(hband, fillna, 0, is_update, update_number)
+
+
+def donchian_channel_lband_indicator(close, n=20, fillna=True, is_update=False, update_number=None):
+    """Batched Donchian Low Band Indicator
+
+    Args:
+        close(pandas.DataFrame): 'Close' columns (time x symbols).
+        n(int): n period.
+
+    Returns:
+        pandas.DataFrame: New feature generated.
+    """
+    close = _frame(close)
+    lband = (close <= close.rolling(n).min()).astype('float64')
+    return _finish(lband, fillna, 0, is_update, update_number)
+
+
+# ======================================
+# Trend
+
+def macd(close, n_fast=12, n_slow=26, fillna=True, is_update=False, update_number=None):
+    """Batched Moving Average Convergence Divergence (MACD)
+
+    Args:
+        close(pandas.DataFrame): 'Close' columns (time x symbols).
+        n_fast(int): n period short-term.
+        n_slow(int): n period long-term.
+        fillna(bool): if True, fill nan values.
+
+    Returns:
+        pandas.DataFrame: New feature generated.
+    """
+    close = _frame(close)
+    macd = ema(close, n_fast, fillna) - ema(close, n_slow, fillna)
+    return _finish(macd, fillna, 0, is_update, update_number)
+
+
+def macd_signal(close, n_fast=12, n_slow=26, n_sign=9, fillna=True, is_update=False, update_number=None):
+    """Batched Moving Average Convergence Divergence (MACD Signal)
+
+    Args:
+        close(pandas.DataFrame): 'Close' columns (time x symbols).
+        n_fast(int): n period short-term.
+        n_slow(int): n period long-term.
+        n_sign(int): n period to signal.
+        fillna(bool): if True, fill nan values.
+
+    Returns:
+        pandas.DataFrame: New feature generated.
+    """
+    close = _frame(close)
+    macd = ema(close, n_fast, fillna) - ema(close, n_slow, fillna)
+    macd_signal = ema(macd, n_sign, fillna)
+    return _finish(macd_signal, fillna, 0, is_update, update_number)
+
+
+def macd_diff(close, n_fast=12, n_slow=26, n_sign=9, fillna=True, is_update=False, update_number=None):
+    """Batched Moving Average Convergence Divergence (MACD Diff)
+
+    Args:
+        close(pandas.DataFrame): 'Close' columns (time x symbols).
+        n_fast(int): n period short-term.
+        n_slow(int): n period long-term.
+        n_sign(int): n period to signal.
+        fillna(bool): if True, fill nan values.
+
+    Returns:
+        pandas.DataFrame: New feature generated.
+    """
+    close = _frame(close)
+    macd = ema(close, n_fast, fillna) - ema(close, n_slow, fillna)
+    macd_diff = macd - ema(macd, n_sign, fillna)
+    return _finish(macd_diff, fillna, 0, is_update, update_number)
+
+
+def ema_indicator(close, n=12, fillna=False, is_update=False, update_number=None):
+    """Batched EMA
+
+    Args:
+        close(pandas.DataFrame): 'Close' columns (time x symbols).
+        n(int): n period.
+        fillna(bool): if True, fill nan values.
+
+    Returns:
+        pandas.DataFrame: New feature generated.
+    """
+    ema_ = ema(_frame(close), n, fillna)
+
+    if is_update:
+        return ema_.tail(update_number)
+    else:
+        return ema_
+
+
+def _directional(high, low, close, n):
+    cs = close.shift(1)
+    trs = (_max(high, cs) - _min(low, cs)).rolling(n).sum()
+
+    up = high - high.shift(1)
+    dn = low.shift(1) - low
+
+    pos = ((up > dn) & (up > 0)) * up
+    neg = ((dn > up) & (dn > 0)) * dn
+
+    dip = 100 * pos.rolling(n).sum() / trs
+    din = 100 * neg.rolling(n).sum() / trs
+    return dip, din
+
+
+def adx(high, low, close, n=14, fillna=True, is_update=False, update_number=None):
+    """Batched Average Directional Movement Index (ADX)
+
+    Args:
+        high(pandas.DataFrame): 'High' columns (time x symbols).
+        low(pandas.DataFrame): 'Low' columns.
+        close(pandas.DataFrame): 'Close' columns.
+        n(int): n period.
+        fillna(bool): if True, fill nan values.
+
+    Returns:
+        pandas.DataFrame: New feature generated.
+    """
+    high, low, close = _frames(high, low, close)
+    dip, din = _directional(high, low, close, n)
+    dx = 100 * np.abs((dip - din)/(dip + din))
+    adx = ema(dx, n)
+    return _finish(adx, fillna, 40, is_update, update_number)
+
+
+def adx_pos(high, low, close, n=14, fillna=True, is_update=False, update_number=None):
+    """Batched Average Directional Movement Index Positive (ADX)
+
+    Args:
+        high(pandas.DataFrame): 'High' columns (time x symbols).
+        low(pandas.DataFrame): 'Low' columns.
+        close(pandas.DataFrame): 'Close' columns.
+        n(int): n period.
+        fillna(bool): if True, fill nan values.
+
+    Returns:
+        pandas.DataFrame: New feature generated.
+    """
+    high, low, close = _frames(high, low, close)
+    dip, din = _directional(high, low, close, n)
+    return _finish(dip, fillna, 20, is_update, update_number)
+
+
+def adx_neg(high, low, close, n=14, fillna=True, is_update=False, update_number=None):
+    """Batched Average Directional Movement Index Negative (ADX)
+
+    Args:
+        high(pandas.DataFrame): 'High' columns (time x symbols).
+        low(pandas.DataFrame): 'Low' columns.
+        close(pandas.DataFrame): 'Close' columns.
+        n(int): n period.
+        fillna(bool): if True, fill nan values.
+
+    Returns:
+        pandas.DataFrame: New feature generated.
+    """
+    high, low, close = _frames(high, low, close)
+    dip, din = _directional(high, low, close, n)
+    return _finish(din, fillna, 20, is_update, update_number)
+
+
+def adx_indicator(high, low, close, n=14, fillna=True, is_update=False, update_number=None):
+    """Batched Average Directional Movement Index Indicator (ADX)
+
+    Args:
+        high(pandas.DataFrame): 'High' columns (time x symbols).
+        low(pandas.DataFrame): 'Low' columns.
+        close(pandas.DataFrame): 'Close' columns.
+        n(int): n period.
+        fillna(bool): if True, fill nan values.
+
+    Returns:
+        pandas.DataFrame: New feature generated.
+    """
+    high, low, close = _frames(high, low, close)
+    dip, din = _directional(high, low, close, n)
+    adx_ind = ((dip - din) > 0).astype('int64')
+
+    if is_update:
+        return adx_ind.tail(update_number)
+    else:
+        return adx_ind
+
+
+def vortex_indicator_pos(high, low, close, n=14, fillna=True, is_update=False, update_number=None):
+    """Batched Vortex Indicator (VI) positive
+
+    Args:
+        high(pandas.DataFrame): 'High' columns (time x symbols).
+        low(pandas.DataFrame): 'Low' columns.
+        close(pandas.DataFrame): 'Close' columns.
+        n(int): n period.
+        fillna(bool): if True, fill nan values.
+
+    Returns:
+        pandas.DataFrame: New feature generated.
+    """
+    high, low, close = _frames(high, low, close)
+    cs = close.shift(1)
+    trn = (_max(high, cs) - _min(low, cs)).rolling(n).sum()
+    vip = np.abs(high - low.shift(1)).rolling(n).sum() / trn
+    return _finish(vip, fillna, 1, is_update, update_number)
+
+
+def vortex_indicator_neg(high, low, close, n=14, fillna=True, is_update=False, update_number=None):
+    """Batched Vortex Indicator (VI) negative
+
+    Args:
+        high(pandas.DataFrame): 'High' columns (time x symbols).
+        low(pandas.DataFrame): 'Low' columns.
+        close(pandas.DataFrame): 'Close' columns.
+        n(int): n period.
+        fillna(bool): if True, fill nan values.
+
+    Returns:
+        pandas.DataFrame: New feature generated.
+    """
+    high, low, close = _frames(high, low, close)
+    cs = close.shift(1)
+    trn = (_max(high, cs) - _min(low, cs)).rolling(n).sum()
+    vin = np.abs(low - high.shift(1)).rolling(n).sum() / trn
+    return _finish(vin, fillna, 1, is_update, update_number)
+
+
+def trix(close, n=15, fillna=True, is_update=False, update_number=None):
+    """Batched Trix (TRIX)
+
+    Args:
+        close(pandas.DataFrame): 'Close' columns (time x symbols).
+        n(int): n period.
+        fillna(bool): if True, fill nan values.
+
+    Returns:
+        pandas.DataFrame: New feature generated.
+    """
+    ema3 = ema(ema(ema(_frame(close), n, fillna), n, fillna), n, fillna)
+    trix = (ema3 - ema3.shift(1)) / ema3.shift(1)
+    trix *= 100
+    return _finish(trix, fillna, 0, is_update, update_number)
+
+
+def mass_index(high, low, n=9, n2=25, fillna=True, is_update=False, update_number=None):
+    """Batched Mass Index (MI)
+
+    Args:
+        high(pandas.DataFrame): 'High' columns (time x symbols).
+        low(pandas.DataFrame): 'Low' columns.
+        n(int): n low period.
+        n2(int): n high period.
+        fillna(bool): if True, fill nan values.
+
+    Returns:
+        pandas.DataFrame: New feature generated.
+    """
+    high, low = _frames(high, low)
+    ema1 = ema(high - low, n, fillna)
+    ema2 = ema(ema1, n, fillna)
+    mass = (ema1 / ema2).rolling(n2).sum()
+    return _finish(mass, fillna, n2, is_update, update_number)
+
+
+def cci(high, low, close, n=20, c=0.015, fillna=True, is_update=False, update_number=None):
+    """Batched Commodity Channel Index (CCI)
+
+    Args:
+        high(pandas.DataFrame): 'High' columns (time x symbols).
+        low(pandas.DataFrame): 'Low' columns.
+        close(pandas.DataFrame): 'Close' columns.
+        n(int): n period.
+        c(int): constant.
+        fillna(bool): if True, fill nan values.
+
+    Returns:
+        pandas.DataFrame: New feature generated.
+    """
+    high, low, close = _frames(high, low, close)
+    pp = (high+low+close)/3
+    cci = (pp-pp.rolling(n).mean())/pp.rolling(n).std()
+    cci = 1/c * cci
+    return _finish(cci, fillna, 0, is_update, update_number)
+
+
+def dpo(close, n=20, fillna=True, is_update=False, update_number=None):
+    """Batched Detrended Price Oscillator (DPO)
+
+    Args:
+        close(pandas.DataFrame): 'Close' columns (time x symbols).
+        n(int): n period.
+        fillna(bool): if True, fill nan values.
+
+    Returns:
+        pandas.DataFrame: New feature generated.
+    """
+    close = _frame(close)
+    dpo = close.shift(int((0.5 * n) + 1)) - close.rolling(n).mean()
+    return _finish(dpo, fillna, 0, is_update, update_number)
+
+
+def _kst(close, r1, r2, r3, r4, n1, n2, n3, n4):
+    rocma1 = ((close - close.shift(r1)) / close.shift(r1)).rolling(n1).mean()
+    rocma2 = ((close - close.shift(r2)) / close.shift(r2)).rolling(n2).mean()
+    rocma3 = ((close - close.shift(r3)) / close.shift(r3)).rolling(n3).mean()
+    rocma4 = ((close - close.shift(r4)) / close.shift(r4)).rolling(n4).mean()
+    return 100*(rocma1 + 2*rocma2 + 3*rocma3 + 4*rocma4)
+
+
+def kst(close, r1=10, r2=15, r3=20, r4=30, n1=10, n2=10, n3=10, n4=15, fillna=True, is_update=False, update_number=None):
+    """Batched KST Oscillator (KST)
+
+    Args:
+        close(pandas.DataFrame): 'Close' columns (time x symbols).
+        r1(int): r1 period.
+        r2(int): r2 period.
+        r3(int): r3 period.
+        r4(int): r4 period.
+        n1(int): n1 smoothed period.
+        n2(int): n2 smoothed period.
+        n3(int): n3 smoothed period.
+        n4(int): n4 smoothed period.
+        fillna(bool): if True, fill nan values.
+
+    Returns:
+        pandas.DataFrame: New feature generated.
+    """
+    kst = _kst(_frame(close), r1, r2, r3, r4, n1, n2, n3, n4)
+    return _finish(kst, fillna, 0, is_update, update_number)
+
+
+def kst_sig(close, r1=10, r2=15, r3=20, r4=30, n1=10, n2=10, n3=10, n4=15, nsig=9, fillna=True, is_update=False, update_number=None):
+    """Batched KST Oscillator (KST Signal)
+
+    Args:
+        close(pandas.DataFrame): 'Close' columns (time x symbols).
+        r1(int): r1 period.
+        r2(int): r2 period.
+        r3(int): r3 period.
+        r4(int): r4 period.
+        n1(int): n1 smoothed period.
+        n2(int): n2 smoothed period.
+        n3(int): n3 smoothed period.
+        n4(int): n4 smoothed period.
+        nsig(int): n period to signal.
+        fillna(bool): if True, fill nan values.
+
+    Returns:
+        pandas.DataFrame: New feature generated.
+    """
+    kst_sig = _kst(_frame(close), r1, r2, r3, r4, n1, n2, n3, n4).rolling(nsig).mean()
+    return _finish(kst_sig, fillna, 0, is_update, update_number)
+
+
+def ichimoku_a(high, low, n1=9, n2=26, visual=False, fillna=True, is_update=False, update_number=None):
+    """Batched Ichimoku Kinkō Hyō (Ichimoku) span A
+
+    Args:
+        high(pandas.DataFrame): 'High' columns (time x symbols).
+        low(pandas.DataFrame): 'Low' columns.
+        n1(int): n1 low period.
+        n2(int): n2 medium period.
+        fillna(bool): if True, fill nan values.
+
+    Returns:
+        pandas.DataFrame: New feature generated.
+    """
+    high, low = _frames(high, low)
+    conv = 0.5 * (high.rolling(n1).max() + low.rolling(n1).min())
+    base = 0.5 * (high.rolling(n2).max() + low.rolling(n2).min())
+    spana = 0.5 * (conv + base)
+    if visual:
+        spana = spana.shift(n2)
+    return _finish(spana, fillna, 'backfill', is_update, update_number)
+
+
+def ichimoku_b(high, low, n2=26, n3=52, visual=False, fillna=True, is_update=False, update_number=None):
+    """Batched Ichimoku Kinkō Hyō (Ichimoku) span B
+
+    Args:
+        high(pandas.DataFrame): 'High' columns (time x symbols).
+        low(pandas.DataFrame): 'Low' columns.
+        n2(int): n2 medium period.
+        n3(int): n3 high period.
+        fillna(bool): if True, fill nan values.
+
+    Returns:
+        pandas.DataFrame: New feature generated.
+    """
+    high, low = _frames(high, low)
+    spanb = 0.5 * (high.rolling(n3).max() + low.rolling(n3).min())
+    if visual:
+        spanb = spanb.shift(n2)
+    return _finish(spanb, fillna, 'backfill', is_update, update_number)
+
+
+def aroon_up(close, n=25, fillna=False, is_update=False, update_number=None):
+    """Batched Aroon Indicator (AI) up
+
+    Args:
+        close(pandas.DataFrame): 'Close' columns (time x symbols).
+        n(int): n period.
+        fillna(bool): if True, fill nan values.
+
+    Returns:
+        pandas.DataFrame: New feature generated.
+    """
+    aroon_up = (_rolling_arg(_frame(close), n, np.argmax) + 1) / n * 100
+    return _finish(aroon_up, fillna, 0, is_update, update_number)
+
+
+def aroon_down(close, n=25, fillna=False, is_update=False, update_number=None):
+    """Batched Aroon Indicator (AI) down
+
+    Args:
+        close(pandas.DataFrame): 'Close' columns (time x symbols).
+        n(int): n period.
+        fillna(bool): if True, fill nan values.
+
+    Returns:
+        pandas.DataFrame: New feature generated.
+    """
+    aroon_down = (_rolling_arg(_frame(close), n, np.argmin) + 1) / n * 100
+    return _finish(aroon_down, fillna, 0, is_update, update_number)
+
+
+# ======================================
+# Momentum
+
+def rsi(close, n=14, fillna=True, is_update=False, update_number=None):
+    """Batched Relative Strength Index (RSI)
+
+    Args:
+        close(pandas.DataFrame): 'Close' columns (time x symbols).
+        n(int): n period.
+        fillna(bool): if True, fill nan values.
+
+    Returns:
+        pandas.DataFrame: New feature generated.
+    """
+    diff = _frame(close).diff()
+    which_dn = diff < 0
+    up = diff.mask(which_dn, 0)
+    dn = (diff*0).mask(which_dn, -diff)
+
+    emaup = ema(up, n, fillna)
+    emadn = ema(dn, n, fillna)
+
+    rsi = 100 * emaup/(emaup + emadn)
+    return _finish(rsi, fillna, 50, is_update, update_number)
+
+
+def money_flow_index(high, low, close, volume, n=14, fillna=True, is_update=False, update_number=None):
+    """Batched Money Flow Index (MFI)
+
+    Args:
+        high(pandas.DataFrame): 'High' columns (time x symbols).
+        low(pandas.DataFrame): 'Low' columns.
+        close(pandas.DataFrame): 'Close' columns.
+        volume(pandas.DataFrame): 'Volume' columns.
+        n(int): n period.
+        fillna(bool): if True, fill nan values.
+
+    Returns:
+        pandas.DataFrame: New feature generated.
+    """
+    high, low, close, volume = _frames(high, low, close, volume)
+    mf = ((high + low + close) / 3.0) * volume
+
+    n_positive_mf = mf.where(close > close.shift(1), 0.0).rolling(n).sum()
+    n_negative_mf = mf.where(close < close.shift(1), 0.0).rolling(n).sum()
+
+    mr = n_positive_mf / n_negative_mf
+    mr = (100 - (100 / (1 + mr)))
+    return _finish(mr, fillna, 50, is_update, update_number)
+
+
+def tsi(close, r=25, s=13, fillna=True, is_update=False, update_number=None):
+    """Batched True strength index (TSI)
+
+    Args:
+        close(pandas.DataFrame): 'Close' columns (time x symbols).
+        r(int): high period.
+        s(int): low period.
+        fillna(bool): if True, fill nan values.
+
+    Returns:
+        pandas.DataFrame: New feature generated.
+    """
+    close = _frame(close)
+    m = close - close.shift(1)
+    m1 = m.ewm(r).mean().ewm(s).mean()
+    m2 = abs(m).ewm(r).mean().ewm(s).mean()
+    tsi = m1/m2
+    tsi *= 100
+    return _finish(tsi, fillna, 0, is_update, update_number)
+
+
+def uo(high, low, close, s=7, m=14, l=28, ws=4.0, wm=2.0, wl=1.0, fillna=True, is_update=False, update_number=None):
+    """Batched Ultimate Oscillator
+
+    Args:
+        high(pandas.DataFrame): 'High' columns (time x symbols).
+        low(pandas.DataFrame): 'Low' columns.
+        close(pandas.DataFrame): 'Close' columns.
+        s(int): short period
+        m(int): medium period
+        l(int): long period
+        ws(float): weight of short BP average for UO
+        wm(float): weight of medium BP average for UO
+        wl(float): weight of long BP average for UO
+        fillna(bool): if True, fill nan values with 50.
+
+    Returns:
+        pandas.DataFrame: New feature generated.
+    """
+    high, low, close = _frames(high, low, close)
+    cs = close.shift(1)
+    min_l_or_pc = _min(cs, low)
+    max_h_or_pc = _max(cs, high)
+
+    bp = close - min_l_or_pc
+    tr = max_h_or_pc - min_l_or_pc
+
+    avg_s = bp.rolling(s).sum() / tr.rolling(s).sum()
+    avg_m = bp.rolling(m).sum() / tr.rolling(m).sum()
+    avg_l = bp.rolling(l).sum() / tr.rolling(l).sum()
+
+    uo = 100.0 * ((ws * avg_s) + (wm * avg_m) + (wl * avg_l)) / (ws + wm + wl)
+    if fillna:
+        uo = uo.fillna(50)
+
+    if is_update:
+        return uo.tail(update_number)
+    else:
+        return uo
+
+
+def stoch_k(high, low, close, n=14, fillna=True, is_update=False, update_number=None):
+    """Batched Stochastic Oscillator
+
+    Args:
+        high(pandas.DataFrame): 'High' columns (time x symbols).
+        low(pandas.DataFrame): 'Low' columns.
+        close(pandas.DataFrame): 'Close' columns.
+        n(int): n period.
+        fillna(bool): if True, fill nan values.
+
+    Returns:
+        pandas.DataFrame: New feature generated.
+    """
+    high, low, close = _frames(high, low, close)
+    smin = low.rolling(n).min()
+    smax = high.rolling(n).max()
+    stk = 100 * (close - smin) / (smax - smin)
+    return _finish(stk, fillna, 50, is_update, update_number)
+
+
+def stoch_k_d(high, low, close, n=14, d_n=3, fillna=True, is_update=False, update_number=None):
+    """Batched Stochastic Oscillator Signal
+
+    Args:
+        high(pandas.DataFrame): 'High' columns (time x symbols).
+        low(pandas.DataFrame): 'Low' columns.
+        close(pandas.DataFrame): 'Close' columns.
+        n(int): n period.
+        d_n(int): sma period over stoch_k
+        fillna(bool): if True, fill nan values.
+
+    Returns:
+        pandas.DataFrame: New feature generated.
+    """
+    std = stoch_k(high, low, close, n, fillna=fillna).rolling(d_n).mean()
+    return _finish(std, fillna, 50, is_update, update_number)
+
+
+def wr(high, low, close, lbp=14, fillna=True, is_update=False, update_number=None):
+    """Batched Williams %R
+
+    Args:
+        high(pandas.DataFrame): 'High' columns (time x symbols).
+        low(pandas.DataFrame): 'Low' columns.
+        close(pandas.DataFrame): 'Close' columns.
+        lbp(int): lookback period
+        fillna(bool): if True, fill nan values with -50.
+
+    Returns:
+        pandas.DataFrame: New feature generated.
+    """
+    high, low, close = _frames(high, low, close)
+    hh = high.rolling(lbp).max()
+    ll = low.rolling(lbp).min()
+    wr = -100 * (hh - close) / (hh - ll)
+    return _finish(wr, fillna, -50, is_update, update_number)
+
+
+def ao(high, low, s=5, l=34, fillna=True, is_update=False, update_number=None):
+    """Batched Awesome Oscillator
+
+    Args:
+        high(pandas.DataFrame): 'High' columns (time x symbols).
+        low(pandas.DataFrame): 'Low' columns.
+        s(int): short period
+        l(int): long period
+        fillna(bool): if True, fill nan values with -50.
+
+    Returns:
+        pandas.DataFrame: New feature generated.
+    """
+    high, low = _frames(high, low)
+    mp = 0.5 * (high + low)
+    ao = mp.rolling(s).mean() - mp.rolling(l).mean()
+    return _finish(ao, fillna, 0, is_update, update_number)
+
+
+def stochastic_rsi(close, rsi_n=14, win_size=3, fillna=True, is_update=False, update_number=None):
+    """Batched stochastic RSI
+
+    Args:
+        close(pandas.DataFrame): 'Close' columns (time x symbols).
+        rsi_n(int): n period of RSI.
+        win_size(int): window size of the stochastic.
+
+    Returns:
+        pandas.DataFrame: stochastic RSI
+    """
+    r_sr = rsi(close, n=rsi_n, fillna=fillna)
+    h = r_sr.rolling(win_size + 1, min_periods=1).max()
+    l = r_sr.rolling(win_size + 1, min_periods=1).min()
+    so_rsi = (r_sr - l) / (h - l + 1e-14)
+
+    if is_update:
+        return so_rsi.tail(update_number)
+    else:
+        return so_rsi
+
+
+def stochastic_rsi_k_d(close, rsi_n=14, win_size_k=3, win_size_d=3, fillna=True, is_update=False, update_number=None):
+    """Batched stochastic RSI k d
+
+    Args:
+        close(pandas.DataFrame): 'Close' columns (time x symbols).
+        rsi_n(int): n period of RSI.
+        win_size_k(int): window size of %K.
+        win_size_d(int): span of %D.
+
+    Returns:
+        tuple(pandas.DataFrame, pandas.DataFrame): %K and %D
+    """
+    so_rsi_k = stochastic_rsi(close, rsi_n=rsi_n, win_size=win_size_k, fillna=fillna)
+    so_rsi_d = so_rsi_k.ewm(span=win_size_d, min_periods=win_size_d).mean()
+
+    if is_update:
+        return so_rsi_k.tail(update_number), so_rsi_d.tail(update_number)
+    else:
+        return so_rsi_k, so_rsi_d
+
+
+# ======================================
+# Others
+
+def daily_return(close, fillna=True, is_update=False, update_number=None):
+    """Batched Daily Return (DR)
+
+    Args:
+        close(pandas.DataFrame): 'Close' columns (time x symbols).
+        fillna(bool): if True, fill nan values.
+
+    Returns:
+        pandas.DataFrame: New feature generated.
+    """
+    close = _frame(close)
+    dr = (close / close.shift(1)) - 1
+    dr *= 100
+    if fillna:
+        dr = dr.fillna(0)
+
+    if is_update:
+        return dr.tail(update_number)
+    else:
+        return dr
+
+
+def cumulative_return(close, fillna=True, is_update=False, update_number=None):
+    """Batched Cumulative Return (CR)
+
+    Args:
+        close(pandas.DataFrame): 'Close' columns (time x symbols).
+        fillna(bool): if True, fill nan values.
+
+    Returns:
+        pandas.DataFrame: New feature generated.
+    """
+    close = _frame(close)
+    cr = (close / close.iloc[0]) - 1
+    cr *= 100
+    if fillna:
+        cr = cr.fillna(method='backfill')
+
+    if is_update:
+        return cr.tail(update_number)
+    else:
+        return cr
@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+"""
+.. module:: benchmark
+   :synopsis: Benchmark of the coza.ta indicators and wrappers.
+
+Times every public indicator of momentum, trend, volatility, volume and others
+and every add_*_ta wrapper on synthetic OHLCV data, in full and is_update mode,
+and writes a JSON report:
+
+    $ python -m coza.ta.benchmark --sizes 1000 100000 1000000 --output bench.json
+    $ python -m coza.ta.benchmark --sizes 1000 --compare bench.json
+
+"""
+import argparse
+import inspect
+import json
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from coza.utils import generate_pseudo_periodic_data
+from . import kernels
+from . import momentum, others, trend, volatility, volume, wrapper
+
+
+MODULES = (momentum, trend, volatility, volume, others)
+WRAPPERS = (
+    ('add_volume_ta', ('high', 'low', 'close', 'volume')),
+    ('add_volatility_ta', ('high', 'low', 'close')),
+    ('add_trend_ta', ('high', 'low', 'close')),
+    ('add_momentum_ta', ('high', 'low', 'close', 'volume')),
+    ('add_others_ta', ('close',)),
+    ('add_all_ta_features', ('open', 'high', 'low', 'close', 'volume')),
+)
+ROLES = ('open', 'high', 'low', 'close', 'volume')
+DEFAULT_SIZES = (1000, 100000, 1000000)
+
+
+def make_ohlcv(rows, seed=0):
+    """Synthetic 1-minute candles built with generate_pseudo_periodic_data.
+
+    Args:
+        rows(int): number of candles.
+        seed(int): seed of the gaussian noise.
+
+    Returns:
+        pandas.DataFrame: open, high, low, close, volume columns.
+    """
+    np.random.seed(seed)
+    x = np.arange(rows, dtype='float64')
+    close = generate_pseudo_periodic_data(x, a=0.001, b=1000., k_1=5., t_1=60., k_2=50., t_2=1440., p=1., sigma=1.)
+    open_ = np.concatenate(([close[0]], close[:-1]))
+    spread = np.abs(np.random.normal(loc=0., scale=1., size=rows))
+    volume = np.abs(generate_pseudo_periodic_data(x, a=0., b=100., k_1=20., t_1=60., k_2=40., t_2=1440., p=10., sigma=1.))
+
+    return pd.DataFrame(
+        dict(open=open_, high=np.maximum(open_, close) + spread, low=np.minimum(open_, close) - spread,
+             close=close, volume=volume),
+        index=pd.date_range('2018-01-01', periods=rows, freq='T', name='datetime'))
+
+
+def indicators():
+    """Public indicator functions of the benchmarked modules.
+
+    Returns:
+        list: (name, function, input roles) tuples.
+    """
+    found = []
+    for module in MODULES:
+        short = module.__name__.split('.')[-1]
+        for name, function in inspect.getmembers(module, inspect.isfunction):
+            if name.startswith('_') or function.__module__ != module.__name__:
+                continue
+            inputs = tuple(p for p in inspect.signature(function).parameters if p in ROLES)
+            if inputs:
+                found.append((f'{short}.{name}', function, inputs))
+    return found
+
+
+def _time(call, repeat, budget):
+    runs = []
+    while len(runs) < repeat:
+        start = time.perf_counter()
+        call()
+        runs.append(time.perf_counter() - start)
+        if sum(runs) > budget:
+            break
+    return runs
+
+
+def _record(name, kind, rows, mode, call, repeat, budget):
+    result = dict(name=name, kind=kind, rows=rows, mode=mode)
+    try:
+        runs = _time(call, repeat, budget)
+    except Exception as e:
+        result.update(error=f'{type(e).__name__}: {e}')
+    else:
+        result.update(best=min(runs), median=statistics.median(runs), runs=len(runs))
+    return result
+
+
+def run(sizes=DEFAULT_SIZES, modes=('full', 'update'), pattern=None, repeat=5, budget=2.0, update_number=1,
+        verbose=False):
+    """Run the benchmark.
+
+    Args:
+        sizes(tuple): numbers of rows.
+        modes(tuple): 'full' and/or 'update' (is_update with `update_number` new rows).
+        pattern(str): regular expression filtering benchmark names.
+        repeat(int): maximum runs per case.
+        budget(float): seconds after which a case stops repeating.
+        update_number(int): rows appended in update mode.
+        verbose(bool): print every result as it completes.
+
+    Returns:
+        dict: report with 'meta' and 'results'.
+    """
+    results = []
+    cases = [(name, 'indicator', function, inputs) for name, function, inputs in indicators()]
+    cases += [(f'wrapper.{name}', 'wrapper', getattr(wrapper, name), inputs) for name, inputs in WRAPPERS]
+    if pattern is not None:
+        cases = [case for case in cases if re.search(pattern, case[0])]
+
+    for rows in sizes:
+        df = make_ohlcv(rows)
+        for name, kind, function, inputs in cases:
+            for mode in modes:
+                is_update = mode == 'update'
+                if kind == 'indicator':
+                    args = [df[role] for role in inputs]
+                    call = lambda: function(*args, is_update=is_update, update_number=update_number)
+                else:
+                    frame = df.copy()
+                    if is_update:
+                        function(frame, *inputs)
+                    call = lambda: function(frame, *inputs, is_update=is_update, update_number=update_number)
+
+                result = _record(name, kind, rows, mode, call, repeat, budget)
+                results.append(result)
+                if verbose:
+                    print(_format(result), file=sys.stderr)
+
+    return dict(meta=_meta(), results=results)
+
+
+def _meta():
+    try:
+        commit = subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'], stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        commit = None
+    return dict(
+        commit=commit, created=datetime.now().isoformat(), python=platform.python_version(),
+        numpy=np.__version__, pandas=pd.__version__, machine=platform.machine(),
+        kernel_backend=kernels.backend())
+
+
+def _key(result):
+    return result['name'], result['rows'], result['mode']
+
+
+def compare(old, new):
+    """Ratio of new to old best times for the cases present in both reports.
+
+    Args:
+        old(dict): baseline report.
+        new(dict): report to compare.
+
+    Returns:
+        list: (name, rows, mode, old best, new best, ratio) tuples, slowest first.
+    """
+    baseline = {_key(r): r for r in old['results'] if 'best' in r}
+    rows = []
+    for result in new['results']:
+        before = baseline.get(_key(result))
+        if before is None or 'best' not in result:
+            continue
+        rows.append(_key(result) + (before['best'], result['best'], result['best'] / before['best']))
+    return sorted(rows, key=lambda row: row[-1], reverse=True)
+
+
+def _format(result):
+    if 'error' in result:
+        return f"{result['name']:<45} {result['rows']:>9} {result['mode']:<6} {result['error']}"
+    return f"{result['name']:<45} {result['rows']:>9} {result['mode']:<6} {result['best'] * 1000:>12.3f} ms"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark coza.ta indicators.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES))
+    parser.add_argument('--modes', nargs='+', default=['full', 'update'], choices=['full', 'update'])
+    parser.add_argument('--filter', dest='pattern', default=None, help='regular expression on benchmark names')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--budget', type=float, default=2.0, help='seconds per case before it stops repeating')
+    parser.add_argument('--update-number', type=int, default=1)
+    parser.add_argument('--backend', default=None, choices=['auto', 'numba', 'numpy'], help='kernels.BACKEND')
+    parser.add_argument('--output', default=None, help='write the JSON report to this file')
+    parser.add_argument('--compare', default=None, help='JSON report to compare against')
+    args = parser.parse_args(argv)
+
+    kernels.BACKEND = args.backend
+    report = run(sizes=args.sizes, modes=args.modes, pattern=args.pattern, repeat=args.repeat,
+                 budget=args.budget, update_number=args.update_number, verbose=True)
+
+    if args.output is None:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare is not None:
+        with open(args.compare) as f:
+            old = json.load(f)
+        for name, rows, mode, before, after, ratio in compare(old, report):
+            print(f'{name:<45} {rows:>9} {mode:<6} {before * 1000:>12.3f} -> {after * 1000:>12.3f} ms  x{ratio:.2f}',
+                  file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+"""
+.. module:: buffer
+   :synopsis: Append-only frame of candles and features.
+
+Assigning the Series returned with is_update=True to a DataFrame column aligns
+it on the index and wipes the history of the column to nan. A FeatureBuffer
+instead keeps candles and features in preallocated arrays: candles are
+appended, features written by the add_*_ta wrappers, and an update only fills
+the rows each feature is missing:
+
+    >>> buffer = FeatureBuffer(data['btc_1'])
+    >>> add_all_ta_features(buffer, 'open', 'high', 'low', 'close', 'volume')
+    >>> buffer.append(new_candles)
+    >>> add_all_ta_features(buffer, 'open', 'high', 'low', 'close', 'volume', is_update=True)
+    >>> buffer.to_frame()
+
+"""
+import numpy as np
+import pandas as pd
+
+
+class FeatureBuffer(object):
+    """Append-only columns sharing a datetime index.
+
+    Args:
+        df(pandas.DataFrame): candles, indexed by datetime.
+        capacity(int): rows allocated up front, the buffer doubles when full.
+    """
+    def __init__(self, df, capacity=None):
+        self._n = len(df)
+        self._capacity = max(capacity or 0, self._n, 16)
+        self._tz = getattr(df.index, 'tz', None)
+        self._name = df.index.name
+        self._times = self._allocate(self._index_values(df.index))
+        self._columns = dict()
+        self._filled = dict()
+        self._index = None
+        for column in df.columns:
+            self._columns[column] = self._allocate(df[column].values)
+            self._filled[column] = self._n
+
+    def _allocate(self, values):
+        array = np.empty(self._capacity, dtype=values.dtype)
+        if array.dtype.kind == 'f':
+            array[len(values):] = np.nan
+        array[:len(values)] = values
+        return array
+
+    @staticmethod
+    def _index_values(index):
+        return index.asi8 if isinstance(index, pd.DatetimeIndex) else np.asarray(index)
+
+    def _reserve(self, n):
+        if n <= self._capacity:
+            return
+        while self._capacity < n:
+            self._capacity *= 2
+        self._times = self._allocate(self._times[:self._n])
+        for column, array in self._columns.items():
+            self._columns[column] = self._allocate(array[:self._n])
+
+    def __len__(self):
+        return self._n
+
+    @property
+    def columns(self):
+        return list(self._columns)
+
+    @property
+    def index(self):
+        if self._index is None:
+            values = self._times[:self._n]
+            if values.dtype.kind != 'i':
+                self._index = pd.Index(values, name=self._name)
+            elif self._tz is None:
+                self._index = pd.DatetimeIndex(values.view('M8[ns]'), name=self._name)
+            else:
+                self._index = pd.DatetimeIndex(values.view('M8[ns]'), name=self._name).tz_localize('UTC').tz_convert(self._tz)
+        return self._index
+
+    def __contains__(self, column):
+        return column in self._columns
+
+    def __getitem__(self, column):
+        return pd.Series(self._columns[column][:self._n], index=self.index, name=column, copy=False)
+
+    def __setitem__(self, column, value):
+        values = np.asarray(value)
+        if len(values) != self._n:
+            raise ValueError(f'{column} has {len(values)} rows, the buffer has {self._n}')
+        if column not in self._columns:
+            self._columns[column] = self._allocate(values)
+        else:
+            array = self._columns[column]
+            if not np.can_cast(values.dtype, array.dtype, casting='same_kind'):
+                array = self._columns[column] = self._allocate(array[:0].astype(values.dtype))
+            array[:self._n] = values
+        self._filled[column] = self._n
+
+    def missing(self, column):
+        """Number of rows at the end of `column` not written since they were appended."""
+        return self._n - self._filled[column]
+
+    def fill(self, column, value):
+        """Write the last len(value) rows of `column`.
+
+        Args:
+            column(str): existing column.
+            value(array-like): values of the last rows.
+        """
+        values = np.asarray(value)
+        self._columns[column][self._n - len(values):self._n] = values
+        self._filled[column] = self._n
+
+    def append(self, df):
+        """Append candles. Columns missing from `df` are nan on the new rows.
+
+        Args:
+            df(pandas.DataFrame): candles following the last row of the buffer.
+        """
+        times = self._index_values(df.index)
+        if self._n and len(times) and times[0] <= self._times[self._n - 1]:
+            raise ValueError('appended rows must follow the last row of the buffer')
+        n = self._n + len(df)
+        self._reserve(n)
+        self._times[self._n:n] = times
+        for column in df.columns:
+            if column not in self._columns:
+                self._columns[column] = self._allocate(np.full(self._n, np.nan))
+                self._filled[column] = self._n
+            self._columns[column][self._n:n] = df[column].values
+        for column in self._columns:
+            if column in df.columns and self._filled[column] == self._n:
+                self._filled[column] = n
+        self._n = n
+        self._index = None
+        return self
+
+    def select(self, columns):
+        """Copy of some columns, with the rows each one is missing.
+
+        Args:
+            columns(list): columns to copy.
+        """
+        buffer = object.__new__(FeatureBuffer)
+        buffer._n = self._n
+        buffer._capacity = max(self._n, 16)
+        buffer._tz = self._tz
+        buffer._name = self._name
+        buffer._index = None
+        buffer._times = buffer._allocate(self._times[:self._n])
+        buffer._columns = {column: buffer._allocate(self._columns[column][:self._n]) for column in columns}
+        buffer._filled = {column: self._filled[column] for column in columns}
+        return buffer
+
+    def to_frame(self, columns=None):
+        """Copy of the buffer as a DataFrame.
+
+        Args:
+            columns(list): columns to copy, defaults to all of them.
+        """
+        columns = self.columns if columns is None else columns
+        return pd.DataFrame({column: self._columns[column][:self._n].copy() for column in columns},
+                            index=self.index, columns=columns)
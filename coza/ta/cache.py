@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+.. module:: cache
+   :synopsis: Memoization of the coza.ta indicators.
+
+Strategies often call the same indicator with the same parameters on the same
+candles several times in a tick, from run_strategy and make_orders. Once
+enabled, the indicators decorated with `cached` return the result of the last
+identical call instead of computing it again:
+
+    >>> from coza.ta import cache
+    >>> cache.enable(maxsize=256)
+
+Entries are keyed by the function, its parameters and the version of each
+input Series. Appending candles produces a new frame and therefore a new
+version, so entries of older candles are never returned and age out of the
+bounded LRU.
+
+While enabled, the band indicators also share their rolling window statistics,
+see coza.ta.rolling. Versions only fingerprint the ends of a Series, so frames
+modified in place must not be passed again while the cache is enabled.
+
+"""
+from collections import OrderedDict
+from functools import wraps
+import inspect
+import threading
+
+import pandas as pd
+
+from . import rolling
+from .rolling import fingerprint
+from .utils import get_precision
+
+
+MAXSIZE = 0
+
+_entries = OrderedDict()
+_stats = dict(hits=0, misses=0)
+_lock = threading.Lock()
+
+
+def enable(maxsize=256):
+    """Enable the cache.
+
+    Args:
+        maxsize(int): number of results kept, least recently used first out.
+    """
+    global MAXSIZE
+    MAXSIZE = maxsize
+    with _lock:
+        _trim()
+
+
+def disable():
+    """Disable and empty the cache."""
+    global MAXSIZE
+    MAXSIZE = 0
+    clear()
+
+
+def clear():
+    """Drop every cached result."""
+    with _lock:
+        _entries.clear()
+        _stats.update(hits=0, misses=0)
+    rolling.clear()
+
+
+def info():
+    """
+        return: dict : hits, misses, size and maxsize of the cache
+    """
+    return dict(_stats, size=len(_entries), maxsize=MAXSIZE)
+
+
+def _trim():
+    while len(_entries) > MAXSIZE:
+        _entries.popitem(last=False)
+
+
+def _version(value):
+    if isinstance(value, (pd.Series, pd.DataFrame)):
+        if isinstance(value, pd.DataFrame):
+            return tuple(fingerprint(value[c]) for c in value.columns)
+        return fingerprint(value)
+    return value
+
+
+def _copy(result):
+    if isinstance(result, tuple):
+        return tuple(_copy(item) for item in result)
+    return result.copy() if hasattr(result, 'copy') else result
+
+
+def cached(func):
+    """Memoize an indicator while the cache is enabled."""
+    signature = inspect.signature(func)
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if not MAXSIZE:
+            return func(*args, **kwargs)
+
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        try:
+            key = (func, get_precision()) + tuple((k, _version(v)) for k, v in bound.arguments.items())
+            hash(key)
+        except TypeError:
+            return func(*args, **kwargs)
+
+        with _lock:
+            entry = _entries.get(key)
+            if entry is not None:
+                _entries.move_to_end(key)
+                _stats['hits'] += 1
+        if entry is None:
+            # the inputs are kept alive so that their buffers are not reused by other data
+            entry = (func(*args, **kwargs), tuple(bound.arguments.values()))
+            with _lock:
+                _entries[key] = entry
+                _stats['misses'] += 1
+                _trim()
+        # callers may modify the result, the cached one stays untouched
+        return _copy(entry[0])
+
+    return wrapper
@@ -0,0 +1,531 @@
+# -*- coding: utf-8 -*-
+"""
+.. module:: kernels
+   :synopsis: Compiled kernels for recursive and path-dependent indicators.
+
+The kernels work on numpy arrays and are used by negative_volume_index,
+on_balance_volume, tsi, kst, kst_sig, ichimoku_a, ichimoku_b, stochastic_rsi
+and stochastic_rsi_k_d when a backend is selected. The tsi, kst and ichimoku
+kernels are fused into single passes with Numba and accept preallocated
+outputs:
+
+    >>> from coza.ta import kernels
+    >>> kernels.BACKEND = 'auto'
+
+Numba is an optional dependency. Without it every backend falls back to the
+NumPy implementations.
+
+"""
+import numpy as np
+import pandas as pd
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+
+# None keeps the pandas implementations. 'auto' uses Numba when it is installed
+# and NumPy otherwise, 'numba' and 'numpy' select one of them.
+BACKEND = None
+
+
+def backend():
+    """Resolve BACKEND to the implementation actually used.
+
+    Returns:
+        str: 'numba', 'numpy' or None.
+    """
+    if BACKEND is None:
+        return None
+    if BACKEND not in ('auto', 'numba', 'numpy'):
+        raise ValueError(f'Unknown kernel backend {BACKEND}')
+    if BACKEND == 'numpy' or numba is None:
+        return 'numpy'
+    return 'numba'
+
+
+def enabled():
+    return BACKEND is not None
+
+
+def _alpha_com(com):
+    return 1.0 / (1.0 + com)
+
+
+def _alpha_span(span):
+    return 2.0 / (span + 1.0)
+
+
+# ======================================
+# Loop kernels, compiled by Numba.
+
+def _nvi_loop(close, volume):
+    out = np.empty(len(close))
+    if len(close) == 0:
+        return out
+    out[0] = 1000.0
+    for i in range(1, len(close)):
+        if volume[i - 1] > volume[i]:
+            out[i] = out[i - 1] * (1.0 + (close[i] / close[i - 1] - 1.0))
+        else:
+            out[i] = out[i - 1]
+    return out
+
+
+def _obv_loop(close, volume):
+    out = np.zeros(len(close))
+    for i in range(1, len(close)):
+        if close[i] < close[i - 1]:
+            out[i] = -volume[i]
+        elif close[i] > close[i - 1]:
+            out[i] = volume[i]
+    return out
+
+
+def _ewma_loop(x, alpha, min_periods):
+    # pandas ewm(adjust=True, ignore_na=False).mean()
+    out = np.empty(len(x))
+    if len(x) == 0:
+        return out
+    min_periods = max(min_periods, 1)
+    old_wt_factor = 1.0 - alpha
+    weighted = x[0]
+    nobs = 1 if weighted == weighted else 0
+    out[0] = weighted if nobs >= min_periods else np.nan
+    old_wt = 1.0
+    for i in range(1, len(x)):
+        cur = x[i]
+        is_observation = cur == cur
+        if is_observation:
+            nobs += 1
+        if weighted == weighted:
+            old_wt *= old_wt_factor
+            if is_observation:
+                if weighted != cur:
+                    weighted = old_wt * weighted + cur
+                    weighted /= old_wt + 1.0
+                old_wt += 1.0
+        elif is_observation:
+            weighted = cur
+        out[i] = weighted if nobs >= min_periods else np.nan
+    return out
+
+
+def _rolling_mean_loop(x, n):
+    # pandas rolling(n).mean(): windows holding a nan give nan
+    out = np.full(len(x), np.nan)
+    for i in range(n - 1, len(x)):
+        total = 0.0
+        for j in range(i - n + 1, i + 1):
+            total += x[j]
+        out[i] = total / n
+    return out
+
+
+def _rolling_extreme_loop(x, n, min_periods, sign):
+    # pandas rolling(n, min_periods).max() for sign=1, .min() for sign=-1
+    out = np.full(len(x), np.nan)
+    for i in range(len(x)):
+        best = np.nan
+        count = 0
+        for j in range(max(i - n + 1, 0), i + 1):
+            v = x[j]
+            if v == v:
+                count += 1
+                if best != best or sign * v > sign * best:
+                    best = v
+        if count >= min_periods:
+            out[i] = best
+    return out
+
+
+def _ewma_step(state, x, alpha, min_periods):
+    # one row of _ewma_loop, state holds weighted, old_wt, nobs and whether a row was seen
+    if state[3] == 0.0:
+        state[0] = x
+        state[1] = 1.0
+        state[2] = 1.0 if x == x else 0.0
+        state[3] = 1.0
+    else:
+        weighted = state[0]
+        is_observation = x == x
+        if is_observation:
+            state[2] += 1.0
+        if weighted == weighted:
+            state[1] *= 1.0 - alpha
+            if is_observation:
+                if weighted != x:
+                    weighted = (state[1] * weighted + x) / (state[1] + 1.0)
+                state[1] += 1.0
+        elif is_observation:
+            weighted = x
+        state[0] = weighted
+    return state[0] if state[2] >= max(min_periods, 1) else np.nan
+
+
+def _tsi_loop(close, alpha_r, alpha_s, out):
+    # the four exponential moving averages of tsi in one pass
+    m1 = np.zeros(4)
+    m1s = np.zeros(4)
+    m2 = np.zeros(4)
+    m2s = np.zeros(4)
+    for i in range(len(close)):
+        m = close[i] - close[i - 1] if i > 0 else np.nan
+        a = _ewma_step(m1s, _ewma_step(m1, m, alpha_r, 0), alpha_s, 0)
+        b = _ewma_step(m2s, _ewma_step(m2, abs(m), alpha_r, 0), alpha_s, 0)
+        out[i] = a / b * 100
+    return out
+
+
+def _kst_loop(close, rs, ns, out):
+    # weighted sum of the rolling means of the rates of change in one pass
+    for i in range(len(close)):
+        kst = 0.0
+        for k in range(len(rs)):
+            r = rs[k]
+            n = ns[k]
+            if i < r + n - 1:
+                kst = np.nan
+                break
+            total = 0.0
+            for j in range(i - n + 1, i + 1):
+                total += (close[j] - close[j - r]) / close[j - r]
+            kst += (k + 1) * (total / n)
+        out[i] = 100 * kst
+    return out
+
+
+def _donchian_mid_loop(high, low, windows, out):
+    # 0.5 * (highest high + lowest low) over each window, with monotonic queues
+    size = 1
+    for n in windows:
+        size = max(size, n + 1)
+    queue_h = np.zeros((len(windows), size), dtype=np.int64)
+    queue_l = np.zeros((len(windows), size), dtype=np.int64)
+    head_h = np.zeros(len(windows), dtype=np.int64)
+    tail_h = np.zeros(len(windows), dtype=np.int64)
+    head_l = np.zeros(len(windows), dtype=np.int64)
+    tail_l = np.zeros(len(windows), dtype=np.int64)
+    last_nan = -1
+    for i in range(len(high)):
+        h = high[i]
+        l = low[i]
+        if h != h or l != l:
+            last_nan = i
+        for k in range(len(windows)):
+            n = windows[k]
+            if h == h:
+                while tail_h[k] > head_h[k] and high[queue_h[k, (tail_h[k] - 1) % size]] <= h:
+                    tail_h[k] -= 1
+                queue_h[k, tail_h[k] % size] = i
+                tail_h[k] += 1
+            if l == l:
+                while tail_l[k] > head_l[k] and low[queue_l[k, (tail_l[k] - 1) % size]] >= l:
+                    tail_l[k] -= 1
+                queue_l[k, tail_l[k] % size] = i
+                tail_l[k] += 1
+            while tail_h[k] > head_h[k] and queue_h[k, head_h[k] % size] <= i - n:
+                head_h[k] += 1
+            while tail_l[k] > head_l[k] and queue_l[k, head_l[k] % size] <= i - n:
+                head_l[k] += 1
+            if i >= n - 1 and last_nan <= i - n:
+                out[k, i] = 0.5 * (high[queue_h[k, head_h[k] % size]] + low[queue_l[k, head_l[k] % size]])
+            else:
+                out[k, i] = np.nan
+    return out
+
+
+# ======================================
+# NumPy kernels.
+
+def _nvi_numpy(close, volume):
+    if len(close) == 0:
+        return np.empty(0)
+    factor = np.where(volume[:-1] > volume[1:], 1.0 + (close[1:] / close[:-1] - 1.0), 1.0)
+    return np.cumprod(np.concatenate(([1000.0], factor)))
+
+
+def _obv_numpy(close, volume):
+    out = np.zeros(len(close))
+    out[1:] = np.where(close[1:] < close[:-1], -volume[1:], np.where(close[1:] > close[:-1], volume[1:], 0.0))
+    return out
+
+
+def _ewma_numpy(x, alpha, min_periods):
+    return pd.Series(x).ewm(alpha=alpha, min_periods=min_periods).mean().values
+
+
+def _windows(x, n, fill):
+    padded = np.concatenate((np.full(n - 1, fill), x))
+    stride = padded.strides[0]
+    return np.lib.stride_tricks.as_strided(padded, shape=(len(x), n), strides=(stride, stride))
+
+
+def _rolling_mean_numpy(x, n):
+    out = _windows(x, n, np.nan).mean(axis=1)
+    out[:n - 1] = np.nan
+    return out
+
+
+def _rolling_extreme_numpy(x, n, min_periods, sign):
+    windows = _windows(x, n, np.nan)
+    if sign > 0:
+        out = np.fmax.reduce(windows, axis=1)
+    else:
+        out = np.fmin.reduce(windows, axis=1)
+    count = (~np.isnan(windows)).sum(axis=1)
+    out[count < max(min_periods, 1)] = np.nan
+    return out
+
+
+def _tsi_numpy(close, alpha_r, alpha_s, out):
+    m = np.empty(len(close))
+    m[:1] = np.nan
+    m[1:] = close[1:] - close[:-1]
+    m1 = _ewma_numpy(_ewma_numpy(m, alpha_r, 0), alpha_s, 0)
+    m2 = _ewma_numpy(_ewma_numpy(np.abs(m), alpha_r, 0), alpha_s, 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        np.divide(m1, m2, out=out)
+    out *= 100
+    return out
+
+
+def _kst_numpy(close, rs, ns, out):
+    out[:] = 0.0
+    for k in range(len(rs)):
+        r, n = rs[k], ns[k]
+        shifted = np.full(len(close), np.nan)
+        shifted[r:] = close[:len(close) - r]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            out += (k + 1) * _rolling_mean_numpy((close - shifted) / shifted, n)
+    out *= 100
+    return out
+
+
+def _donchian_mid_numpy(high, low, windows, out):
+    for k, n in enumerate(windows):
+        out[k] = 0.5 * (_rolling_extreme_numpy(high, n, n, 1) + _rolling_extreme_numpy(low, n, n, -1))
+    return out
+
+
+_IMPLEMENTATIONS = {
+    'numpy': dict(
+        nvi=_nvi_numpy, obv=_obv_numpy, ewma=_ewma_numpy,
+        rolling_mean=_rolling_mean_numpy, rolling_extreme=_rolling_extreme_numpy,
+        tsi=_tsi_numpy, kst=_kst_numpy, donchian_mid=_donchian_mid_numpy),
+}
+
+if numba is not None:
+    # the fused loops call it, it has to be compiled first
+    _ewma_step = numba.njit(cache=True)(_ewma_step)
+    _IMPLEMENTATIONS['numba'] = dict(
+        nvi=numba.njit(cache=True)(_nvi_loop),
+        obv=numba.njit(cache=True)(_obv_loop),
+        ewma=numba.njit(cache=True)(_ewma_loop),
+        rolling_mean=numba.njit(cache=True)(_rolling_mean_loop),
+        rolling_extreme=numba.njit(cache=True)(_rolling_extreme_loop),
+        tsi=numba.njit(cache=True, error_model='numpy')(_tsi_loop),
+        kst=numba.njit(cache=True, error_model='numpy')(_kst_loop),
+        donchian_mid=numba.njit(cache=True)(_donchian_mid_loop))
+
+
+def _kernel(name):
+    return _IMPLEMENTATIONS[backend()][name]
+
+
+def _values(series):
+    return np.ascontiguousarray(series, dtype='float64')
+
+
+def _ffill(x):
+    missing = np.isnan(x)
+    if not missing.any():
+        return x
+    last = np.where(missing, 0, np.arange(len(x)))
+    np.maximum.accumulate(last, out=last)
+    return x[last]
+
+
+def _out(out, shape):
+    if out is None:
+        return np.empty(shape)
+    if out.shape != shape or out.dtype != np.float64:
+        raise ValueError(f'out must be a float64 array of shape {shape}')
+    return out
+
+
+# ======================================
+# Indicator kernels.
+
+def negative_volume_index(close, volume):
+    """Negative Volume Index, see :func:`coza.ta.volume.negative_volume_index`.
+
+    Args:
+        close(numpy.ndarray): 'Close' values.
+        volume(numpy.ndarray): 'Volume' values.
+
+    Returns:
+        numpy.ndarray: nvi, starting at 1000.
+    """
+    # like pct_change, a missing close repeats the last one instead of breaking the index
+    return _kernel('nvi')(_ffill(_values(close)), _values(volume))
+
+
+def on_balance_volume(close, volume):
+    """On-balance volume, see :func:`coza.ta.volume.on_balance_volume`.
+
+    Args:
+        close(numpy.ndarray): 'Close' values.
+        volume(numpy.ndarray): 'Volume' values.
+
+    Returns:
+        numpy.ndarray: signed volume.
+    """
+    return _kernel('obv')(_values(close), _values(volume))
+
+
+def tsi(close, r=25, s=13, out=None):
+    """True strength index, see :func:`coza.ta.momentum.tsi`.
+
+    Its four exponential moving averages are computed in one pass.
+
+    Args:
+        close(numpy.ndarray): 'Close' values.
+        r(int): high period.
+        s(int): low period.
+        out(numpy.ndarray): preallocated float64 output, e.g. reused every tick.
+
+    Returns:
+        numpy.ndarray: tsi, without filling.
+    """
+    close = _values(close)
+    return _kernel('tsi')(close, _alpha_com(r), _alpha_com(s), _out(out, close.shape))
+
+
+def kst(close, r1=10, r2=15, r3=20, r4=30, n1=10, n2=10, n3=10, n4=15, out=None):
+    """KST Oscillator, see :func:`coza.ta.trend.kst`.
+
+    The four smoothed rates of change are summed in one pass.
+
+    Args:
+        close(numpy.ndarray): 'Close' values.
+        r1, r2, r3, r4(int): rate of change periods.
+        n1, n2, n3, n4(int): smoothing periods.
+        out(numpy.ndarray): preallocated float64 output.
+
+    Returns:
+        numpy.ndarray: kst, without filling.
+    """
+    close = _values(close)
+    rs = np.array([r1, r2, r3, r4], dtype=np.int64)
+    ns = np.array([n1, n2, n3, n4], dtype=np.int64)
+    return _kernel('kst')(close, rs, ns, _out(out, close.shape))
+
+
+def kst_sig(close, r1=10, r2=15, r3=20, r4=30, n1=10, n2=10, n3=10, n4=15, nsig=9, out=None):
+    """KST Signal, see :func:`coza.ta.trend.kst_sig`.
+
+    Returns:
+        numpy.ndarray: kst signal, without filling.
+    """
+    close = _values(close)
+    out = _out(out, close.shape)
+    out[:] = _kernel('rolling_mean')(kst(close, r1, r2, r3, r4, n1, n2, n3, n4), nsig)
+    return out
+
+
+def ichimoku(high, low, n1=9, n2=26, n3=52, out=None):
+    """Ichimoku spans A and B before the visual shift, in one pass.
+
+    Args:
+        high(numpy.ndarray): 'High' values.
+        low(numpy.ndarray): 'Low' values.
+        n1(int): n1 low period.
+        n2(int): n2 medium period.
+        n3(int): n3 high period.
+        out(numpy.ndarray): preallocated float64 output of shape (2, len(high)).
+
+    Returns:
+        numpy.ndarray: span A and span B rows, without filling.
+    """
+    high, low = _values(high), _values(low)
+    mid = _kernel('donchian_mid')(high, low, np.array([n1, n2, n3], dtype=np.int64), np.empty((3, len(high))))
+    out = _out(out, (2, len(high)))
+    np.add(mid[0], mid[1], out=out[0])
+    out[0] *= 0.5
+    out[1] = mid[2]
+    return out
+
+
+def ichimoku_a(high, low, n1=9, n2=26, out=None):
+    """Ichimoku span A before the visual shift, see :func:`coza.ta.trend.ichimoku_a`.
+
+    Returns:
+        numpy.ndarray: span A, without filling.
+    """
+    high, low = _values(high), _values(low)
+    mid = _kernel('donchian_mid')(high, low, np.array([n1, n2], dtype=np.int64), np.empty((2, len(high))))
+    out = _out(out, high.shape)
+    np.add(mid[0], mid[1], out=out)
+    out *= 0.5
+    return out
+
+
+def ichimoku_b(high, low, n3=52, out=None):
+    """Ichimoku span B before the visual shift, see :func:`coza.ta.trend.ichimoku_b`.
+
+    Returns:
+        numpy.ndarray: span B, without filling.
+    """
+    high, low = _values(high), _values(low)
+    out = _out(out, high.shape)
+    _kernel('donchian_mid')(high, low, np.array([n3], dtype=np.int64), out.reshape(1, -1))
+    return out
+
+
+def rsi(close, n=14, fillna=True):
+    """Relative Strength Index, see :func:`coza.ta.momentum.rsi`.
+
+    Returns:
+        numpy.ndarray: rsi, filled with 50 if fillna.
+    """
+    ewma = _kernel('ewma')
+    close = _values(close)
+    diff = np.empty(len(close))
+    diff[:1] = np.nan
+    diff[1:] = close[1:] - close[:-1]
+    up = np.where(diff < 0, 0.0, diff)
+    dn = np.where(diff < 0, -diff, diff * 0)
+    min_periods = 0 if fillna else n
+    emaup = ewma(up, _alpha_span(n), min_periods)
+    emadn = ewma(dn, _alpha_span(n), min_periods)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = 100 * emaup / (emaup + emadn)
+    if fillna:
+        rsi[~np.isfinite(rsi)] = 50
+    return rsi
+
+
+def stochastic_rsi(close, rsi_n=14, win_size=3, fillna=True):
+    """Stochastic RSI, see :func:`coza.ta.momentum.stochastic_rsi`.
+
+    Returns:
+        numpy.ndarray: stochastic RSI %K.
+    """
+    extreme = _kernel('rolling_extreme')
+    r_sr = rsi(close, rsi_n, fillna)
+    h = extreme(r_sr, win_size + 1, 1, 1)
+    l = extreme(r_sr, win_size + 1, 1, -1)
+    return (r_sr - l) / (h - l + 1e-14)
+
+
+def stochastic_rsi_k_d(close, rsi_n=14, win_size_k=3, win_size_d=3, fillna=True):
+    """Stochastic RSI %K and %D, see :func:`coza.ta.momentum.stochastic_rsi_k_d`.
+
+    Returns:
+        tuple(numpy.ndarray, numpy.ndarray): %K and %D.
+    """
+    so_rsi_k = stochastic_rsi(close, rsi_n, win_size_k, fillna)
+    so_rsi_d = _kernel('ewma')(so_rsi_k, _alpha_span(win_size_d), win_size_d)
+    return so_rsi_k, so_rsi_d
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""
+.. module:: lazy
+   :synopsis: Features computed on first access.
+
+add_all_ta_features computes every feature of the wrapper tables even when a
+strategy reads three of them. LazyFeatures computes a feature the first time it
+is read, keeps it, and when the candles grow only computes the new rows, with
+the warm-up each indicator declares:
+
+    >>> features = LazyFeatures(data['btc_5'])
+    >>> features['momentum_rsi']        # column of the wrapper tables
+    >>> features.rsi(n=7)               # any indicator, with its parameters
+    >>> features.update(data['btc_5'])  # after new candles were appended
+
+With pandas 0.23 or later, it is also the `ta` accessor of DataFrames, e.g.
+data['btc_5'].ta.rsi(14), cached for the lifetime of the frame.
+
+"""
+from collections import OrderedDict
+import inspect
+
+import numpy as np
+import pandas as pd
+
+from . import momentum, others, trend, volatility, volume
+from .utils import as_precision, get_warmup
+from .wrapper import (VOLUME_FEATURES, VOLATILITY_FEATURES, TREND_FEATURES, MOMENTUM_FEATURES, OTHERS_FEATURES,
+                      _CARRY)
+
+
+ROLES = ('open', 'high', 'low', 'close', 'volume')
+OPTIONS = ('fillna', 'is_update', 'update_number')
+
+FEATURES = OrderedDict(
+    (row[0], row) for row in VOLUME_FEATURES + VOLATILITY_FEATURES + TREND_FEATURES + MOMENTUM_FEATURES + OTHERS_FEATURES)
+
+
+def _indicators():
+    found = dict()
+    for module in (volume, volatility, trend, momentum, others):
+        for name, function in inspect.getmembers(module, inspect.isfunction):
+            if name.startswith('_') or function.__module__ != module.__name__:
+                continue
+            inputs = tuple(p for p in inspect.signature(function).parameters if p in ROLES)
+            if inputs:
+                found[name] = (function, inputs)
+    return found
+
+
+INDICATORS = _indicators()
+
+
+def _params(function, inputs, args=(), params=None):
+    bound = inspect.signature(function).bind_partial(*((None,) * len(inputs) + tuple(args)), **(params or {}))
+    bound.apply_defaults()
+    return tuple((k, v) for k, v in bound.arguments.items() if k not in inputs and k not in OPTIONS)
+
+
+CARRY = {FEATURES[name][1]: carry for name, carry in _CARRY.items()}
+
+
+class LazyFeatures(object):
+    """Features of a candle frame, computed on first access.
+
+    Args:
+        df(pandas.DataFrame): candles.
+        open, high, low, close, volume(str): names of the candle columns.
+        fillna(bool): if True, fill nan values.
+    """
+    def __init__(self, df, open='open', high='high', low='low', close='close', volume='volume', fillna=True):
+        self.df = df
+        self.columns = dict(open=open, high=high, low=low, close=close, volume=volume)
+        self.fillna = fillna
+        self._values = dict()
+
+    def update(self, df):
+        """Point the features at a newer frame of the same candles.
+
+        Features already read are extended to the new rows when they are read again.
+
+        Returns:
+            LazyFeatures: self.
+        """
+        self.df = df
+        return self
+
+    def __getitem__(self, column):
+        name, function, inputs, params, lookback = FEATURES[column]
+        return self._feature(name, name, function, inputs, params, lookback)
+
+    def __getattr__(self, name):
+        if name.startswith('_') or name not in INDICATORS:
+            raise AttributeError(name)
+        function, inputs = INDICATORS[name]
+
+        def feature(*args, **params):
+            params = _params(function, inputs, args, params)
+            return self._feature((name, params), None, function, inputs, dict(params),
+                                 get_warmup(function, **dict(params)))
+        feature.__doc__ = function.__doc__
+        return feature
+
+    def to_frame(self, columns=None):
+        """Columns of the wrapper tables as a DataFrame.
+
+        Args:
+            columns(list): columns to read, defaults to all of them.
+
+        Returns:
+            pandas.DataFrame: features indexed like the candles.
+        """
+        columns = list(FEATURES) if columns is None else columns
+        return pd.DataFrame(OrderedDict((column, self[column]) for column in columns), index=self.df.index)
+
+    def _inputs(self, inputs):
+        return [self.df[self.columns[i]] if i in self.columns else self[i] for i in inputs]
+
+    def _feature(self, key, name, function, inputs, params, lookback):
+        df = self.df
+        state = (len(df), df.index[0], df.index[-1]) if len(df) else (0,)
+        cached = self._values.get(key)
+        if cached is not None and cached[0] == state:
+            return cached[1]
+
+        value = None
+        if cached is not None and lookback is not None and len(df) and _indexed(cached[1], cached[2]):
+            olds = _parts(cached[1])
+            old_index = cached[2]
+            k = len(df) - df.index.searchsorted(old_index[-1], side='right')
+            drop = old_index.searchsorted(df.index[0])
+            if 0 < k and len(old_index) - drop + k == len(df) and df.index[len(df) - k - 1] == old_index[-1]:
+                start = max(len(df) - k - lookback, 0)
+                news = _parts(function(*[x.iloc[start:] for x in self._inputs(inputs)], fillna=self.fillna, **params))
+                parts = list()
+                for old, new in zip(olds, news):
+                    new = np.asarray(new)[-k:]
+                    if function in CARRY and start < len(df) - k:
+                        prev = old.iloc[drop + start]
+                        if not pd.isnull(prev):
+                            new = CARRY[function](new, prev)
+                    parts.append(as_precision(pd.Series(np.concatenate((old.values[drop:], new)), index=df.index,
+                                                        name=old.name)))
+                value = tuple(parts) if isinstance(cached[1], tuple) else parts[0]
+
+        if value is None:
+            value = _align(function(*self._inputs(inputs), fillna=self.fillna, **params), df.index)
+            if name is not None and not isinstance(value, tuple):
+                value = value.rename(name)
+
+        self._values[key] = (state, value, df.index)
+        return value
+
+
+def _parts(value):
+    return value if isinstance(value, tuple) else (value,)
+
+
+def _align(value, index):
+    # some indicators return a RangeIndex, the features are indexed like the candles
+    if isinstance(value, tuple):
+        return tuple(_align(part, index) for part in value)
+    if isinstance(value, pd.Series) and len(value) == len(index) and not value.index.equals(index):
+        value = pd.Series(value.values, index=index, name=value.name)
+    return value
+
+
+def _indexed(value, index):
+    # the rows of the last value can only be reused when they are indexed like its candles
+    return all(isinstance(part, pd.Series) and part.index.equals(index) for part in _parts(value))
+
+
+if hasattr(pd, 'api') and hasattr(pd.api, 'extensions') and not hasattr(pd.DataFrame, 'ta'):
+    pd.api.extensions.register_dataframe_accessor('ta')(LazyFeatures)
@@ -9,9 +9,13 @@
 import pandas as pd
 import numpy as np
 
+from . import cache, kernels
+from .rolling import Ewma
 from .utils import *
 
 
+@cache.cached
+@warmup(lambda n, **_: 1 + span_warmup(n))
 def rsi(close, n=14, fillna=True, is_update=False, update_number=None):
     """Relative Strength Index (RSI)
 
@@ -44,11 +48,13 @@ def rsi(close, n=14, fillna=True, is_update=False, update_number=None):
         rsi = rsi.replace([np.inf, -np.inf], np.nan).fillna(50)
         
     if is_update:
-        return pd.Series(rsi, name='rsi').tail(update_number)
+        return as_precision(pd.Series(rsi, name='rsi').tail(update_number))
     else:
-        return pd.Series(rsi, name='rsi')
+        return as_precision(pd.Series(rsi, name='rsi'))
 
 
+@cache.cached
+@warmup(lambda n, **_: n)
 def money_flow_index(high, low, close, volume, n=14, fillna=True, is_update=False, update_number=None):
     """Money Flow Index (MFI)
 
@@ -101,11 +107,13 @@ def money_flow_index(high, low, close, volume, n=14, fillna=True, is_update=Fals
         mr = mr.replace([np.inf, -np.inf], np.nan).fillna(50)
     
     if is_update:
-        return pd.Series(mr, name='mfi_'+str(n)).tail(update_number)
+        return as_precision(pd.Series(mr, name='mfi_'+str(n)).tail(update_number))
     else:
-        return pd.Series(mr, name='mfi_'+str(n))
+        return as_precision(pd.Series(mr, name='mfi_'+str(n)))
 
 
+@cache.cached
+@warmup(lambda r, s, **_: 1 + ewm_warmup(1.0 / (r + 1)) + ewm_warmup(1.0 / (s + 1)))
 def tsi(close, r=25, s=13, fillna=True, is_update=False, update_number=None):
     """True strength index (TSI)
 
@@ -122,20 +130,25 @@ def tsi(close, r=25, s=13, fillna=True, is_update=False, update_number=None):
     Returns:
         pandas.Series: New feature generated.
     """
-    m = close - close.shift(1)
-    m1 = m.ewm(r).mean().ewm(s).mean()
-    m2 = abs(m).ewm(r).mean().ewm(s).mean()
-    tsi = m1/m2
-    tsi *= 100
+    if kernels.enabled():
+        tsi = pd.Series(kernels.tsi(close, r, s), index=close.index)
+    else:
+        m = close - close.shift(1)
+        m1 = m.ewm(r).mean().ewm(s).mean()
+        m2 = abs(m).ewm(r).mean().ewm(s).mean()
+        tsi = m1/m2
+        tsi *= 100
     if fillna:
         tsi = tsi.replace([np.inf, -np.inf], np.nan).fillna(0)
     
     if is_update:
-        return pd.Series(tsi, name='tsi').tail(update_number)
+        return as_precision(pd.Series(tsi, name='tsi').tail(update_number))
     else:
-        return pd.Series(tsi, name='tsi')
+        return as_precision(pd.Series(tsi, name='tsi'))
 
 
+@cache.cached
+@warmup(lambda s, m, l, **_: max(s, m, l))
 def uo(high, low, close, s=7, m=14, l=28, ws=4.0, wm=2.0, wl=1.0, fillna=True, is_update=False, update_number=None):
     """Ultimate Oscillator
     Larry Williams' (1976) signal, a momentum oscillator designed to capture momentum
@@ -177,10 +190,12 @@ def uo(high, low, close, s=7, m=14, l=28, ws=4.0, wm=2.0, wl=1.0, fillna=True, i
         uo = uo.fillna(50)
     
     if is_update:
-        return pd.Series(uo, name='uo').tail(update_number)
+        return as_precision(pd.Series(uo, name='uo').tail(update_number))
     else:
-        return pd.Series(uo, name='uo')
+        return as_precision(pd.Series(uo, name='uo'))
 
+@cache.cached
+@warmup(lambda n, **_: n - 1)
 def stoch_k(high, low, close, n=14, fillna=True, is_update=False, update_number=None):
     """Stochastic Oscillator
     Developed in the late 1950s by George Lane. The stochastic
@@ -205,10 +220,12 @@ def stoch_k(high, low, close, n=14, fillna=True, is_update=False, update_number=
         stk = stk.replace([np.inf, -np.inf], np.nan).fillna(50)
     
     if is_update:
-        return pd.Series(stk, name='stoch_k').tail(update_number)
+        return as_precision(pd.Series(stk, name='stoch_k').tail(update_number))
     else:
-        return pd.Series(stk, name='stoch_k')
+        return as_precision(pd.Series(stk, name='stoch_k'))
 
+@cache.cached
+@warmup(lambda n, d_n, **_: n + d_n - 2)
 def stoch_k_d(high, low, close, n=14, d_n=3, fillna=True, is_update=False, update_number=None):
     """Stochastic Oscillator Signal
     Shows SMA of Stochastic Oscillator. Typically a 3 day SMA.
@@ -230,11 +247,13 @@ def stoch_k_d(high, low, close, n=14, d_n=3, fillna=True, is_update=False, updat
         std = std.replace([np.inf, -np.inf], np.nan).fillna(50)
     
     if is_update:
-        return pd.Series(std, name='stoch_d').tail(update_number)
+        return as_precision(pd.Series(std, name='stoch_d').tail(update_number))
     else:
-        return pd.Series(std, name='stoch_d')
+        return as_precision(pd.Series(std, name='stoch_d'))
 
 
+@cache.cached
+@warmup(lambda lbp, **_: lbp - 1)
 def wr(high, low, close, lbp=14, fillna=True, is_update=False, update_number=None):
     """Williams %R
     From: http://stockcharts.com/school/doku.php?id=chart_school:technical_indicators:williams_r
@@ -276,11 +295,13 @@ def wr(high, low, close, lbp=14, fillna=True, is_update=False, update_number=Non
         wr = wr.replace([np.inf, -np.inf], np.nan).fillna(-50)
     
     if is_update:
-        return pd.Series(wr, name='wr').tail(update_number)
+        return as_precision(pd.Series(wr, name='wr').tail(update_number))
     else:
-        return pd.Series(wr, name='wr')
+        return as_precision(pd.Series(wr, name='wr'))
 
 
+@cache.cached
+@warmup(lambda s, l, **_: max(s, l) - 1)
 def ao(high, low, s=5, l=34, fillna=True, is_update=False, update_number=None):
     """Awesome Oscillator
     From: https://www.tradingview.com/wiki/Awesome_Oscillator_(AO)
@@ -315,14 +336,16 @@ def ao(high, low, s=5, l=34, fillna=True, is_update=False, update_number=None):
         ao = ao.replace([np.inf, -np.inf], np.nan).fillna(0)
     
     if is_update:
-        return pd.Series(ao, name='ao').tail(update_number)
+        return as_precision(pd.Series(ao, name='ao').tail(update_number))
     else:
-        return pd.Series(ao, name='ao')
+        return as_precision(pd.Series(ao, name='ao'))
 
 
 # ======================================
 # Added by COZA.
 
+@cache.cached
+@warmup(lambda rsi_n, win_size, **_: 1 + span_warmup(rsi_n) + win_size)
 def stochastic_rsi(close, rsi_n=14, win_size=3, fillna=True, is_update=False, update_number=None):
     """Calculate stochastic RSI for given data.
 
@@ -345,24 +368,29 @@ def stochastic_rsi(close, rsi_n=14, win_size=3, fillna=True, is_update=False, up
         pandas.Series: stochastic RSI
     """
 
-    so_rsi = []
+    if kernels.enabled():
+        so_rsi = kernels.stochastic_rsi(close, rsi_n=rsi_n, win_size=win_size, fillna=fillna)
+    else:
+        so_rsi = []
 
-    r_sr = rsi(close, n=rsi_n, fillna=fillna)
+        r_sr = rsi(close, n=rsi_n, fillna=fillna)
 
-    for i, r in enumerate(r_sr):
-        start = i-win_size
-        start = start if start > 0 else 0
-        h = r_sr[start:i+1].max()
-        l = r_sr[start:i+1].min()
+        for i, r in enumerate(r_sr):
+            start = i-win_size
+            start = start if start > 0 else 0
+            h = r_sr[start:i+1].max()
+            l = r_sr[start:i+1].min()
 
-        val = (r-l)/(h-l+1e-14)
-        so_rsi.append(val)
+            val = (r-l)/(h-l+1e-14)
+            so_rsi.append(val)
     
     if is_update:
-        return pd.Series(so_rsi, name='SOrsi%k_' + str(win_size)).tail(update_number)
+        return as_precision(pd.Series(so_rsi, name='SOrsi%k_' + str(win_size)).tail(update_number))
     else:
-        return pd.Series(so_rsi, name='SOrsi%k_' + str(win_size))
+        return as_precision(pd.Series(so_rsi, name='SOrsi%k_' + str(win_size)))
 
+@cache.cached
+@warmup(lambda rsi_n, win_size_k, win_size_d, **_: 1 + span_warmup(rsi_n) + win_size_k + span_warmup(win_size_d))
 def stochastic_rsi_k_d(close, rsi_n=14, win_size_k=3, win_size_d=3, fillna=True, is_update=False, update_number=None):
     """Calculate stochastic RSI k d for given data.
 
@@ -376,13 +404,19 @@ def stochastic_rsi_k_d(close, rsi_n=14, win_size_k=3, win_size_d=3, fillna=True,
         pandas.Series: stochastic RSI
     """
 
-    so_rsi_k = stochastic_rsi(close,
-                              rsi_n=rsi_n,
-                              win_size=win_size_k, fillna=fillna)
+    if kernels.enabled():
+        so_rsi_k, so_rsi_d = kernels.stochastic_rsi_k_d(
+            close, rsi_n=rsi_n, win_size_k=win_size_k, win_size_d=win_size_d, fillna=fillna)
+        so_rsi_k = as_precision(pd.Series(so_rsi_k, name='SOrsi%k_' + str(win_size_k)))
+        so_rsi_d = as_precision(pd.Series(so_rsi_d, name='SOrsi%d_' + str(win_size_d)))
+    else:
+        so_rsi_k = stochastic_rsi(close,
+                                  rsi_n=rsi_n,
+                                  win_size=win_size_k, fillna=fillna)
 
-    so_rsi_d = pd.Series(so_rsi_k.ewm(span=win_size_d,
-                                      min_periods=win_size_d).mean(),
-                         name='SOrsi%d_' + str(win_size_d))
+        so_rsi_d = as_precision(pd.Series(so_rsi_k.ewm(span=win_size_d,
+                                                       min_periods=win_size_d).mean(),
+                                          name='SOrsi%d_' + str(win_size_d)))
 
     if is_update:
         return so_rsi_k.tail(update_number), so_rsi_d.tail(update_number)
@@ -390,3 +424,36 @@ def stochastic_rsi_k_d(close, rsi_n=14, win_size_k=3, win_size_d=3, fillna=True,
         return so_rsi_k, so_rsi_d
 
 
+# ======================================
+# Streaming evaluation
+
+
+class TrueStrengthIndex(object):
+    """Streaming True strength index (TSI)
+
+    Same values as tsi without fillna, one candle at a time: its four
+    exponential moving averages are updated in O(1) per candle.
+
+    Args:
+        r(int): high period.
+        s(int): low period.
+    """
+    def __init__(self, r=25, s=13):
+        self.m1 = (Ewma(1.0 / (1 + r)), Ewma(1.0 / (1 + s)))
+        self.m2 = (Ewma(1.0 / (1 + r)), Ewma(1.0 / (1 + s)))
+        self.last = np.nan
+
+    def update(self, close):
+        """Add a candle close.
+
+        Args:
+            close(float): close of the new candle.
+
+        Returns:
+            float: tsi of the new candle.
+        """
+        m, self.last = close - self.last, close
+        m1 = self.m1[1].update(self.m1[0].update(m))
+        m2 = self.m2[1].update(self.m2[0].update(abs(m)))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.float64(m1) / m2 * 100
@@ -8,7 +8,12 @@
 """
 import pandas as pd
 
+from . import cache
+from .utils import as_precision, warmup
 
+
+@cache.cached
+@warmup(lambda **_: 1)
 def daily_return(close, fillna=True, is_update=False, update_number=None):
     """Daily Return (DR)
 
@@ -25,11 +30,13 @@ def daily_return(close, fillna=True, is_update=False, update_number=None):
         dr = dr.fillna(0)
         
     if is_update:
-        return pd.Series(dr, name='d_ret').tail(update_number)
+        return as_precision(pd.Series(dr, name='d_ret').tail(update_number))
     else:
-        return pd.Series(dr, name='d_ret')
+        return as_precision(pd.Series(dr, name='d_ret'))
 
 
+@cache.cached
+@warmup(lambda **_: 1, cumulative=True)
 def cumulative_return(close, fillna=True, is_update=False, update_number=None):
     """Cumulative Return (CR)
 
@@ -46,6 +53,6 @@ def cumulative_return(close, fillna=True, is_update=False, update_number=None):
         cr = cr.fillna(method='backfill')
     
     if is_update:
-        return pd.Series(cr, name='cum_ret').tail(update_number)
+        return as_precision(pd.Series(cr, name='cum_ret').tail(update_number))
     else:
-        return pd.Series(cr, name='cum_ret')
+        return as_precision(pd.Series(cr, name='cum_ret'))
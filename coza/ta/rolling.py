@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+"""
+.. module:: rolling
+   :synopsis: Rolling window statistics shared by the band indicators.
+
+RollingStats keeps the mean, variance, max and min of the last n values and
+updates them in O(1) per value, for streaming use, as Ewma does for exponential
+moving averages. rolling_stats is the batch
+form: it computes the requested statistics of a Series in one pass. While
+coza.ta.cache is enabled, it also shares them between the callers asking for
+the same window of the same data, e.g. bollinger_hband, bollinger_lband and
+their indicators.
+
+"""
+from collections import OrderedDict, deque
+import math
+import threading
+
+import numpy as np
+
+
+class RollingStats(object):
+    """Mean, variance, max and min over the last n values.
+
+    Mean and variance use Welford's update extended to a sliding window, max
+    and min use monotonic deques. Like pandas' rolling(n), the statistics are
+    nan until n values were seen and while the window holds a nan.
+
+    Args:
+        n(int): window size.
+        ddof(int): delta degrees of freedom of the variance.
+    """
+    def __init__(self, n, ddof=1):
+        self.n = n
+        self.ddof = ddof
+        self.window = deque()
+        self.count = 0
+        self.nans = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._max = deque()
+        self._min = deque()
+        self._i = 0
+
+    def update(self, x):
+        """Push a value, dropping the oldest one when the window is full.
+
+        Args:
+            x(float): new value.
+
+        Returns:
+            RollingStats: self.
+        """
+        x = float(x)
+        self.window.append(x)
+        if x != x:
+            self.nans += 1
+        else:
+            self._add(x)
+            while self._max and self._max[-1][1] <= x:
+                self._max.pop()
+            self._max.append((self._i, x))
+            while self._min and self._min[-1][1] >= x:
+                self._min.pop()
+            self._min.append((self._i, x))
+
+        if len(self.window) > self.n:
+            old = self.window.popleft()
+            if old != old:
+                self.nans -= 1
+            else:
+                self._remove(old)
+
+        while self._max and self._max[0][0] <= self._i - self.n:
+            self._max.popleft()
+        while self._min and self._min[0][0] <= self._i - self.n:
+            self._min.popleft()
+
+        self._i += 1
+        if self._i % (100 * self.n) == 0:
+            self._resync()
+        return self
+
+    def _add(self, x):
+        self.count += 1
+        delta = x - self._mean
+        self._mean += delta / self.count
+        self._m2 += delta * (x - self._mean)
+
+    def _remove(self, x):
+        self.count -= 1
+        if self.count == 0:
+            self._mean = 0.0
+            self._m2 = 0.0
+            return
+        delta = x - self._mean
+        self._mean -= delta / self.count
+        self._m2 -= delta * (x - self._mean)
+
+    def _resync(self):
+        # bound the rounding error accumulated by the sliding updates
+        values = [v for v in self.window if v == v]
+        self.count = len(values)
+        self._mean = math.fsum(values) / self.count if values else 0.0
+        self._m2 = math.fsum((v - self._mean) ** 2 for v in values)
+
+    @property
+    def ready(self):
+        return len(self.window) == self.n and self.nans == 0
+
+    @property
+    def mean(self):
+        return self._mean if self.ready else np.nan
+
+    @property
+    def var(self):
+        if not self.ready or self.count - self.ddof <= 0:
+            return np.nan
+        return max(self._m2, 0.0) / (self.count - self.ddof)
+
+    @property
+    def std(self):
+        return math.sqrt(self.var) if self.ready else np.nan
+
+    @property
+    def max(self):
+        return self._max[0][1] if self.ready else np.nan
+
+    @property
+    def min(self):
+        return self._min[0][1] if self.ready else np.nan
+
+
+class Ewma(object):
+    """Exponential moving average updated one value at a time.
+
+    Same values as pandas' ewm(alpha=alpha, min_periods=min_periods).mean().
+
+    Args:
+        alpha(float): smoothing factor.
+        min_periods(int): values needed before the average is defined.
+    """
+    def __init__(self, alpha, min_periods=0):
+        self.alpha = alpha
+        self.min_periods = max(min_periods, 1)
+        self.weighted = None
+        self.old_wt = 1.0
+        self.nobs = 0
+
+    def update(self, x):
+        """Push a value.
+
+        Args:
+            x(float): new value.
+
+        Returns:
+            float: the average, nan before min_periods values.
+        """
+        x = float(x)
+        is_observation = x == x
+        if is_observation:
+            self.nobs += 1
+        if self.weighted is None:
+            self.weighted = x
+        elif self.weighted == self.weighted:
+            self.old_wt *= 1.0 - self.alpha
+            if is_observation:
+                if self.weighted != x:
+                    self.weighted = (self.old_wt * self.weighted + x) / (self.old_wt + 1.0)
+                self.old_wt += 1.0
+        elif is_observation:
+            self.weighted = x
+        return self.value
+
+    @property
+    def value(self):
+        return self.weighted if self.nobs >= self.min_periods else np.nan
+
+
+# ======================================
+# Batch
+
+_MEMO_SIZE = 32
+_memo = OrderedDict()
+_lock = threading.Lock()
+
+
+def fingerprint(series):
+    """Cheap identity of a Series' data: its buffer, length and end points."""
+    values = series.values
+    if len(values) == 0:
+        return None
+    return (values.__array_interface__['data'][0], values.dtype.str, len(values),
+            series.index[0], series.index[-1], values[0], values[-1])
+
+
+def clear():
+    """Drop every shared result."""
+    with _lock:
+        _memo.clear()
+
+
+def shared(key, compute, inputs=()):
+    """Return compute(), reusing the result of the last calls with the same key
+    while coza.ta.cache is enabled. Like the cache, the key only fingerprints
+    the inputs, so data modified in place is not detected.
+
+    Args:
+        key(tuple): identity of the computation, None disables sharing.
+        compute(callable): computes the value.
+        inputs(tuple): Series the key fingerprints. They are kept alive with the
+            result so that their buffers cannot be reused by other data.
+    """
+    from . import cache
+    if not cache.MAXSIZE or key is None or any(part is None for part in key):
+        return compute()
+    try:
+        with _lock:
+            entry = _memo.pop(key, None)
+    except TypeError:
+        return compute()
+    if entry is None:
+        entry = (compute(), tuple(x.values for x in inputs))
+    with _lock:
+        _memo[key] = entry
+        while len(_memo) > _MEMO_SIZE:
+            _memo.popitem(last=False)
+    return entry[0]
+
+
+def rolling_stats(series, n, *stats):
+    """Rolling statistics of a Series, computed over one window object and
+    shared between callers while coza.ta.cache is enabled.
+
+    pandas' rolling aggregations are already online (O(1) per row), so the batch
+    form relies on them and only avoids computing the same window twice.
+
+    Args:
+        series(pandas.Series): data.
+        n(int): window size.
+        stats(str): any of 'mean', 'std', 'var', 'max', 'min'.
+
+    Returns:
+        tuple(pandas.Series): one Series per requested statistic.
+    """
+    key = fingerprint(series)
+    window = series.rolling(n)
+    return tuple(
+        shared((key, n, stat), lambda: getattr(window, stat)(), (series,))
+        for stat in stats)
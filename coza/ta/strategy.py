@@ -1,11 +1,42 @@
+from collections import deque
+import math
+
+import numpy as np
 import pandas as pd
-from .volatility import bollinger_lband, bollinger_hband
 
 
-def golden_cross(close,
-                 short_win_size=5,
-                 long_win_size=20, fillna=True):
-    """Moving Average Strategy - Golden Cross
+def cross_over(fast, slow):
+    """Cross over signal
+
+    Args:
+        fast (pd.Series): Series crossing.
+        slow (pd.Series): Series crossed.
+
+    Returns:
+        pd.Series: True where `fast` moves above `slow`.
+    """
+    return (fast > slow) & (fast.shift(1) < slow.shift(1))
+
+
+def cross_under(fast, slow):
+    """Cross under signal
+
+    Args:
+        fast (pd.Series): Series crossing.
+        slow (pd.Series): Series crossed.
+
+    Returns:
+        pd.Series: True where `fast` moves below `slow`.
+    """
+    return (fast < slow) & (fast.shift(1) > slow.shift(1))
+
+
+def moving_average_cross(close,
+                         short_win_size=5,
+                         long_win_size=20, fillna=True):
+    """Moving Average Strategy - Golden Cross and Dead Cross
+
+    Each moving average is computed once and both signals are derived from it.
 
     Args:
         close (pd.Series): Series of the candle data.
@@ -13,19 +44,31 @@ def golden_cross(close,
         long_win_size (int): window of long-term moving average.
 
     Returns:
-        bool: decision.
+        tuple(pd.Series, pd.Series): golden cross and dead cross decisions.
     """
     assert len(close) >= long_win_size and len(close) >= short_win_size, "close(price list) is shorter than win_size(window size)"
 
-    short_mean_curr = close[1:].rolling(window=short_win_size).mean()
-    long_mean_curr = close[1:].rolling(window=long_win_size).mean()
+    short_mean = close.rolling(window=short_win_size).mean()
+    long_mean = close.rolling(window=long_win_size).mean()
+
+    return (pd.Series(cross_over(short_mean, long_mean), name='gc_%d_%d' % (short_win_size, long_win_size)),
+            pd.Series(cross_under(short_mean, long_mean), name='dc_%d_%d' % (short_win_size, long_win_size)))
+
+
+def golden_cross(close,
+                 short_win_size=5,
+                 long_win_size=20, fillna=True):
+    """Moving Average Strategy - Golden Cross
 
-    short_mean_last = close[:-1].rolling(window=short_win_size).mean()
-    long_mean_last = close[:-1].rolling(window=long_win_size).mean()
+    Args:
+        close (pd.Series): Series of the candle data.
+        short_win_size (int): window of short-term moving average.
+        long_win_size (int): window of long-term moving average.
 
-    return pd.Series((short_mean_curr > long_mean_curr) & (
-                     short_mean_last < long_mean_last),
-                     name='gc_%d_%d' % (short_win_size, long_win_size))
+    Returns:
+        pd.Series: decision, True where the short-term average moves above the long-term one.
+    """
+    return moving_average_cross(close, short_win_size, long_win_size, fillna)[0]
 
 
 def dead_cross(close,
@@ -39,18 +82,36 @@ def dead_cross(close,
         long_win_size (int): window of long-term moving average.
 
     Returns:
-        bool: decision.
+        pd.Series: decision, True where the short-term average moves below the long-term one.
     """
+    return moving_average_cross(close, short_win_size, long_win_size, fillna)[1]
 
-    short_mean_curr = close[1:].rolling(window=short_win_size).mean()
-    long_mean_curr = close[1:].rolling(window=long_win_size).mean()
 
-    short_mean_last = close[:-1].rolling(window=short_win_size).mean()
-    long_mean_last = close[:-1].rolling(window=long_win_size).mean()
+def bollinger_bound_rolling(close,
+                            win_size=20,
+                            k=2, fillna=True):
+    """Bolinger Band Strategy - Lower and Upper bound
+
+    The bands are computed once for both decisions.
+
+    Args:
+        close (pd.Series): Series of the candle data.
+        win_size (int): window size of bolinger band.
+        k (int): bolinger band parameter. a weight of standard deviation.
+
+    Returns:
+        tuple(pd.Series, pd.Series): lower than lower bound and upper than upper bound decisions.
+    """
+    mavg = close.rolling(win_size).mean()
+    mstd = close.rolling(win_size).std()
+    lband = mavg - k * mstd
+    hband = mavg + k * mstd
+    if fillna:
+        lband = lband.replace([np.inf, -np.inf], np.nan).fillna(method='backfill')
+        hband = hband.replace([np.inf, -np.inf], np.nan).fillna(method='backfill')
 
-    return pd.Series((short_mean_curr < long_mean_curr) & (
-                     short_mean_last > long_mean_last),
-                     name='dc_%d_%d' % (short_win_size, long_win_size))
+    return (pd.Series(close < lband, name='lower_than_blb_%d_%d' % (win_size, k)),
+            pd.Series(close > hband, name='upper_than_bub_%d_%d' % (win_size, k)))
 
 
 def lower_than_bollinger_lower_bound_rolling(close,
@@ -66,12 +127,7 @@ def lower_than_bollinger_lower_bound_rolling(close,
     Returns:
         pd.Series: decision.
     """
-    blb_sr = bollinger_lband(close=close,
-                             n=win_size,
-                             ndev=k, fillna=fillna)
-
-    return pd.Series(close < blb_sr,
-                     name='lower_than_blb_%d_%d' % (win_size, k))
+    return bollinger_bound_rolling(close, win_size, k, fillna)[0]
 
 
 def upper_than_bollinger_upper_bound_rolling(close,
@@ -87,12 +143,107 @@ def upper_than_bollinger_upper_bound_rolling(close,
     Returns:
         pd.Series: decision.
     """
-    bub_sr = bollinger_hband(close=close,
-                             n=win_size,
-                             ndev=k, fillna=fillna)
+    return bollinger_bound_rolling(close, win_size, k, fillna)[1]
+
+
+# ======================================
+# Streaming evaluation
+
+GOLDEN_CROSS = 'golden_cross'
+DEAD_CROSS = 'dead_cross'
 
-    return pd.Series(close > bub_sr,
-                     name='upper_than_bub_%d_%d' % (win_size, k))
 
+class MovingAverageCross(object):
+    """Streaming Golden Cross / Dead Cross
 
+    Emits the same events as moving_average_cross, one candle at a time and in
+    O(1) per candle, e.g. from make_orders:
 
+        >>> cross = MovingAverageCross(5, 20)
+        >>> cross.extend(data['btc_1']['close'])                        # warm up once
+        >>> event = cross.update(data['btc_1']['close'].iloc[-1])       # each new candle
+
+    Like rolling(n).mean(), an average is nan while its window holds a nan,
+    so no event is emitted until the nan left both windows.
+
+    Args:
+        short_win_size (int): window of short-term moving average.
+        long_win_size (int): window of long-term moving average.
+    """
+    def __init__(self, short_win_size=5, long_win_size=20):
+        self.short_win_size = short_win_size
+        self.long_win_size = long_win_size
+        self.window = deque(maxlen=max(short_win_size, long_win_size) + 1)
+        self.short_sum = 0.0
+        self.long_sum = 0.0
+        self.short_nans = 0
+        self.long_nans = 0
+        self.last = None
+        self._i = 0
+
+    def _mean(self, total, nans, n):
+        return total / n if len(self.window) > n - 1 and nans == 0 else None
+
+    def _resync(self):
+        # bound the rounding error accumulated by the sliding sums
+        window = list(self.window)
+        self.short_sum = math.fsum(v for v in window[-self.short_win_size:] if v == v)
+        self.long_sum = math.fsum(v for v in window[-self.long_win_size:] if v == v)
+
+    def update(self, price):
+        """Add a candle close.
+
+        Args:
+            price (float): close of the new candle.
+
+        Returns:
+            str: GOLDEN_CROSS, DEAD_CROSS or None.
+        """
+        x = float(price)
+        self.window.append(x)
+        if x != x:
+            self.short_nans += 1
+            self.long_nans += 1
+        else:
+            self.short_sum += x
+            self.long_sum += x
+        if len(self.window) > self.short_win_size:
+            old = self.window[-1 - self.short_win_size]
+            if old != old:
+                self.short_nans -= 1
+            else:
+                self.short_sum -= old
+        if len(self.window) > self.long_win_size:
+            old = self.window[-1 - self.long_win_size]
+            if old != old:
+                self.long_nans -= 1
+            else:
+                self.long_sum -= old
+
+        self._i += 1
+        if self._i % (100 * max(self.short_win_size, self.long_win_size)) == 0:
+            self._resync()
+
+        short_mean = self._mean(self.short_sum, self.short_nans, self.short_win_size)
+        long_mean = self._mean(self.long_sum, self.long_nans, self.long_win_size)
+        current = None if short_mean is None or long_mean is None else (short_mean, long_mean)
+        last, self.last = self.last, current
+
+        if current is None or last is None:
+            return None
+        if current[0] > current[1] and last[0] < last[1]:
+            return GOLDEN_CROSS
+        if current[0] < current[1] and last[0] > last[1]:
+            return DEAD_CROSS
+        return None
+
+    def extend(self, prices):
+        """Add several candle closes.
+
+        Args:
+            prices (iterable): closes in chronological order.
+
+        Returns:
+            list: event of each close.
+        """
+        return [self.update(price) for price in prices]
@@ -8,9 +8,16 @@
 """
 import pandas as pd
 import numpy as np
+
+from collections import deque
+
+from . import cache, kernels
+from .rolling import RollingStats
 from .utils import *
 
 
+@cache.cached
+@warmup(lambda n_fast, n_slow, **_: span_warmup(max(n_fast, n_slow)))
 def macd(close, n_fast=12, n_slow=26, fillna=True, is_update=False, update_number=None):
     """Moving Average Convergence Divergence (MACD)
 
@@ -35,11 +42,13 @@ def macd(close, n_fast=12, n_slow=26, fillna=True, is_update=False, update_numbe
         macd = macd.replace([np.inf, -np.inf], np.nan).fillna(0)
     
     if is_update:
-        return pd.Series(macd, name='MACD_%d_%d' % (n_fast, n_slow)).tail(update_number)
+        return as_precision(pd.Series(macd, name='MACD_%d_%d' % (n_fast, n_slow)).tail(update_number))
     else:
-        return pd.Series(macd, name='MACD_%d_%d' % (n_fast, n_slow))
+        return as_precision(pd.Series(macd, name='MACD_%d_%d' % (n_fast, n_slow)))
 
 
+@cache.cached
+@warmup(lambda n_fast, n_slow, n_sign, **_: span_warmup(max(n_fast, n_slow)) + span_warmup(n_sign))
 def macd_signal(close, n_fast=12, n_slow=26, n_sign=9, fillna=True, is_update=False, update_number=None):
     """Moving Average Convergence Divergence (MACD Signal)
 
@@ -65,11 +74,13 @@ def macd_signal(close, n_fast=12, n_slow=26, n_sign=9, fillna=True, is_update=Fa
         macd_signal = macd_signal.replace([np.inf, -np.inf], np.nan).fillna(0)
     
     if is_update:
-        return pd.Series(macd_signal, name='MACD_sign').tail(update_number)
+        return as_precision(pd.Series(macd_signal, name='MACD_sign').tail(update_number))
     else:
-        return pd.Series(macd_signal, name='MACD_sign')
+        return as_precision(pd.Series(macd_signal, name='MACD_sign'))
 
 
+@cache.cached
+@warmup(lambda n_fast, n_slow, n_sign, **_: span_warmup(max(n_fast, n_slow)) + span_warmup(n_sign))
 def macd_diff(close, n_fast=12, n_slow=26, n_sign=9, fillna=True, is_update=False, update_number=None):
     """Moving Average Convergence Divergence (MACD Diff)
 
@@ -96,11 +107,13 @@ def macd_diff(close, n_fast=12, n_slow=26, n_sign=9, fillna=True, is_update=Fals
         macd_diff = macd_diff.replace([np.inf, -np.inf], np.nan).fillna(0)
     
     if is_update:
-        return pd.Series(macd_diff, name='MACD_diff').tail(update_number)
+        return as_precision(pd.Series(macd_diff, name='MACD_diff').tail(update_number))
     else:
-        return pd.Series(macd_diff, name='MACD_diff')
+        return as_precision(pd.Series(macd_diff, name='MACD_diff'))
 
 
+@cache.cached
+@warmup(lambda n, **_: span_warmup(n))
 def ema_indicator(close, n=12, fillna=False, is_update=False, update_number=None):
     """EMA
     Exponential Moving Average via Pandas
@@ -114,11 +127,13 @@ def ema_indicator(close, n=12, fillna=False, is_update=False, update_number=None
     ema_ = ema(close, n, fillna)
     
     if is_update:
-        return pd.Series(ema_, name='ema').tail(update_number)
+        return as_precision(pd.Series(ema_, name='ema').tail(update_number))
     else:
-        return pd.Series(ema_, name='ema')
+        return as_precision(pd.Series(ema_, name='ema'))
 
 
+@cache.cached
+@warmup(lambda n, **_: n + span_warmup(n))
 def adx(high, low, close, n=14, fillna=True, is_update=False, update_number=None):
     """Average Directional Movement Index (ADX)
 
@@ -167,11 +182,13 @@ def adx(high, low, close, n=14, fillna=True, is_update=False, update_number=None
         adx = adx.replace([np.inf, -np.inf], np.nan).fillna(40)
 
     if is_update:
-        return pd.Series(adx, name='adx').tail(update_number)
+        return as_precision(pd.Series(adx, name='adx').tail(update_number))
     else:
-        return pd.Series(adx, name='adx')
+        return as_precision(pd.Series(adx, name='adx'))
 
 
+@cache.cached
+@warmup(lambda n, **_: n)
 def adx_pos(high, low, close, n=14, fillna=True, is_update=False, update_number=None):
     """Average Directional Movement Index Positive (ADX)
 
@@ -216,11 +233,13 @@ def adx_pos(high, low, close, n=14, fillna=True, is_update=False, update_number=
         dip = dip.replace([np.inf, -np.inf], np.nan).fillna(20)
     
     if is_update:
-        return pd.Series(dip, name='adx_pos').tail(update_number)
+        return as_precision(pd.Series(dip, name='adx_pos').tail(update_number))
     else:
-        return pd.Series(dip, name='adx_pos')
+        return as_precision(pd.Series(dip, name='adx_pos'))
 
 
+@cache.cached
+@warmup(lambda n, **_: n)
 def adx_neg(high, low, close, n=14, fillna=True, is_update=False, update_number=None):
     """Average Directional Movement Index Negative (ADX)
 
@@ -265,11 +284,13 @@ def adx_neg(high, low, close, n=14, fillna=True, is_update=False, update_number=
         din = din.replace([np.inf, -np.inf], np.nan).fillna(20)
     
     if is_update:
-        return pd.Series(din, name='adx_neg').tail(update_number)
+        return as_precision(pd.Series(din, name='adx_neg').tail(update_number))
     else:
-        return pd.Series(din, name='adx_neg')
+        return as_precision(pd.Series(din, name='adx_neg'))
 
 
+@cache.cached
+@warmup(lambda n, **_: n)
 def adx_indicator(high, low, close, n=14, fillna=True, is_update=False, update_number=None):
     """Average Directional Movement Index Indicator (ADX)
 
@@ -315,11 +336,13 @@ def adx_indicator(high, low, close, n=14, fillna=True, is_update=False, update_n
         adx_ind = adx_ind.fillna(0)
     
     if is_update:
-        return pd.Series(adx_ind, name='adx_ind').tail(update_number)
+        return as_precision(pd.Series(adx_ind, name='adx_ind').tail(update_number))
     else:
-        return pd.Series(adx_ind, name='adx_ind')
+        return as_precision(pd.Series(adx_ind, name='adx_ind'))
 
 
+@cache.cached
+@warmup(lambda n, **_: n)
 def vortex_indicator_pos(high, low, close, n=14, fillna=True, is_update=False, update_number=None):
     """Vortex Indicator (VI)
 
@@ -350,11 +373,13 @@ def vortex_indicator_pos(high, low, close, n=14, fillna=True, is_update=False, u
         vip = vip.replace([np.inf, -np.inf], np.nan).fillna(1)
     
     if is_update:
-        return pd.Series(vip, name='vip').tail(update_number)
+        return as_precision(pd.Series(vip, name='vip').tail(update_number))
     else:
-        return pd.Series(vip, name='vip')
+        return as_precision(pd.Series(vip, name='vip'))
 
 
+@cache.cached
+@warmup(lambda n, **_: n)
 def vortex_indicator_neg(high, low, close, n=14, fillna=True, is_update=False, update_number=None):
     """Vortex Indicator (VI)
 
@@ -385,11 +410,13 @@ def vortex_indicator_neg(high, low, close, n=14, fillna=True, is_update=False, u
         vin = vin.replace([np.inf, -np.inf], np.nan).fillna(1)
     
     if is_update:
-        return pd.Series(vin, name='vin').tail(update_number) 
+        return as_precision(pd.Series(vin, name='vin').tail(update_number))
     else:
-        return pd.Series(vin, name='vin')
+        return as_precision(pd.Series(vin, name='vin'))
 
 
+@cache.cached
+@warmup(lambda n, **_: 1 + 3 * span_warmup(n))
 def trix(close, n=15, fillna=True, is_update=False, update_number=None):
     """Trix (TRIX)
 
@@ -415,11 +442,13 @@ def trix(close, n=15, fillna=True, is_update=False, update_number=None):
         trix = trix.replace([np.inf, -np.inf], np.nan).fillna(0)
     
     if is_update:
-        return pd.Series(trix, name='trix_' + str(n)).tail(update_number)
+        return as_precision(pd.Series(trix, name='trix_' + str(n)).tail(update_number))
     else:
-        return pd.Series(trix, name='trix_' + str(n))
+        return as_precision(pd.Series(trix, name='trix_' + str(n)))
 
 
+@cache.cached
+@warmup(lambda n, n2, **_: n2 - 1 + 2 * span_warmup(n))
 def mass_index(high, low, n=9, n2=25, fillna=True, is_update=False, update_number=None):
     """Mass Index (MI)
 
@@ -449,11 +478,13 @@ def mass_index(high, low, n=9, n2=25, fillna=True, is_update=False, update_numbe
         mass = mass.replace([np.inf, -np.inf], np.nan).fillna(n2)
     
     if is_update:
-        return pd.Series(mass, name='mass_index_' + str(n)).tail(update_number)
+        return as_precision(pd.Series(mass, name='mass_index_' + str(n)).tail(update_number))
     else:
-        return pd.Series(mass, name='mass_index_' + str(n))
+        return as_precision(pd.Series(mass, name='mass_index_' + str(n)))
 
 
+@cache.cached
+@warmup(lambda n, **_: n - 1)
 def cci(high, low, close, n=20, c=0.015, fillna=True, is_update=False, update_number=None):
     """Commodity Channel Index (CCI)
 
@@ -484,11 +515,13 @@ def cci(high, low, close, n=20, c=0.015, fillna=True, is_update=False, update_nu
         cci = cci.replace([np.inf, -np.inf], np.nan).fillna(0)
     
     if is_update:
-        return pd.Series(cci, name='cci').tail(update_number)
+        return as_precision(pd.Series(cci, name='cci').tail(update_number))
     else:
-        return pd.Series(cci, name='cci')
+        return as_precision(pd.Series(cci, name='cci'))
 
 
+@cache.cached
+@warmup(lambda n, **_: max(n - 1, int(0.5 * n) + 1))
 def dpo(close, n=20, fillna=True, is_update=False, update_number=None):
     """Detrended Price Oscillator (DPO)
 
@@ -510,11 +543,13 @@ def dpo(close, n=20, fillna=True, is_update=False, update_number=None):
         dpo = dpo.replace([np.inf, -np.inf], np.nan).fillna(0)
     
     if is_update:
-        return pd.Series(dpo, name='dpo_'+str(n)).tail(update_number)
+        return as_precision(pd.Series(dpo, name='dpo_'+str(n)).tail(update_number))
     else:
-        return pd.Series(dpo, name='dpo_'+str(n))
+        return as_precision(pd.Series(dpo, name='dpo_'+str(n)))
 
 
+@cache.cached
+@warmup(lambda r1, r2, r3, r4, n1, n2, n3, n4, **_: max(r1 + n1, r2 + n2, r3 + n3, r4 + n4) - 1)
 def kst(close, r1=10, r2=15, r3=20, r4=30, n1=10, n2=10, n3=10, n4=15, fillna=True, is_update=False, update_number=None):
     """KST Oscillator (KST)
 
@@ -540,20 +575,25 @@ def kst(close, r1=10, r2=15, r3=20, r4=30, n1=10, n2=10, n3=10, n4=15, fillna=Tr
     Returns:
         pandas.Series: New feature generated.
     """
-    rocma1 = ((close - close.shift(r1)) / close.shift(r1)).rolling(n1).mean()
-    rocma2 = ((close - close.shift(r2)) / close.shift(r2)).rolling(n2).mean()
-    rocma3 = ((close - close.shift(r3)) / close.shift(r3)).rolling(n3).mean()
-    rocma4 = ((close - close.shift(r4)) / close.shift(r4)).rolling(n4).mean()
-    kst = 100*(rocma1 + 2*rocma2 + 3*rocma3 + 4*rocma4)
+    if kernels.enabled():
+        kst = pd.Series(kernels.kst(close, r1, r2, r3, r4, n1, n2, n3, n4), index=close.index)
+    else:
+        rocma1 = ((close - close.shift(r1)) / close.shift(r1)).rolling(n1).mean()
+        rocma2 = ((close - close.shift(r2)) / close.shift(r2)).rolling(n2).mean()
+        rocma3 = ((close - close.shift(r3)) / close.shift(r3)).rolling(n3).mean()
+        rocma4 = ((close - close.shift(r4)) / close.shift(r4)).rolling(n4).mean()
+        kst = 100*(rocma1 + 2*rocma2 + 3*rocma3 + 4*rocma4)
     if fillna:
         kst = kst.replace([np.inf, -np.inf], np.nan).fillna(0)
     
     if is_update:
-        return pd.Series(kst, name='kst').tail(update_number)
+        return as_precision(pd.Series(kst, name='kst').tail(update_number))
     else:
-        return pd.Series(kst, name='kst')
+        return as_precision(pd.Series(kst, name='kst'))
 
 
+@cache.cached
+@warmup(lambda r1, r2, r3, r4, n1, n2, n3, n4, nsig, **_: max(r1 + n1, r2 + n2, r3 + n3, r4 + n4) + nsig - 2)
 def kst_sig(close, r1=10, r2=15, r3=20, r4=30, n1=10, n2=10, n3=10, n4=15, nsig=9, fillna=True, is_update=False, update_number=None):
     """KST Oscillator (KST Signal)
 
@@ -580,21 +620,26 @@ def kst_sig(close, r1=10, r2=15, r3=20, r4=30, n1=10, n2=10, n3=10, n4=15, nsig=
     Returns:
         pandas.Series: New feature generated.
     """
-    rocma1 = ((close - close.shift(r1)) / close.shift(r1)).rolling(n1).mean()
-    rocma2 = ((close - close.shift(r2)) / close.shift(r2)).rolling(n2).mean()
-    rocma3 = ((close - close.shift(r3)) / close.shift(r3)).rolling(n3).mean()
-    rocma4 = ((close - close.shift(r4)) / close.shift(r4)).rolling(n4).mean()
-    kst = 100*(rocma1 + 2*rocma2 + 3*rocma3 + 4*rocma4)
-    kst_sig = kst.rolling(nsig).mean()
+    if kernels.enabled():
+        kst_sig = pd.Series(kernels.kst_sig(close, r1, r2, r3, r4, n1, n2, n3, n4, nsig), index=close.index)
+    else:
+        rocma1 = ((close - close.shift(r1)) / close.shift(r1)).rolling(n1).mean()
+        rocma2 = ((close - close.shift(r2)) / close.shift(r2)).rolling(n2).mean()
+        rocma3 = ((close - close.shift(r3)) / close.shift(r3)).rolling(n3).mean()
+        rocma4 = ((close - close.shift(r4)) / close.shift(r4)).rolling(n4).mean()
+        kst = 100*(rocma1 + 2*rocma2 + 3*rocma3 + 4*rocma4)
+        kst_sig = kst.rolling(nsig).mean()
     if fillna:
         kst_sig = kst_sig.replace([np.inf, -np.inf], np.nan).fillna(0)
     
     if is_update:
-        return pd.Series(kst_sig, name='kst_sig').tail(update_number)
+        return as_precision(pd.Series(kst_sig, name='kst_sig').tail(update_number))
     else:
-        return pd.Series(kst_sig, name='kst_sig')
+        return as_precision(pd.Series(kst_sig, name='kst_sig'))
 
 
+@cache.cached
+@warmup(lambda n1, n2, visual, **_: max(n1, n2) - 1 + (n2 if visual else 0))
 def ichimoku_a(high, low, n1=9, n2=26, visual=False, fillna=True, is_update=False, update_number=None):
     """Ichimoku Kinkō Hyō (Ichimoku)
 
@@ -612,10 +657,13 @@ def ichimoku_a(high, low, n1=9, n2=26, visual=False, fillna=True, is_update=Fals
     Returns:
         pandas.Series: New feature generated.
     """
-    conv = 0.5 * (high.rolling(n1).max() + low.rolling(n1).min())
-    base = 0.5 * (high.rolling(n2).max() + low.rolling(n2).min())
+    if kernels.enabled():
+        spana = pd.Series(kernels.ichimoku_a(high, low, n1, n2), index=high.index)
+    else:
+        conv = 0.5 * (high.rolling(n1).max() + low.rolling(n1).min())
+        base = 0.5 * (high.rolling(n2).max() + low.rolling(n2).min())
 
-    spana = 0.5 * (conv + base)
+        spana = 0.5 * (conv + base)
 
     if visual:
         spana = spana.shift(n2)
@@ -624,11 +672,13 @@ def ichimoku_a(high, low, n1=9, n2=26, visual=False, fillna=True, is_update=Fals
         spana = spana.replace([np.inf, -np.inf], np.nan).fillna(method='backfill')
 
     if is_update:
-        return pd.Series(spana, name='ichimoku_a_' + str(n2)).tail(update_number)
+        return as_precision(pd.Series(spana, name='ichimoku_a_' + str(n2)).tail(update_number))
     else:
-        return pd.Series(spana, name='ichimoku_a_' + str(n2))
+        return as_precision(pd.Series(spana, name='ichimoku_a_' + str(n2)))
 
 
+@cache.cached
+@warmup(lambda n2, n3, visual, **_: n3 - 1 + (n2 if visual else 0))
 def ichimoku_b(high, low, n2=26, n3=52, visual=False, fillna=True, is_update=False, update_number=None):
     """Ichimoku Kinkō Hyō (Ichimoku)
 
@@ -646,7 +696,10 @@ def ichimoku_b(high, low, n2=26, n3=52, visual=False, fillna=True, is_update=Fal
     Returns:
         pandas.Series: New feature generated.
     """
-    spanb = 0.5 * (high.rolling(n3).max() + low.rolling(n3).min())
+    if kernels.enabled():
+        spanb = pd.Series(kernels.ichimoku_b(high, low, n3), index=high.index)
+    else:
+        spanb = 0.5 * (high.rolling(n3).max() + low.rolling(n3).min())
 
     if visual:
         spanb = spanb.shift(n2)
@@ -655,11 +708,13 @@ def ichimoku_b(high, low, n2=26, n3=52, visual=False, fillna=True, is_update=Fal
         spanb = spanb.replace([np.inf, -np.inf], np.nan).fillna(method='backfill')
 
     if is_update:
-        return pd.Series(spanb, name='ichimoku_b_' + str(n2)).tail(update_number)
+        return as_precision(pd.Series(spanb, name='ichimoku_b_' + str(n2)).tail(update_number))
     else:
-        return pd.Series(spanb, name='ichimoku_b_' + str(n2))
+        return as_precision(pd.Series(spanb, name='ichimoku_b_' + str(n2)))
 
 
+@cache.cached
+@warmup(lambda n, **_: n - 1)
 def aroon_up(close, n=25, fillna=False, is_update=False, update_number=None):
     """Aroon Indicator (AI)
     Identify when trends are likely to change direction (uptrend).
@@ -677,11 +732,13 @@ def aroon_up(close, n=25, fillna=False, is_update=False, update_number=None):
         aroon_up = aroon_up.replace([np.inf, -np.inf], np.nan).fillna(0)
     
     if is_update:
-        return pd.Series(aroon_up, name='aroon_up'+str(n)).tail(update_number)
+        return as_precision(pd.Series(aroon_up, name='aroon_up'+str(n)).tail(update_number))
     else:
-        return pd.Series(aroon_up, name='aroon_up'+str(n))
+        return as_precision(pd.Series(aroon_up, name='aroon_up'+str(n)))
 
 
+@cache.cached
+@warmup(lambda n, **_: n - 1)
 def aroon_down(close, n=25, fillna=False, is_update=False, update_number=None):
     """Aroon Indicator (AI)
     Identify when trends are likely to change direction (downtrend).
@@ -699,6 +756,77 @@ def aroon_down(close, n=25, fillna=False, is_update=False, update_number=None):
         aroon_down = aroon_down.replace([np.inf, -np.inf], np.nan).fillna(0)
     
     if is_update:
-        return pd.Series(aroon_down, name='aroon_down'+str(n)).tail(update_number)
+        return as_precision(pd.Series(aroon_down, name='aroon_down'+str(n)).tail(update_number))
     else:
-        return pd.Series(aroon_down, name='aroon_down'+str(n))
+        return as_precision(pd.Series(aroon_down, name='aroon_down'+str(n)))
+
+
+# ======================================
+# Streaming evaluation
+
+
+class KSTOscillator(object):
+    """Streaming KST Oscillator (KST) and its signal
+
+    Same values as kst and kst_sig without fillna, updated in O(1) per candle.
+
+    Args:
+        r1, r2, r3, r4(int): rate of change periods.
+        n1, n2, n3, n4(int): smoothing periods.
+        nsig(int): n period to signal.
+    """
+    def __init__(self, r1=10, r2=15, r3=20, r4=30, n1=10, n2=10, n3=10, n4=15, nsig=9):
+        self.rs = (r1, r2, r3, r4)
+        self.rocs = tuple(RollingStats(n) for n in (n1, n2, n3, n4))
+        self.signal = RollingStats(nsig)
+        self.closes = deque(maxlen=max(self.rs) + 1)
+
+    def update(self, close):
+        """Add a candle close.
+
+        Args:
+            close(float): close of the new candle.
+
+        Returns:
+            tuple(float, float): kst and kst signal of the new candle.
+        """
+        self.closes.append(float(close))
+        kst = 0.0
+        for weight, (r, roc) in enumerate(zip(self.rs, self.rocs), 1):
+            if len(self.closes) > r:
+                shifted = self.closes[-1 - r]
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    roc.update((np.float64(close) - shifted) / shifted)
+            else:
+                roc.update(np.nan)
+            kst += weight * roc.mean
+        kst *= 100
+        return kst, self.signal.update(kst).mean
+
+
+class Ichimoku(object):
+    """Streaming Ichimoku Kinko Hyo spans, before the visual shift
+
+    Same values as ichimoku_a and ichimoku_b without fillna, updated with
+    monotonic queues in O(1) amortized per candle.
+
+    Args:
+        n1(int): n1 low period.
+        n2(int): n2 medium period.
+        n3(int): n3 high period.
+    """
+    def __init__(self, n1=9, n2=26, n3=52):
+        self.windows = tuple((RollingStats(n), RollingStats(n)) for n in (n1, n2, n3))
+
+    def update(self, high, low):
+        """Add a candle.
+
+        Args:
+            high(float): high of the new candle.
+            low(float): low of the new candle.
+
+        Returns:
+            tuple(float, float): span A and span B of the new candle.
+        """
+        conv, base, span_b = (0.5 * (h.update(high).max + l.update(low).min) for h, l in self.windows)
+        return 0.5 * (conv + base), span_b
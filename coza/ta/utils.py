@@ -1,21 +1,84 @@
 # -*- coding: utf-8 -*-
+from functools import wraps
+import inspect
 import math
+import numpy as np
 import pandas as pd
 
 
+CANDLE_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+_precision = None
+
+
+def set_precision(dtype=None):
+    """Select the float precision of candles and indicators.
+
+    With 'float32', candle frames are loaded and every coza.ta indicator returns
+    float32 Series, halving their memory. pandas still accumulates rolling and
+    ewm windows in float64 before the result is cast back.
+
+    Tolerance: measured as the largest absolute difference divided by the
+    largest absolute float64 value of the column, float32 features stay within
+    1e-4 of float64 ones. Features built on small differences of prices
+    (volume_adi, volume_cmf, trend_trix, trend_macd_diff) stay within 2e-3. See
+    tests/test_precision.py.
+
+    Args:
+        dtype(str): 'float32', 'float64' or None (keep the data as it is).
+    """
+    global _precision
+    if dtype is not None and np.dtype(dtype).kind != 'f':
+        raise ValueError(f'{dtype} is not a float dtype')
+    _precision = None if dtype is None else np.dtype(dtype)
+
+
+def get_precision():
+    """
+        return: numpy.dtype or None : the precision selected by set_precision
+    """
+    return _precision
+
+
+def as_precision(x, columns=None):
+    """Cast float data to the precision selected by set_precision.
+
+    Args:
+        x(pandas.Series, pandas.DataFrame or numpy.ndarray): data to cast.
+        columns(iterable): for dataframes, the columns to cast. Defaults to every
+            float column.
+
+    Returns:
+        Same type as x. Non float data is returned unchanged.
+    """
+    if _precision is None:
+        return x
+    if isinstance(x, pd.DataFrame):
+        if columns is None:
+            columns = [c for c in x.columns if x[c].dtype.kind == 'f']
+        columns = [c for c in columns if c in x.columns and x[c].dtype.kind in 'fiu' and x[c].dtype != _precision]
+        if columns:
+            x = x.astype({c: _precision for c in columns})
+        return x
+    if x.dtype.kind == 'f' and x.dtype != _precision:
+        return x.astype(_precision)
+    return x
+
+
 def dropna(df):
     """Drop rows with "Nans" values
     """
-    df = df[df < math.exp(709)] # big number
+    big = math.exp(709) if _precision is None else np.finfo(_precision).max # big number
+    df = df[df < big]
     df = df[df != 0.0]
     df = df.dropna()
-    return df
+    return as_precision(df)
 
 
 def ema(series, periods, fillna=True):
     if fillna:
-        return series.ewm(span=periods, min_periods=0).mean()
-    return series.ewm(span=periods, min_periods=periods).mean()
+        return as_precision(series.ewm(span=periods, min_periods=0).mean())
+    return as_precision(series.ewm(span=periods, min_periods=periods).mean())
 
 
 def candle_slicing(df, n, update_number):
@@ -24,8 +87,78 @@ def candle_slicing(df, n, update_number):
             df (pd.DataFrame) : dataframe
             n (int) : timeframe
             update_number (int) : number of update
-        
+
         return: df (pd.DataFrame) : candles which need to update
     """
-    
-    return df.tail(n + update_number - 1)
\ No newline at end of file
+
+    return df.tail(n + update_number - 1)
+
+
+def ewm_warmup(alpha, tol=1e-10):
+    """Number of rows after which the weights of an exponential moving average
+    with smoothing factor `alpha` fall below `tol`.
+    """
+    return int(np.ceil(np.log(tol) / np.log(1.0 - alpha)))
+
+
+def span_warmup(n, tol=1e-10):
+    """ewm_warmup of an exponential moving average with span `n`."""
+    return ewm_warmup(2.0 / (n + 1), tol)
+
+
+def warmup(rule, cumulative=False):
+    """Declare the warm-up of an indicator.
+
+    The warm-up is the number of candles preceding a row that the value of the
+    row depends on, e.g. n - 1 for a rolling mean of n candles. Exponential
+    moving averages are cut where their weights fall below 1e-10. With
+    is_update, the indicator is then evaluated on the last
+    warm-up + update_number candles only, through candle_slicing.
+
+    Args:
+        rule(callable): receives the arguments of the indicator by name and
+            returns the warm-up, e.g. lambda n, **_: n - 1.
+        cumulative(bool): the indicator accumulates from the first candle it
+            is given (negative_volume_index, cumulative_return). Its warm-up
+            is the one of an update carrying the previous value, and it is
+            never sliced.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if cumulative or not (kwargs.get('is_update') and kwargs.get('update_number')):
+                return func(*args, **kwargs)
+
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            n = rule(**bound.arguments) + 1
+            for name, value in bound.arguments.items():
+                if isinstance(value, pd.Series):
+                    bound.arguments[name] = candle_slicing(value, n, bound.arguments['update_number'])
+            return func(*bound.args, **bound.kwargs)
+
+        wrapper.warmup = rule
+        wrapper.cumulative = cumulative
+        return wrapper
+    return decorator
+
+
+def get_warmup(function, **params):
+    """Warm-up declared by an indicator.
+
+    Args:
+        function(callable): indicator of coza.ta.
+        params: parameters of the indicator, defaults for the others.
+
+    Returns:
+        int: number of candles preceding a row that the row depends on, None
+            if the indicator declares no warm-up.
+    """
+    rule = getattr(function, 'warmup', None)
+    if rule is None:
+        return None
+    bound = inspect.signature(function).bind_partial(**params)
+    bound.apply_defaults()
+    return rule(**bound.arguments)
@@ -9,9 +9,32 @@
 
 import numpy as np
 
+from . import cache
+from .rolling import RollingStats, fingerprint, rolling_stats, shared
 from .utils import *
 
 
+def _bollinger(close, n, ndev):
+    mavg, mstd = rolling_stats(close, n, 'mean', 'std')
+    return mavg, mavg + ndev*mstd, mavg - ndev*mstd
+
+
+def _keltner(high, low, close, n):
+    def compute():
+        central = ((high + low + close) / 3.0).rolling(n).mean()
+        hband = (((4*high) - (2*low) + close) / 3.0).rolling(n).mean()
+        lband = (((-2*high) + (4*low) + close) / 3.0).rolling(n).mean()
+        return central, hband, lband
+    return shared(('keltner', fingerprint(high), fingerprint(low), fingerprint(close), n), compute,
+                  (high, low, close))
+
+
+def _flag(condition, index):
+    return pd.Series(np.where(condition, 1.0, 0.0), index=index)
+
+
+@cache.cached
+@warmup(lambda n, **_: 1 + ewm_warmup(1.0 / n))
 def average_true_range(high, low, close, n=14, fillna=True, is_update=False, update_number=None):
     """Average True Range (ATR)
 
@@ -45,11 +68,13 @@ def average_true_range(high, low, close, n=14, fillna=True, is_update=False, upd
         atr = atr.replace([np.inf, -np.inf], np.nan).fillna(0)
 
     if is_update:
-        return pd.Series(atr, name='atr').tail(update_number)
+        return as_precision(pd.Series(atr, name='atr').tail(update_number))
     else:
-        return pd.Series(atr, name='atr')
+        return as_precision(pd.Series(atr, name='atr'))
 
 
+@cache.cached
+@warmup(lambda n, **_: n - 1)
 def bollinger_mavg(close, n=20, fillna=True, is_update=False, update_number=None):
     """Bollinger Bands (BB)
 
@@ -64,16 +89,18 @@ def bollinger_mavg(close, n=20, fillna=True, is_update=False, update_number=None
     Returns:
         pandas.Series: New feature generated.
     """
-    mavg = close.rolling(n).mean()
+    mavg = _bollinger(close, n, 0)[0].copy()
     if fillna:
         mavg = mavg.replace([np.inf, -np.inf], np.nan).fillna(method='backfill')
     
     if is_update:
-        return pd.Series(mavg, name='mavg').tail(update_number)
+        return as_precision(pd.Series(mavg, name='mavg').tail(update_number))
     else:
-        return pd.Series(mavg, name='mavg')
+        return as_precision(pd.Series(mavg, name='mavg'))
 
 
+@cache.cached
+@warmup(lambda n, **_: n - 1)
 def bollinger_hband(close, n=20, ndev=2, fillna=True, is_update=False, update_number=None):
     """Bollinger Bands (BB)
 
@@ -90,18 +117,18 @@ def bollinger_hband(close, n=20, ndev=2, fillna=True, is_update=False, update_nu
     Returns:
         pandas.Series: New feature generated.
     """
-    mavg = close.rolling(n).mean()
-    mstd = close.rolling(n).std()
-    hband = mavg + ndev*mstd
+    hband = _bollinger(close, n, ndev)[1]
     if fillna:
         hband = hband.replace([np.inf, -np.inf], np.nan).fillna(method='backfill')
         
     if is_update:
-        return pd.Series(hband, name='hband').tail(update_number)
+        return as_precision(pd.Series(hband, name='hband').tail(update_number))
     else:
-        return pd.Series(hband, name='hband')
+        return as_precision(pd.Series(hband, name='hband'))
 
 
+@cache.cached
+@warmup(lambda n, **_: n - 1)
 def bollinger_lband(close, n=20, ndev=2, fillna=True, is_update=False, update_number=None):
     """Bollinger Bands (BB)
 
@@ -118,18 +145,18 @@ def bollinger_lband(close, n=20, ndev=2, fillna=True, is_update=False, update_nu
     Returns:
         pandas.Series: New feature generated.
     """
-    mavg = close.rolling(n).mean()
-    mstd = close.rolling(n).std()
-    lband = mavg - ndev*mstd
+    lband = _bollinger(close, n, ndev)[2]
     if fillna:
         lband = lband.replace([np.inf, -np.inf], np.nan).fillna(method='backfill')
     
     if is_update:
-        return pd.Series(lband, name='lband').tail(update_number)
+        return as_precision(pd.Series(lband, name='lband').tail(update_number))
     else:
-        return pd.Series(lband, name='lband')
+        return as_precision(pd.Series(lband, name='lband'))
 
 
+@cache.cached
+@warmup(lambda n, **_: n - 1)
 def bollinger_hband_indicator(close, n=20, ndev=2, fillna=True, is_update=False, update_number=None):
     """Bollinger High Band Indicator
 
@@ -145,22 +172,18 @@ def bollinger_hband_indicator(close, n=20, ndev=2, fillna=True, is_update=False,
     Returns:
         pandas.Series: New feature generated.
     """
-    df = pd.DataFrame([close]).transpose()
-    mavg = close.rolling(n).mean()
-    mstd = close.rolling(n).std()
-    hband = mavg + ndev*mstd
-    df['hband'] = 0.0
-    df.loc[close > hband, 'hband'] = 1.0
-    hband = df['hband']
+    hband = _flag(close > _bollinger(close, n, ndev)[1], close.index)
     if fillna:
         hband = hband.replace([np.inf, -np.inf], np.nan).fillna(0)
         
     if is_update:
-        return pd.Series(hband, name='bbihband').tail(update_number)
+        return as_precision(pd.Series(hband, name='bbihband').tail(update_number))
     else:
-        return pd.Series(hband, name='bbihband')
+        return as_precision(pd.Series(hband, name='bbihband'))
 
 
+@cache.cached
+@warmup(lambda n, **_: n - 1)
 def bollinger_lband_indicator(close, n=20, ndev=2, fillna=True, is_update=False, update_number=None):
     """Bollinger Low Band Indicator
 
@@ -176,22 +199,18 @@ def bollinger_lband_indicator(close, n=20, ndev=2, fillna=True, is_update=False,
     Returns:
         pandas.Series: New feature generated.
     """
-    df = pd.DataFrame([close]).transpose()
-    mavg = close.rolling(n).mean()
-    mstd = close.rolling(n).std()
-    lband = mavg - ndev*mstd
-    df['lband'] = 0.0
-    df.loc[close < lband, 'lband'] = 1.0
-    lband = df['lband']
+    lband = _flag(close < _bollinger(close, n, ndev)[2], close.index)
     if fillna:
         lband = lband.replace([np.inf, -np.inf], np.nan).fillna(0)
     
     if is_update:
-        return pd.Series(lband, name='bbilband').tail(update_number)
+        return as_precision(pd.Series(lband, name='bbilband').tail(update_number))
     else:
-        return pd.Series(lband, name='bbilband')
+        return as_precision(pd.Series(lband, name='bbilband'))
 
 
+@cache.cached
+@warmup(lambda n, **_: n - 1)
 def keltner_channel_central(high, low, close, n=10, fillna=True, is_update=False, update_number=None):
     """Keltner channel (KC)
 
@@ -208,17 +227,18 @@ def keltner_channel_central(high, low, close, n=10, fillna=True, is_update=False
     Returns:
         pandas.Series: New feature generated.
     """
-    tp = (high + low + close) / 3.0
-    tp = tp.rolling(n).mean()
+    tp = _keltner(high, low, close, n)[0].copy()
     if fillna:
         tp = tp.replace([np.inf, -np.inf], np.nan).fillna(method='backfill')
         
     if is_update:
-        return pd.Series(tp, name='kc_central').tail(update_number)
+        return as_precision(pd.Series(tp, name='kc_central').tail(update_number))
     else:
-        return pd.Series(tp, name='kc_central')
+        return as_precision(pd.Series(tp, name='kc_central'))
 
 
+@cache.cached
+@warmup(lambda n, **_: n - 1)
 def keltner_channel_hband(high, low, close, n=10, fillna=True, is_update=False, update_number=None):
     """Keltner channel (KC)
 
@@ -235,17 +255,18 @@ def keltner_channel_hband(high, low, close, n=10, fillna=True, is_update=False,
     Returns:
         pandas.Series: New feature generated.
     """
-    tp = ((4*high) - (2*low) + close) / 3.0
-    tp = tp.rolling(n).mean()
+    tp = _keltner(high, low, close, n)[1].copy()
     if fillna:
         tp = tp.replace([np.inf, -np.inf], np.nan).fillna(method='backfill')
     
     if is_update:
-        return pd.Series(tp, name='kc_hband').tail(update_number)
+        return as_precision(pd.Series(tp, name='kc_hband').tail(update_number))
     else:
-        return pd.Series(tp, name='kc_hband')
+        return as_precision(pd.Series(tp, name='kc_hband'))
 
 
+@cache.cached
+@warmup(lambda n, **_: n - 1)
 def keltner_channel_lband(high, low, close, n=10, fillna=True, is_update=False, update_number=None):
     """Keltner channel (KC)
 
@@ -262,17 +283,18 @@ def keltner_channel_lband(high, low, close, n=10, fillna=True, is_update=False,
     Returns:
         pandas.Series: New feature generated.
     """
-    tp = ((-2*high) + (4*low) + close) / 3.0
-    tp = tp.rolling(n).mean()
+    tp = _keltner(high, low, close, n)[2].copy()
     if fillna:
         tp = tp.replace([np.inf, -np.inf], np.nan).fillna(method='backfill')
     
     if is_update:
-        return pd.Series(tp, name='kc_lband').tail(update_number)
+        return as_precision(pd.Series(tp, name='kc_lband').tail(update_number))
     else:
-        return pd.Series(tp, name='kc_lband')
+        return as_precision(pd.Series(tp, name='kc_lband'))
 
 
+@cache.cached
+@warmup(lambda **_: 0)
 def keltner_channel_hband_indicator(high, low, close, n=10, fillna=True, is_update=False, update_number=None):
     """Keltner Channel High Band Indicator (KC)
 
@@ -290,20 +312,18 @@ def keltner_channel_hband_indicator(high, low, close, n=10, fillna=True, is_upda
     Returns:
         pandas.Series: New feature generated.
     """
-    df = pd.DataFrame([close]).transpose()
-    df['hband'] = 0.0
-    hband = ((4*high) - (2*low) + close) / 3.0
-    df.loc[close > hband, 'hband'] = 1.0
-    hband = df['hband']
+    hband = _flag(close > ((4*high) - (2*low) + close) / 3.0, close.index)
     if fillna:
         hband = hband.replace([np.inf, -np.inf], np.nan).fillna(0)
     
     if is_update:
-        return pd.Series(hband, name='kci_hband').tail(update_number)
+        return as_precision(pd.Series(hband, name='kci_hband').tail(update_number))
     else:
-        return pd.Series(hband, name='kci_hband')
+        return as_precision(pd.Series(hband, name='kci_hband'))
 
 
+@cache.cached
+@warmup(lambda **_: 0)
 def keltner_channel_lband_indicator(high, low, close, n=10, fillna=True, is_update=False, update_number=None):
     """Keltner Channel Low Band Indicator (KC)
 
@@ -320,20 +340,18 @@ def keltner_channel_lband_indicator(high, low, close, n=10, fillna=True, is_upda
     Returns:
         pandas.Series: New feature generated.
     """
-    df = pd.DataFrame([close]).transpose()
-    df['lband'] = 0.0
-    lband = ((-2*high) + (4*low) + close) / 3.0
-    df.loc[close < lband, 'lband'] = 1.0
-    lband = df['lband']
+    lband = _flag(close < ((-2*high) + (4*low) + close) / 3.0, close.index)
     if fillna:
         lband = lband.replace([np.inf, -np.inf], np.nan).fillna(0)
     
     if is_update:
-        return pd.Series(lband, name='kci_lband').tail(update_number)
+        return as_precision(pd.Series(lband, name='kci_lband').tail(update_number))
     else:
-        return pd.Series(lband, name='kci_lband')
+        return as_precision(pd.Series(lband, name='kci_lband'))
 
 
+@cache.cached
+@warmup(lambda n, **_: n - 1)
 def donchian_channel_hband(close, n=20, fillna=True, is_update=False, update_number=None):
     """Donchian channel (DC)
 
@@ -348,16 +366,18 @@ def donchian_channel_hband(close, n=20, fillna=True, is_update=False, update_num
     Returns:
         pandas.Series: New feature generated.
     """
-    hband = close.rolling(n).max()
+    hband = rolling_stats(close, n, 'max')[0].copy()
     if fillna:
         hband = hband.replace([np.inf, -np.inf], np.nan).fillna(method='backfill')
     
     if is_update:
-        return pd.Series(hband, name='dchband').tail(update_number)
+        return as_precision(pd.Series(hband, name='dchband').tail(update_number))
     else:
-        return pd.Series(hband, name='dchband')
+        return as_precision(pd.Series(hband, name='dchband'))
 
 
+@cache.cached
+@warmup(lambda n, **_: n - 1)
 def donchian_channel_lband(close, n=20, fillna=True, is_update=False, update_number=None):
     """Donchian channel (DC)
 
@@ -372,16 +392,18 @@ def donchian_channel_lband(close, n=20, fillna=True, is_update=False, update_num
     Returns:
         pandas.Series: New feature generated.
     """
-    lband = close.rolling(n).min()
+    lband = rolling_stats(close, n, 'min')[0].copy()
     if fillna:
         lband = lband.replace([np.inf, -np.inf], np.nan).fillna(method='backfill')
     
     if is_update:
-        return pd.Series(lband, name='dclband').tail(update_number)
+        return as_precision(pd.Series(lband, name='dclband').tail(update_number))
     else:
-        return pd.Series(lband, name='dclband')
+        return as_precision(pd.Series(lband, name='dclband'))
 
 
+@cache.cached
+@warmup(lambda n, **_: n - 1)
 def donchian_channel_hband_indicator(close, n=20, fillna=True, is_update=False, update_number=None):
     """Donchian High Band Indicator
 
@@ -397,20 +419,18 @@ def donchian_channel_hband_indicator(close, n=20, fillna=True, is_update=False,
     Returns:
         pandas.Series: New feature generated.
     """
-    df = pd.DataFrame([close]).transpose()
-    df['hband'] = 0.0
-    hband = close.rolling(n).max()
-    df.loc[close >= hband, 'hband'] = 1.0
-    hband = df['hband']
+    hband = _flag(close >= rolling_stats(close, n, 'max')[0], close.index)
     if fillna:
         hband = hband.replace([np.inf, -np.inf], np.nan).fillna(0)
     
     if is_update:
-        return pd.Series(hband, name='dcihband').tail(update_number)
+        return as_precision(pd.Series(hband, name='dcihband').tail(update_number))
     else:
-        return pd.Series(hband, name='dcihband')
+        return as_precision(pd.Series(hband, name='dcihband'))
 
 
+@cache.cached
+@warmup(lambda n, **_: n - 1)
 def donchian_channel_lband_indicator(close, n=20, fillna=True, is_update=False, update_number=None):
     """Donchian Low Band Indicator
 
@@ -425,15 +445,103 @@ def donchian_channel_lband_indicator(close, n=20, fillna=True, is_update=False,
     Returns:
         pandas.Series: New feature generated.
     """
-    df = pd.DataFrame([close]).transpose()
-    df['lband'] = 0.0
-    lband = close.rolling(n).min()
-    df.loc[close <= lband, 'lband'] = 1.0
-    lband = df['lband']
+    lband = _flag(close <= rolling_stats(close, n, 'min')[0], close.index)
     if fillna:
         lband = lband.replace([np.inf, -np.inf], np.nan).fillna(0)
     
     if is_update:
-        return pd.Series(lband, name='dcilband').tail(update_number)
+        return as_precision(pd.Series(lband, name='dcilband').tail(update_number))
     else:
-        return pd.Series(lband, name='dcilband')
+        return as_precision(pd.Series(lband, name='dcilband'))
+
+
+# ======================================
+# Streaming evaluation
+
+
+class BollingerBands(object):
+    """Streaming Bollinger Bands
+
+    Same values as the batch functions without fillna, one candle at a time and
+    in O(1) per candle. Bands are nan until n closes were seen.
+
+    Args:
+        n(int): n period.
+        ndev(int): n factor standard deviation
+    """
+    def __init__(self, n=20, ndev=2):
+        self.ndev = ndev
+        self.stats = RollingStats(n)
+
+    def update(self, close):
+        """Add a candle close.
+
+        Args:
+            close(float): close of the new candle.
+
+        Returns:
+            dict: mavg, hband, lband, hband_indicator and lband_indicator.
+        """
+        stats = self.stats.update(close)
+        mavg, mstd = stats.mean, stats.std
+        hband, lband = mavg + self.ndev*mstd, mavg - self.ndev*mstd
+        return dict(mavg=mavg, hband=hband, lband=lband,
+                    hband_indicator=float(close > hband), lband_indicator=float(close < lband))
+
+
+class KeltnerChannel(object):
+    """Streaming Keltner Channel
+
+    Same values as the batch functions without fillna. Like the batch indicators,
+    the indicators compare close with the unsmoothed bands of the candle.
+
+    Args:
+        n(int): n period.
+    """
+    def __init__(self, n=10):
+        self.central = RollingStats(n)
+        self.high = RollingStats(n)
+        self.low = RollingStats(n)
+
+    def update(self, high, low, close):
+        """Add a candle.
+
+        Args:
+            high(float): high of the new candle.
+            low(float): low of the new candle.
+            close(float): close of the new candle.
+
+        Returns:
+            dict: central, hband, lband, hband_indicator and lband_indicator.
+        """
+        hband = ((4*high) - (2*low) + close) / 3.0
+        lband = ((-2*high) + (4*low) + close) / 3.0
+        return dict(central=self.central.update((high + low + close) / 3.0).mean,
+                    hband=self.high.update(hband).mean, lband=self.low.update(lband).mean,
+                    hband_indicator=float(close > hband), lband_indicator=float(close < lband))
+
+
+class DonchianChannel(object):
+    """Streaming Donchian Channel
+
+    Same values as the batch functions without fillna.
+
+    Args:
+        n(int): n period.
+    """
+    def __init__(self, n=20):
+        self.stats = RollingStats(n)
+
+    def update(self, close):
+        """Add a candle close.
+
+        Args:
+            close(float): close of the new candle.
+
+        Returns:
+            dict: hband, lband, hband_indicator and lband_indicator.
+        """
+        stats = self.stats.update(close)
+        hband, lband = stats.max, stats.min
+        return dict(hband=hband, lband=lband,
+                    hband_indicator=float(close >= hband), lband_indicator=float(close <= lband))
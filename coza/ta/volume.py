@@ -10,7 +10,12 @@
 import pandas as pd
 import numpy as np
 
+from . import cache, kernels
+from .utils import as_precision, warmup
 
+
+@cache.cached
+@warmup(lambda **_: 1)
 def acc_dist_index(high, low, close, volume, fillna=True, is_update=False, update_number=None):
     """Accumulation/Distribution Index (ADI)
 
@@ -36,11 +41,13 @@ def acc_dist_index(high, low, close, volume, fillna=True, is_update=False, updat
         ad = ad.replace([np.inf, -np.inf], np.nan).fillna(0)
     
     if is_update:
-        return pd.Series(ad, name='adi').tail(update_number)
+        return as_precision(pd.Series(ad, name='adi').tail(update_number))
     else:
-        return pd.Series(ad, name='adi')
+        return as_precision(pd.Series(ad, name='adi'))
 
 
+@cache.cached
+@warmup(lambda **_: 1)
 def on_balance_volume(close, volume, fillna=True, is_update=False, update_number=None):
     """On-balance volume (OBV)
 
@@ -57,24 +64,29 @@ def on_balance_volume(close, volume, fillna=True, is_update=False, update_number
     Returns:
         pandas.Series: New feature generated.
     """
-    df = pd.DataFrame([close, volume]).transpose()
-    df['OBV'] = 0
-    c1 = close < close.shift(1)
-    c2 = close > close.shift(1)
-    if c1.any():
-        df.loc[c1, 'OBV'] = - volume
-    if c2.any():
-        df.loc[c2, 'OBV'] = volume
-    obv = df['OBV']
+    if kernels.enabled():
+        obv = pd.Series(kernels.on_balance_volume(close, volume), index=close.index)
+    else:
+        df = pd.DataFrame([close, volume]).transpose()
+        df['OBV'] = 0
+        c1 = close < close.shift(1)
+        c2 = close > close.shift(1)
+        if c1.any():
+            df.loc[c1, 'OBV'] = - volume
+        if c2.any():
+            df.loc[c2, 'OBV'] = volume
+        obv = df['OBV']
     if fillna:
         obv = obv.replace([np.inf, -np.inf], np.nan).fillna(0)
     
     if is_update:
-        return pd.Series(obv, name='obv').tail(update_number)
+        return as_precision(pd.Series(obv, name='obv').tail(update_number))
     else:
-        return pd.Series(obv, name='obv')
+        return as_precision(pd.Series(obv, name='obv'))
 
 
+@cache.cached
+@warmup(lambda n, **_: n)
 def on_balance_volume_mean(close, volume, n=10, fillna=True, is_update=False, update_number=None):
     """On-balance volume mean (OBV mean)
 
@@ -104,11 +116,13 @@ def on_balance_volume_mean(close, volume, n=10, fillna=True, is_update=False, up
         obv = obv.replace([np.inf, -np.inf], np.nan).fillna(0)
     
     if is_update:
-        return pd.Series(obv, name='obv').tail(update_number)
+        return as_precision(pd.Series(obv, name='obv').tail(update_number))
     else:
-        return pd.Series(obv, name='obv')
+        return as_precision(pd.Series(obv, name='obv'))
 
 
+@cache.cached
+@warmup(lambda n, **_: n - 1)
 def chaikin_money_flow(high, low, close, volume, n=20, fillna=True, is_update=False, update_number=None):
     """Chaikin Money Flow (CMF)
 
@@ -135,11 +149,13 @@ def chaikin_money_flow(high, low, close, volume, n=20, fillna=True, is_update=Fa
         cmf = cmf.replace([np.inf, -np.inf], np.nan).fillna(0)
     
     if is_update:
-        return pd.Series(cmf, name='cmf').tail(update_number)
+        return as_precision(pd.Series(cmf, name='cmf').tail(update_number))
     else:
-        return pd.Series(cmf, name='cmf')
+        return as_precision(pd.Series(cmf, name='cmf'))
 
 
+@cache.cached
+@warmup(lambda n, **_: n)
 def force_index(close, volume, n=2, fillna=True, is_update=False, update_number=None):
     """Force Index (FI)
 
@@ -163,11 +179,13 @@ def force_index(close, volume, n=2, fillna=True, is_update=False, update_number=
         fi = fi.replace([np.inf, -np.inf], np.nan).fillna(0)
     
     if is_update:
-        return pd.Series(fi, name='fi_'+str(n)).tail(update_number)
+        return as_precision(pd.Series(fi, name='fi_'+str(n)).tail(update_number))
     else:
-        return pd.Series(fi, name='fi_'+str(n))
+        return as_precision(pd.Series(fi, name='fi_'+str(n)))
 
 
+@cache.cached
+@warmup(lambda n, **_: n)
 def ease_of_movement(high, low, close, volume, n=20, fillna=True, is_update=False, update_number=None):
     """Ease of movement (EoM, EMV)
 
@@ -193,11 +211,13 @@ def ease_of_movement(high, low, close, volume, n=20, fillna=True, is_update=Fals
         emv = emv.replace([np.inf, -np.inf], np.nan).fillna(0)
     
     if is_update:
-        return pd.Series(emv, name='eom_' + str(n)).tail(update_number)
+        return as_precision(pd.Series(emv, name='eom_' + str(n)).tail(update_number))
     else:
-        return pd.Series(emv, name='eom_' + str(n))
+        return as_precision(pd.Series(emv, name='eom_' + str(n)))
 
 
+@cache.cached
+@warmup(lambda **_: 2)
 def volume_price_trend(close, volume, fillna=True, is_update=False, update_number=None):
     """Volume-price trend (VPT)
 
@@ -222,11 +242,13 @@ def volume_price_trend(close, volume, fillna=True, is_update=False, update_numbe
         vpt = vpt.replace([np.inf, -np.inf], np.nan).fillna(0)
     
     if is_update:
-        return pd.Series(vpt, name='vpt').tail(update_number)
+        return as_precision(pd.Series(vpt, name='vpt').tail(update_number))
     else:
-        return pd.Series(vpt, name='vpt')
+        return as_precision(pd.Series(vpt, name='vpt'))
 
 
+@cache.cached
+@warmup(lambda **_: 1, cumulative=True)
 def negative_volume_index(close, volume, fillna=True, is_update=False, update_number=None):
     """Negative Volume Index (NVI)
     From: http://stockcharts.com/school/doku.php?id=chart_school:technical_indicators:negative_volume_inde
@@ -254,25 +276,28 @@ def negative_volume_index(close, volume, fillna=True, is_update=False, update_nu
     See also:
     https://en.wikipedia.org/wiki/Negative_volume_index
     """
-    price_change = close.pct_change()
-    vol_decrease = (volume.shift(1) > volume)
+    if kernels.enabled():
+        nvi = pd.Series(kernels.negative_volume_index(close, volume), index=close.index, name='nvi')
+    else:
+        price_change = close.pct_change()
+        vol_decrease = (volume.shift(1) > volume)
 
-    nvi = pd.Series(data=np.nan, index=close.index, dtype='float64', name='nvi')
+        nvi = pd.Series(data=np.nan, index=close.index, dtype='float64', name='nvi')
 
-    nvi.iloc[0] = 1000
-    for i in range(1,len(nvi)):
-        if vol_decrease.iloc[i]:
-            nvi.iloc[i] = nvi.iloc[i-1] * ( 1.0 + price_change.iloc[i] )
-        else:
-            nvi.iloc[i] = nvi.iloc[i-1]
+        nvi.iloc[0] = 1000
+        for i in range(1,len(nvi)):
+            if vol_decrease.iloc[i]:
+                nvi.iloc[i] = nvi.iloc[i-1] * ( 1.0 + price_change.iloc[i] )
+            else:
+                nvi.iloc[i] = nvi.iloc[i-1]
 
     if fillna:
         nvi = nvi.replace([np.inf, -np.inf], np.nan).fillna(1000) # IDEA: There shouldn't be any na; might be better to throw exception
 
     if is_update:
-        return pd.Series(nvi, name='nvi').tail(update_number)
+        return as_precision(pd.Series(nvi, name='nvi').tail(update_number))
     else:
-        return pd.Series(nvi, name='nvi')
+        return as_precision(pd.Series(nvi, name='nvi'))
 
 
 # TODO
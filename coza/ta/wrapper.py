@@ -1,186 +1,351 @@
 # -*- coding: utf-8 -*-
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
 import pandas as pd
 
+from .buffer import FeatureBuffer
 from .volume import *
 from .volatility import *
 from .trend import *
 from .momentum import *
 from .others import *
+from .utils import get_warmup, warmup
+
+
+@warmup(lambda **_: 0)
+def _abs_diff(a, b, fillna=True):
+    return abs(a - b)
+
+
+@warmup(lambda **_: 0)
+def _diff(a, b, fillna=True):
+    return a - b
+
+
+def _lookbacks(*features):
+    return tuple(row + (get_warmup(row[1], **row[3]),) for row in features)
+
+
+def _carry_nvi(value, prev):
+    # the window restarts the index at 1000 on its first row
+    return value * (prev / 1000.0)
+
+
+def _carry_cr(value, prev):
+    # the window restarts the return at 0 on its first row
+    return ((1 + value / 100.0) * (1 + prev / 100.0) - 1) * 100
+
+
+# Feature tables used by the add_*_ta wrappers.
+#
+# Each row is (column, function, inputs, params, lookback). `inputs` are either the
+# roles 'open', 'high', 'low', 'close', 'volume' or names of columns added before.
+# `lookback` is the number of rows preceding the new ones an update needs to
+# reproduce the full computation, the warm-up declared by the function.
+VOLUME_FEATURES = _lookbacks(
+    ('volume_adi', acc_dist_index, ('high', 'low', 'close', 'volume'), {}),
+    ('volume_obv', on_balance_volume, ('close', 'volume'), {}),
+    ('volume_obvm', on_balance_volume_mean, ('close', 'volume'), {'n': 10}),
+    ('volume_cmf', chaikin_money_flow, ('high', 'low', 'close', 'volume'), {'n': 20}),
+    ('volume_fi', force_index, ('close', 'volume'), {'n': 2}),
+    ('volume_em', ease_of_movement, ('high', 'low', 'close', 'volume'), {'n': 14}),
+    ('volume_vpt', volume_price_trend, ('close', 'volume'), {}),
+    ('volume_nvi', negative_volume_index, ('close', 'volume'), {}),
+)
+
+VOLATILITY_FEATURES = _lookbacks(
+    ('volatility_atr', average_true_range, ('high', 'low', 'close'), {'n': 14}),
+    ('volatility_bbh', bollinger_hband, ('close',), {'n': 20, 'ndev': 2}),
+    ('volatility_bbl', bollinger_lband, ('close',), {'n': 20, 'ndev': 2}),
+    ('volatility_bbm', bollinger_mavg, ('close',), {'n': 20}),
+    ('volatility_bbhi', bollinger_hband_indicator, ('close',), {'n': 20, 'ndev': 2}),
+    ('volatility_bbli', bollinger_lband_indicator, ('close',), {'n': 20, 'ndev': 2}),
+    ('volatility_kcc', keltner_channel_central, ('high', 'low', 'close'), {'n': 10}),
+    ('volatility_kch', keltner_channel_hband, ('high', 'low', 'close'), {'n': 10}),
+    ('volatility_kcl', keltner_channel_lband, ('high', 'low', 'close'), {'n': 10}),
+    ('volatility_kchi', keltner_channel_hband_indicator, ('high', 'low', 'close'), {'n': 10}),
+    ('volatility_kcli', keltner_channel_lband_indicator, ('high', 'low', 'close'), {'n': 10}),
+    ('volatility_dch', donchian_channel_hband, ('close',), {'n': 20}),
+    ('volatility_dcl', donchian_channel_lband, ('close',), {'n': 20}),
+    ('volatility_dchi', donchian_channel_hband_indicator, ('close',), {'n': 20}),
+    ('volatility_dcli', donchian_channel_lband_indicator, ('close',), {'n': 20}),
+)
+
+TREND_FEATURES = _lookbacks(
+    ('trend_macd', macd, ('close',), {'n_fast': 12, 'n_slow': 26}),
+    ('trend_macd_signal', macd_signal, ('close',), {'n_fast': 12, 'n_slow': 26, 'n_sign': 9}),
+    ('trend_macd_diff', macd_diff, ('close',), {'n_fast': 12, 'n_slow': 26, 'n_sign': 9}),
+    ('trend_ema_indicator', ema_indicator, ('close',), {'n': 12}),
+    ('trend_adx', adx, ('high', 'low', 'close'), {'n': 14}),
+    ('trend_adx_pos', adx_pos, ('high', 'low', 'close'), {'n': 14}),
+    ('trend_adx_neg', adx_neg, ('high', 'low', 'close'), {'n': 14}),
+    ('trend_adx_ind', adx_indicator, ('high', 'low', 'close'), {'n': 14}),
+    ('trend_vortex_ind_pos', vortex_indicator_pos, ('high', 'low', 'close'), {'n': 14}),
+    ('trend_vortex_ind_neg', vortex_indicator_neg, ('high', 'low', 'close'), {'n': 14}),
+    ('trend_vortex_diff', _abs_diff, ('trend_vortex_ind_pos', 'trend_vortex_ind_neg'), {}),
+    ('trend_trix', trix, ('close',), {'n': 15}),
+    ('trend_mass_index', mass_index, ('high', 'low'), {'n': 9, 'n2': 25}),
+    ('trend_cci', cci, ('high', 'low', 'close'), {'n': 20, 'c': 0.015}),
+    ('trend_dpo', dpo, ('close',), {'n': 20}),
+    ('trend_kst', kst, ('close',),
+        {'r1': 10, 'r2': 15, 'r3': 20, 'r4': 30, 'n1': 10, 'n2': 10, 'n3': 10, 'n4': 15}),
+    ('trend_kst_sig', kst_sig, ('close',),
+        {'r1': 10, 'r2': 15, 'r3': 20, 'r4': 30, 'n1': 10, 'n2': 10, 'n3': 10, 'n4': 15, 'nsig': 9}),
+    ('trend_kst_diff', _diff, ('trend_kst', 'trend_kst_sig'), {}),
+    ('trend_ichimoku_a', ichimoku_a, ('high', 'low'), {'n1': 9, 'n2': 26}),
+    ('trend_ichimoku_b', ichimoku_b, ('high', 'low'), {'n2': 26, 'n3': 52}),
+    ('trend_aroon_up', aroon_up, ('close',), {'n': 25}),
+    ('trend_aroon_down', aroon_down, ('close',), {'n': 25}),
+)
+
+MOMENTUM_FEATURES = _lookbacks(
+    ('momentum_rsi', rsi, ('close',), {'n': 14}),
+    ('momentum_mfi', money_flow_index, ('high', 'low', 'close', 'volume'), {'n': 14}),
+    ('momentum_tsi', tsi, ('close',), {'r': 25, 's': 13}),
+    ('momentum_uo', uo, ('high', 'low', 'close'), {}),
+    ('momentum_stoch', stoch_k, ('high', 'low', 'close'), {}),
+    ('momentum_stoch_signal', stoch_k_d, ('high', 'low', 'close'), {}),
+    ('momentum_wr', wr, ('high', 'low', 'close'), {}),
+    ('momentum_ao', ao, ('high', 'low'), {}),
+    # TODO: momentum.py의 stochastic_rsi와 stochastic_rsi_k_d NaN 값으로 반환되는 문제 해결하기
+)
+
+OTHERS_FEATURES = _lookbacks(
+    ('others_dr', daily_return, ('close',), {}),
+    ('others_cr', cumulative_return, ('close',), {}),
+)
+
+_CARRY = {
+    'volume_nvi': _carry_nvi,
+    'others_cr': _carry_cr,
+}
+
+# Indicator families of add_all_ta_features, in the order their columns are added.
+FAMILIES = (
+    ('volume', VOLUME_FEATURES),
+    ('volatility', VOLATILITY_FEATURES),
+    ('trend', TREND_FEATURES),
+    ('momentum', MOMENTUM_FEATURES),
+    ('others', OTHERS_FEATURES),
+)
+
+
+def _add_features(df, features, columns, fillna=True, is_update=False, update_number=1):
+    """Compute `features` into `df`.
+
+    With `is_update`, the frame keeps the values it already holds and only its
+    last `update_number` rows are filled in place. A FeatureBuffer knows which
+    rows each feature is missing and `update_number` is not needed. Each feature
+    is evaluated on the shortest tail that reproduces those rows, so the cost
+    depends on the number of new candles, not on the length of the frame.
+    """
+    buffered = isinstance(df, FeatureBuffer)
+
+    for name, function, inputs, params, lookback in features:
+        args = [df[columns.get(i, i)] for i in inputs]
+
+        if not is_update or name not in df:
+            df[name] = function(*args, fillna=fillna, **params)
+            continue
+
+        k = df.missing(name) if buffered else min(update_number or 0, len(df))
+
+        if k < 1:
+            continue
+
+        start = max(len(df) - k - lookback, 0)
+        value = function(*[arg.iloc[start:] for arg in args], fillna=fillna, **params)
+        value = np.asarray(value)[-k:]
+
+        if name in _CARRY and start < len(df) - k:
+            prev = df[name].iloc[start]
+            if not pd.isnull(prev):
+                value = _CARRY[name](value, prev)
+
+        if buffered:
+            df.fill(name, value)
+        else:
+            df.iloc[len(df) - k:, df.columns.get_loc(name)] = value
+
+    return df
 
 
 def add_volume_ta(df, high, low, close, volume, fillna=True, is_update=False, update_number=1):
     """Add volume technical analysis features to dataframe.
     Args:
-        df (pandas.core.frame.DataFrame): Dataframe base.
+        df (pandas.core.frame.DataFrame or FeatureBuffer): Dataframe base.
         high (str): Name of 'high' column.
         low (str): Name of 'low' column.
         close (str): Name of 'close' column.
         volume (str): Name of 'volume' column.
         fillna(bool): if True, fill nan values.
+        is_update(bool): if True, keep the features already in `df` and only fill its
+            last `update_number` rows in place.
+        update_number(int): number of newly appended rows, unused with a FeatureBuffer.
     Returns:
         pandas.core.frame.DataFrame: Dataframe with new features.
     """
-    df['volume_adi'] = acc_dist_index(df[high], df[low], df[close],
-                                    df[volume], fillna=fillna, is_update=is_update, update_number=update_number)
-    df['volume_obv'] = on_balance_volume(df[close], df[volume], fillna=fillna, is_update=is_update, update_number=update_number)
-    df['volume_obvm'] = on_balance_volume_mean(df[close], df[volume], 10,
-                                    fillna=fillna, is_update=is_update, update_number=update_number)
-    df['volume_cmf'] = chaikin_money_flow(df[high], df[low], df[close],
-                                        df[volume], fillna=fillna, is_update=is_update, update_number=update_number)
-    df['volume_fi'] = force_index(df[close], df[volume], fillna=fillna, is_update=is_update, update_number=update_number)
-    df['volume_em'] = ease_of_movement(df[high], df[low], df[close],
-                                        df[volume], 14, fillna=fillna, is_update=is_update, update_number=update_number)
-    df['volume_vpt'] = volume_price_trend(df[close], df[volume], fillna=fillna, is_update=is_update, update_number=update_number)
-    df['volume_nvi'] = negative_volume_index(df[close], df[volume], fillna=fillna, is_update=is_update, update_number=update_number)
-    return df
+    columns = dict(high=high, low=low, close=close, volume=volume)
+    return _add_features(df, VOLUME_FEATURES, columns, fillna=fillna, is_update=is_update, update_number=update_number)
 
 
 def add_volatility_ta(df, high, low, close, fillna=True, is_update=False, update_number=1):
     """Add volatility technical analysis features to dataframe.
     Args:
-        df (pandas.core.frame.DataFrame): Dataframe base.
+        df (pandas.core.frame.DataFrame or FeatureBuffer): Dataframe base.
         high (str): Name of 'high' column.
         low (str): Name of 'low' column.
         close (str): Name of 'close' column.
         fillna(bool): if True, fill nan values.
+        is_update(bool): if True, keep the features already in `df` and only fill its
+            last `update_number` rows in place.
+        update_number(int): number of newly appended rows, unused with a FeatureBuffer.
     Returns:
         pandas.core.frame.DataFrame: Dataframe with new features.
     """
-    df['volatility_atr'] = average_true_range(df[high], df[low], df[close],
-                                                n=14, fillna=fillna, is_update=is_update, update_number=update_number)
-
-    df['volatility_bbh'] = bollinger_hband(df[close], n=20, ndev=2, fillna=fillna, is_update=is_update, update_number=update_number)
-    df['volatility_bbl'] = bollinger_lband(df[close], n=20, ndev=2, fillna=fillna, is_update=is_update, update_number=update_number)
-    df['volatility_bbm'] = bollinger_mavg(df[close], n=20, fillna=fillna, is_update=is_update, update_number=update_number)
-    df['volatility_bbhi'] = bollinger_hband_indicator(df[close], n=20, ndev=2,
-                                                    fillna=fillna, is_update=is_update, update_number=update_number)
-    df['volatility_bbli'] = bollinger_lband_indicator(df[close], n=20, ndev=2,
-                                                    fillna=fillna, is_update=is_update, update_number=update_number)
-
-    df['volatility_kcc'] = keltner_channel_central(df[high], df[low], df[close],
-                                                    n=10, fillna=fillna, is_update=is_update, update_number=update_number)
-    df['volatility_kch'] = keltner_channel_hband(df[high], df[low], df[close],
-                                                    n=10, fillna=fillna, is_update=is_update, update_number=update_number)
-    df['volatility_kcl'] = keltner_channel_lband(df[high], df[low], df[close],
-                                                    n=10, fillna=fillna, is_update=is_update, update_number=update_number)
-    df['volatility_kchi'] = keltner_channel_hband_indicator(df[high], df[low],
-                                                df[close], n=10, fillna=fillna, is_update=is_update, update_number=update_number)
-    df['volatility_kcli'] = keltner_channel_lband_indicator(df[high], df[low],
-                                                df[close], n=10, fillna=fillna, is_update=is_update, update_number=update_number)
-
-    df['volatility_dch'] = donchian_channel_hband(df[close], n=20, fillna=fillna, is_update=is_update, update_number=update_number)
-    df['volatility_dcl'] = donchian_channel_lband(df[close], n=20, fillna=fillna, is_update=is_update, update_number=update_number)
-    df['volatility_dchi'] = donchian_channel_hband_indicator(df[close], n=20,
-                                                            fillna=fillna, is_update=is_update, update_number=update_number)
-    df['volatility_dcli'] = donchian_channel_lband_indicator(df[close], n=20,
-                                                            fillna=fillna, is_update=is_update, update_number=update_number)
-
-    return df
+    columns = dict(high=high, low=low, close=close)
+    return _add_features(df, VOLATILITY_FEATURES, columns, fillna=fillna, is_update=is_update, update_number=update_number)
 
 
 def add_trend_ta(df, high, low, close, fillna=True, is_update=False, update_number=1):
     """Add trend technical analysis features to dataframe.
     Args:
-        df (pandas.core.frame.DataFrame): Dataframe base.
+        df (pandas.core.frame.DataFrame or FeatureBuffer): Dataframe base.
         high (str): Name of 'high' column.
         low (str): Name of 'low' column.
         close (str): Name of 'close' column.
         fillna(bool): if True, fill nan values.
+        is_update(bool): if True, keep the features already in `df` and only fill its
+            last `update_number` rows in place.
+        update_number(int): number of newly appended rows, unused with a FeatureBuffer.
     Returns:
         pandas.core.frame.DataFrame: Dataframe with new features.
     """
-    df['trend_macd'] = macd(df[close], n_fast=12, n_slow=26, fillna=fillna, is_update=is_update, update_number=update_number)
-    df['trend_macd_signal'] = macd_signal(df[close], n_fast=12, n_slow=26, n_sign=9,
-                                    fillna=fillna, is_update=is_update, update_number=update_number)
-    df['trend_macd_diff'] = macd_diff(df[close], n_fast=12, n_slow=26, n_sign=9,
-                                    fillna=fillna, is_update=is_update, update_number=update_number)
-    df['trend_ema_indicator'] = ema_indicator(df[close], n=12, fillna=fillna, is_update=is_update, update_number=update_number)
-    df['trend_adx'] = adx(df[high], df[low], df[close], n=14, fillna=fillna, is_update=is_update, update_number=update_number)
-    df['trend_adx_pos'] = adx_pos(df[high], df[low], df[close], n=14, fillna=fillna, is_update=is_update, update_number=update_number)
-    df['trend_adx_neg'] = adx_neg(df[high], df[low], df[close], n=14, fillna=fillna, is_update=is_update, update_number=update_number)
-    df['trend_adx_ind'] = adx_indicator(df[high], df[low], df[close], n=14,
-                                    fillna=fillna, is_update=is_update, update_number=update_number)
-    df['trend_vortex_ind_pos'] = vortex_indicator_pos(df[high], df[low], df[close], n=14,
-                                    fillna=fillna, is_update=is_update, update_number=update_number)
-    df['trend_vortex_ind_neg'] = vortex_indicator_neg(df[high], df[low], df[close], n=14,
-                                    fillna=fillna, is_update=is_update, update_number=update_number)
-    df['trend_vortex_diff'] = abs(df['trend_vortex_ind_pos'] - df['trend_vortex_ind_neg'])
-    df['trend_trix'] = trix(df[close], n=15, fillna=fillna, is_update=is_update, update_number=update_number)
-    df['trend_mass_index'] = mass_index(df[high], df[low], n=9, n2=25, fillna=fillna, is_update=is_update, update_number=update_number)
-    df['trend_cci'] = cci(df[high], df[low], df[close], n=20, c=0.015,
-                                    fillna=fillna, is_update=is_update, update_number=update_number)
-    df['trend_dpo'] = dpo(df[close], n=20, fillna=fillna, is_update=is_update, update_number=update_number)
-    df['trend_kst'] = kst(df[close], r1=10, r2=15, r3=20, r4=30, n1=10,
-                            n2=10, n3=10, n4=15, fillna=fillna, is_update=is_update, update_number=update_number)
-    df['trend_kst_sig'] = kst_sig(df[close], r1=10, r2=15, r3=20, r4=30, n1=10,
-                            n2=10, n3=10, n4=15, nsig=9, fillna=fillna, is_update=is_update, update_number=update_number)
-    df['trend_kst_diff'] = df['trend_kst'] - df['trend_kst_sig']
-    df['trend_ichimoku_a'] = ichimoku_a(df[high], df[low], n1=9, n2=26, fillna=fillna, is_update=is_update, update_number=update_number)
-    df['trend_ichimoku_b'] = ichimoku_b(df[high], df[low], n2=26, n3=52, fillna=fillna, is_update=is_update, update_number=update_number)
-    df['trend_aroon_up'] = aroon_up(df[close], n=25, fillna=fillna, is_update=is_update, update_number=update_number)
-    df['trend_aroon_down'] = aroon_down(df[close], n=25, fillna=fillna, is_update=is_update, update_number=update_number)
-    return df
+    columns = dict(high=high, low=low, close=close)
+    return _add_features(df, TREND_FEATURES, columns, fillna=fillna, is_update=is_update, update_number=update_number)
 
 
 def add_momentum_ta(df, high, low, close, volume, fillna=True, is_update=False, update_number=1):
     """Add trend technical analysis features to dataframe.
     Args:
-        df (pandas.core.frame.DataFrame): Dataframe base.
+        df (pandas.core.frame.DataFrame or FeatureBuffer): Dataframe base.
         high (str): Name of 'high' column.
         low (str): Name of 'low' column.
         close (str): Name of 'close' column.
         fillna(bool): if True, fill nan values.
+        is_update(bool): if True, keep the features already in `df` and only fill its
+            last `update_number` rows in place.
+        update_number(int): number of newly appended rows, unused with a FeatureBuffer.
     Returns:
         pandas.core.frame.DataFrame: Dataframe with new features.
     """
-    df['momentum_rsi'] = rsi(df[close], n=14, fillna=fillna, is_update=is_update, update_number=update_number)
-    df['momentum_mfi'] = money_flow_index(df[high], df[low], df[close],
-                                        df[volume], n=14, fillna=fillna, is_update=is_update, update_number=update_number)
-    df['momentum_tsi'] = tsi(df[close], r=25, s=13, fillna=fillna, is_update=is_update, update_number=update_number)
-    df['momentum_uo'] = uo(df[high], df[low], df[close], fillna=fillna, is_update=is_update, update_number=update_number)
-    df['momentum_stoch'] = stoch_k(df[high], df[low], df[close], fillna=fillna, is_update=is_update, update_number=update_number)
-    df['momentum_stoch_signal'] = stoch_k_d(df[high], df[low], df[close], fillna=fillna, is_update=is_update, update_number=update_number)
-    df['momentum_wr'] = wr(df[high], df[low], df[close], fillna=fillna, is_update=is_update, update_number=update_number)
-    df['momentum_ao'] = ao(df[high], df[low], fillna=fillna, is_update=is_update, update_number=update_number)
-    
-    """To do
-        momentum.py의 stochastic_rsi와 stochastic_rsi_k_d NaN 값으로 반환되는 문제 해결하기
-    """
-    #df['momentum_stochastic_rsi'] = stochastic_rsi(df[close], rsi_n=14, win_size=3, fillna=fillna, is_update=is_update, update_number=update_number)
-    #df['momentum_so_rsi_k'], df['momentum_so_rsi_d']  = stochastic_rsi_k_d(df[close], rsi_n=14, win_size_k=3, win_size_d=3, fillna=fillna, is_update=is_update, update_number=update_number)
-    return df
+    columns = dict(high=high, low=low, close=close, volume=volume)
+    return _add_features(df, MOMENTUM_FEATURES, columns, fillna=fillna, is_update=is_update, update_number=update_number)
 
 
 def add_others_ta(df, close, fillna=True, is_update=False, update_number=1):
     """Add others analysis features to dataframe.
     Args:
-        df (pandas.core.frame.DataFrame): Dataframe base.
+        df (pandas.core.frame.DataFrame or FeatureBuffer): Dataframe base.
         close (str): Name of 'close' column.
         fillna(bool): if True, fill nan values.
+        is_update(bool): if True, keep the features already in `df` and only fill its
+            last `update_number` rows in place.
+        update_number(int): number of newly appended rows, unused with a FeatureBuffer.
     Returns:
         pandas.core.frame.DataFrame: Dataframe with new features.
     """
-    df['others_dr'] = daily_return(df[close], fillna=fillna, is_update=is_update, update_number=update_number)
-    df['others_cr'] = cumulative_return(df[close], fillna=fillna, is_update=is_update, update_number=update_number)
+    columns = dict(close=close)
+    return _add_features(df, OTHERS_FEATURES, columns, fillna=fillna, is_update=is_update, update_number=update_number)
+
+
+_ROWS = {row[0]: row for _, features in FAMILIES for row in features}
+_ORDER = {name: i for i, name in enumerate(_ROWS)}
+
+
+def _feature_groups():
+    """Features split into groups computable independently: a feature reading
+    other features is grouped with them.
+    """
+    groups = []
+    for name, row in _ROWS.items():
+        deps = [g for g in groups if any(i in g for i in row[2])]
+        groups = [g for g in groups if g not in deps] + [sorted(sum(deps, []) + [name], key=_ORDER.get)]
+    return groups
+
+
+def _add_group(df, names, columns, fillna, is_update, update_number):
+    _add_features(df, [_ROWS[name] for name in names], columns, fillna=fillna, is_update=is_update,
+                  update_number=update_number)
+    return {name: df[name] for name in names}
+
+
+def _add_families(df, columns, fillna, is_update, update_number, n_jobs, backend):
+    """Compute the features concurrently.
+
+    Each group of dependent features runs on its own copy of the candles and of
+    its columns. The results are written back in the order of FAMILIES, so the
+    output does not depend on the scheduling.
+    """
+    if backend == 'processes':
+        executor = ProcessPoolExecutor(max_workers=n_jobs)
+    elif backend == 'threads':
+        executor = ThreadPoolExecutor(max_workers=n_jobs)
+    else:
+        raise ValueError(f'backend must be threads or processes, not {backend}')
+
+    buffered = isinstance(df, FeatureBuffer)
+    candles = [c for c in dict.fromkeys(columns.values()) if c in df]
+    with executor:
+        futures = []
+        for names in _feature_groups():
+            selected = candles + [name for name in names if name in df and name not in candles]
+            if buffered:
+                part = df.select(selected)
+            else:
+                # pandas indexes are not safe to share between threads
+                part = df[selected].copy()
+                part.index = df.index.copy()
+            futures.append(executor.submit(_add_group, part, names, columns, fillna, is_update, update_number))
+        values = {}
+        for future in futures:
+            values.update(future.result())
+
+    for name in _ROWS:
+        df[name] = values[name].values
     return df
 
 
-def add_all_ta_features(df, open, high, low, close, volume, fillna=True, is_update=False, update_number=1):
+def add_all_ta_features(df, open, high, low, close, volume, fillna=True, is_update=False, update_number=1,
+                        n_jobs=1, backend='threads'):
     """Add all technical analysis features to dataframe.
     Args:
-        df (pandas.core.frame.DataFrame): Dataframe base.
+        df (pandas.core.frame.DataFrame or FeatureBuffer): Dataframe base.
         open (str): Name of 'open' column.
         high (str): Name of 'high' column.
         low (str): Name of 'low' column.
         close (str): Name of 'close' column.
         volume (str): Name of 'volume' column.
         fillna(bool): if True, fill nan values.
+        is_update(bool): if True, keep the features already in `df` and only fill its
+            last `update_number` rows in place.
+        update_number(int): number of newly appended rows, unused with a FeatureBuffer.
+        n_jobs(int): number of workers computing independent features concurrently.
+            The result does not depend on it.
+        backend(str): 'threads' or 'processes'. Threads help the vectorized indicators,
+            processes also the python loops of adx, vortex, aroon, uo and atr, at the
+            cost of copying the candles to the workers.
     Returns:
         pandas.core.frame.DataFrame: Dataframe with new features.
     """
+    if n_jobs is not None and n_jobs > 1:
+        columns = dict(open=open, high=high, low=low, close=close, volume=volume)
+        return _add_families(df, columns, fillna, is_update, update_number, n_jobs, backend)
+
     df = add_volume_ta(df, high, low, close, volume, fillna=fillna, is_update=is_update, update_number=update_number)
     df = add_volatility_ta(df, high, low, close, fillna=fillna, is_update=is_update, update_number=update_number)
     df = add_trend_ta(df, high, low, close, fillna=fillna, is_update=is_update, update_number=update_number)
     df = add_momentum_ta(df, high, low, close, volume, fillna=fillna, is_update=is_update, update_number=update_number)
     df = add_others_ta(df, close, fillna=fillna, is_update=is_update, update_number=update_number)
-    return df
\ No newline at end of file
+    return df
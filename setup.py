@@ -17,4 +17,8 @@ setup(name='coza',
           'plotly==3.4.2',
           'fake_useragent==0.1.11',
       ],
+      extras_require={
+          'numba': ['numba'],
+          'websocket': ['websocket-client'],
+      },
       zip_safe=False)
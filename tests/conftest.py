@@ -0,0 +1,152 @@
+import base64
+import hashlib
+import json
+import queue
+import socket
+import struct
+import threading
+import time
+
+import pytest
+
+
+WEBSOCKET_GUID = '258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+
+
+class FakeFeedServer(object):
+    """Local websocket server standing for the market data feed of an exchange.
+
+    It accepts any number of clients, records what they send, e.g. their
+    subscriptions, and pushes messages to all of them as binary frames, as
+    Upbit does.
+    """
+    def __init__(self):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind(('127.0.0.1', 0))
+        self.sock.listen(8)
+        self.url = 'ws://127.0.0.1:{}/websocket/v1'.format(self.sock.getsockname()[1])
+        self.clients = list()
+        self.received = queue.Queue()
+        self.connections = 0
+        self._lock = threading.Lock()
+        self._closed = False
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while not self._closed:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            try:
+                self._handshake(conn)
+            except OSError:
+                conn.close()
+                continue
+            with self._lock:
+                self.clients.append(conn)
+                self.connections += 1
+            threading.Thread(target=self._read, args=(conn,), daemon=True).start()
+
+    @staticmethod
+    def _handshake(conn):
+        request = b''
+        while b'\r\n\r\n' not in request:
+            chunk = conn.recv(4096)
+            if not chunk:
+                raise OSError('closed during the handshake')
+            request += chunk
+        headers = dict(line.split(': ', 1) for line in request.decode().split('\r\n')[1:] if ': ' in line)
+        key = {k.lower(): v for k, v in headers.items()}['sec-websocket-key']
+        accept = base64.b64encode(hashlib.sha1((key + WEBSOCKET_GUID).encode()).digest()).decode()
+        conn.sendall(('HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n'
+                      'Sec-WebSocket-Accept: {}\r\n\r\n'.format(accept)).encode())
+
+    @staticmethod
+    def _recv(conn, n):
+        data = b''
+        while len(data) < n:
+            chunk = conn.recv(n - len(data))
+            if not chunk:
+                raise OSError('closed')
+            data += chunk
+        return data
+
+    def _read(self, conn):
+        try:
+            while True:
+                first, second = self._recv(conn, 2)
+                length = second & 0x7f
+                if length == 126:
+                    length = struct.unpack('>H', self._recv(conn, 2))[0]
+                elif length == 127:
+                    length = struct.unpack('>Q', self._recv(conn, 8))[0]
+                mask = self._recv(conn, 4) if second & 0x80 else b'\0\0\0\0'
+                payload = bytes(b ^ mask[i % 4] for i, b in enumerate(self._recv(conn, length)))
+                opcode = first & 0x0f
+                if opcode == 0x8:
+                    break
+                if opcode in (0x1, 0x2):
+                    self.received.put(json.loads(payload.decode()))
+        except OSError:
+            pass
+        self._forget(conn)
+
+    def _forget(self, conn):
+        with self._lock:
+            if conn in self.clients:
+                self.clients.remove(conn)
+        try:
+            conn.close()
+        except OSError:
+            pass
+
+    @staticmethod
+    def _frame(payload, opcode=0x2):
+        header = bytes([0x80 | opcode])
+        if len(payload) < 126:
+            header += bytes([len(payload)])
+        elif len(payload) < 1 << 16:
+            header += bytes([126]) + struct.pack('>H', len(payload))
+        else:
+            header += bytes([127]) + struct.pack('>Q', len(payload))
+        return header + payload
+
+    def send(self, message):
+        """Push a message, a dict sent as JSON, to every client."""
+        frame = self._frame(json.dumps(message).encode())
+        with self._lock:
+            clients = list(self.clients)
+        for conn in clients:
+            conn.sendall(frame)
+
+    def drop(self):
+        """Close every connection without a close frame, as a network failure would."""
+        with self._lock:
+            clients, self.clients = self.clients, list()
+        for conn in clients:
+            conn.shutdown(socket.SHUT_RDWR)
+            conn.close()
+
+    def wait_clients(self, connections=1, timeout=5.0):
+        """Wait until `connections` clients connected since the start and one is connected."""
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            with self._lock:
+                if self.connections >= connections and self.clients:
+                    return True
+            time.sleep(0.01)
+        return False
+
+    def close(self):
+        self._closed = True
+        self.drop()
+        self.sock.close()
+
+
+@pytest.fixture
+def feed_server():
+    server = FakeFeedServer()
+    yield server
+    server.close()
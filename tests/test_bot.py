@@ -0,0 +1,60 @@
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+
+import pytest
+
+pytest.importorskip('apscheduler')
+
+from coza.bot import BotContext
+
+
+class Exchange(object):
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.calls = list()
+        self.refreshing = threading.Event()
+        self.is_update, self.updated_len, self.data = dict(), dict(), dict()
+
+    def update_balance(self):
+        self.refreshing.set()
+        time.sleep(0.1)
+        self.calls.append('update_balance')
+
+    def calc_estimated(self):
+        self.calls.append('calc_estimated')
+        return dict(estimated=1000000, currency_ratio=0.0)
+
+    def update_dataframe(self):
+        assert self.refreshing.wait(1)
+        self.calls.append('update_dataframe')
+        if self.fail:
+            raise RuntimeError('candles')
+
+    def send_orders(self):
+        self.calls.append('send_orders')
+
+
+def bot(exchange):
+    bot = BotContext.__new__(BotContext)
+    bot.exchange, bot.exchanges = 'upbit', {'upbit': exchange}
+    bot.running_mode, bot.running_stat, bot.context = 'LOCAL', 't', dict(trade_info=dict())
+    bot.pipeline, bot.reporting = ThreadPoolExecutor(max_workers=2), None
+    bot.run_strategy = lambda bot, **kwargs: exchange.calls.append('run_strategy')
+    bot.make_orders = lambda bot, **kwargs: exchange.calls.append('make_orders')
+    return bot
+
+
+def test_strategy_runs_after_the_balance_refresh():
+    exchange = Exchange()
+    bot(exchange)._trade()
+    # candles are fetched during the refresh, the strategy waits for both
+    assert exchange.calls == ['update_dataframe', 'update_balance', 'calc_estimated', 'run_strategy',
+                              'make_orders', 'send_orders']
+
+
+def test_failed_candle_update_waits_for_the_balance_refresh():
+    exchange = Exchange(fail=True)
+    with pytest.raises(RuntimeError):
+        bot(exchange)._trade()
+    assert exchange.calls == ['update_dataframe', 'update_balance', 'calc_estimated']
@@ -0,0 +1,44 @@
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from coza.exchange import UpbitTrade
+from coza.exchange.base_exchange import TradeBase
+from coza.utils import KST
+
+
+def candles(start, n):
+    index = pd.date_range(start, periods=n, freq='min', tz=KST, name='datetime')
+    close = np.arange(n, dtype=float) + 1000
+    return pd.DataFrame(dict(timestamp=index.asi8 // 10 ** 9, open=close, high=close, low=close, close=close,
+                             volume=np.ones(n)), index=index)
+
+
+@pytest.fixture
+def trade():
+    trade = UpbitTrade.__new__(UpbitTrade)
+    TradeBase.__init__(trade, name='upbit', init_budget=1000000, currency_list=['btc'], interval_list=[1],
+                       use_data='LIVE', data_path=None, tz=KST, r_off=4, fiat='KRW')
+    trade.data = {'btc_1': candles('2018-06-26 09:00', 10)}
+    trade.kept_rows = {'btc_1': 8}
+    return trade
+
+
+def test_apply_candles_keeps_max_rows(trade):
+    trade.data['btc_1']['feature'] = trade.data['btc_1']['close'] * 2
+    new = candles(trade.data['btc_1'].index[-1] + timedelta(minutes=1), 3)
+
+    trade._apply_candles({'btc_1': new}, new.index[-1])
+    df = trade.data['btc_1']
+    assert len(df) == 8 and trade.updated_len['btc_1'] == 3
+    assert df.index[-1] == new.index[-1] and df.index.is_monotonic_increasing
+    assert df['feature'].iloc[:5].tolist() == [2 * c for c in range(1005, 1010)]
+    assert df['feature'].iloc[5:].isnull().all()
+
+
+def test_apply_candles_longer_than_max_rows(trade):
+    new = candles(trade.data['btc_1'].index[-1] + timedelta(minutes=1), 12)
+    trade._apply_candles({'btc_1': new}, new.index[-1])
+    assert trade.data['btc_1'].index.equals(new.index[-8:])
@@ -0,0 +1,169 @@
+from datetime import datetime
+import time
+
+import pandas as pd
+import pytest
+
+pytest.importorskip('websocket')
+
+from coza.exchange import feed as feed_module
+from coza.exchange import UpbitTrade
+from coza.exchange import base_exchange
+from coza.utils import KST
+
+
+# a minute boundary, the feed connects in the middle of the minute before
+MINUTE = 1530000000 // 3600 * 3600
+
+
+class Clock(object):
+    def __init__(self, t):
+        self.t = t
+
+    def __call__(self):
+        return self.t
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def trade(price, volume, timestamp, code='KRW-BTC'):
+    return dict(type='trade', code=code, trade_price=price, trade_volume=volume, trade_timestamp=int(timestamp * 1000))
+
+
+def orderbook(bid, ask, code='KRW-BTC'):
+    return dict(type='orderbook', code=code, timestamp=0, orderbook_units=[
+        dict(ask_price=ask, bid_price=bid, ask_size=1.0, bid_size=2.0),
+        dict(ask_price=ask + 1000, bid_price=bid - 1000, ask_size=3.0, bid_size=4.0)])
+
+
+def date(timestamp):
+    return datetime.fromtimestamp(timestamp).astimezone(KST)
+
+
+@pytest.fixture
+def clock():
+    return Clock(MINUTE - 30)
+
+
+@pytest.fixture
+def feed(feed_server, clock):
+    feed = feed_module.UpbitFeed({'btc': 'KRW-BTC'}, grace=0.3, reconnect=0.05, url=feed_server.url,
+                                 clock=clock).start()
+    assert feed_server.wait_clients()
+    assert wait_for(lambda: feed.connected)
+    yield feed
+    feed.stop()
+
+
+def test_subscribes_to_trades_and_orderbooks(feed, feed_server):
+    subscription = feed_server.received.get(timeout=5)
+    assert {'type': 'trade', 'codes': ['KRW-BTC']} in subscription
+    assert {'type': 'orderbook', 'codes': ['KRW-BTC']} in subscription
+
+
+def test_bar_rollover(feed, feed_server, clock):
+    assert feed.covered_from == MINUTE
+    for message in (trade(9000000, 1.0, MINUTE - 10), trade(9001000, 0.5, MINUTE + 1),
+                    trade(9005000, 0.25, MINUTE + 30), trade(8999000, 1.0, MINUTE + 59),
+                    trade(9002000, 2.0, MINUTE + 61)):
+        feed_server.send(message)
+    assert wait_for(lambda: MINUTE + 60 in feed.builders['btc'].minutes)
+
+    # minute MINUTE closed, MINUTE + 60 still open
+    clock.t = MINUTE + 61
+    df = feed.candles('btc', 1, date(MINUTE - 60))
+    assert df[['timestamp', 'open', 'high', 'low', 'close', 'volume']].values.tolist() == [
+        [MINUTE, 9001000, 9005000, 8999000, 8999000, 1.75]]
+
+    # without trades, a closed minute repeats the last price
+    clock.t = MINUTE + 181
+    df = feed.candles('btc', 1, date(MINUTE))
+    assert df['timestamp'].tolist() == [MINUTE + 60, MINUTE + 120]
+    assert df.iloc[1][['open', 'close', 'volume']].tolist() == [9002000, 9002000, 0.0]
+
+    # candles preceding the connection are not built
+    assert feed.candles('btc', 1, date(MINUTE - 120)) is None
+
+
+def test_candles_of_longer_intervals():
+    builder = feed_module.CandleBuilder()
+    for i, price in enumerate([10, 12, 9, 11, 13, 8]):
+        builder.add(price, 1.0, MINUTE + 60 * i + 5, covered_from=MINUTE)
+    rows = builder.candles(MINUTE, 3, MINUTE + 360)
+    assert rows == [(MINUTE, 10, 12, 9, 9, 3.0), (MINUTE + 180, 11, 13, 8, 8, 3.0)]
+
+
+def test_orderbook_snapshots(feed, feed_server):
+    feed_server.send(orderbook(9000000, 9001000))
+    assert wait_for(lambda: feed.orderbook('btc') is not None)
+    feed_server.send(orderbook(9002000, 9003000))
+    assert wait_for(lambda: feed.orderbook('btc')['bid_price'][0] == 9002000)
+
+    book = feed.orderbook('btc')
+    assert book['ask_price'].tolist() == [9003000, 9004000]
+    assert book['bid_quantity'].tolist() == [2.0, 4.0]
+
+
+def test_reconnects_after_a_drop(feed, feed_server, clock):
+    feed_server.send(orderbook(9000000, 9001000))
+    assert wait_for(lambda: feed.orderbook('btc') is not None)
+
+    clock.t = MINUTE + 90
+    feed_server.drop()
+    assert wait_for(lambda: not feed.connected)
+    assert feed.orderbook('btc') is None
+
+    assert feed_server.wait_clients(connections=2)
+    assert wait_for(lambda: feed.connected)
+    # the minutes of the gap are not covered
+    assert feed.covered_from == MINUTE + 120
+
+
+@pytest.fixture
+def trade_(feed):
+    trade_ = UpbitTrade.__new__(UpbitTrade)
+    base_exchange.TradeBase.__init__(trade_, name='upbit', init_budget=1000000, currency_list=['btc'],
+                                     interval_list=[1], use_data='LIVE', data_path=None, tz=KST, r_off=4, fiat='KRW')
+    trade_.using_api = 'EXCHANGE'
+    trade_.market_table = {'btc': {'id': 'KRW-BTC'}}
+    trade_.feed = feed
+    return trade_
+
+
+def test_falls_back_to_rest_on_disconnect(trade_, feed, feed_server, clock, monkeypatch):
+    requested = list()
+
+    def get_df(exchange, currency, fiat, interval, from_date):
+        requested.append((currency, interval, from_date))
+        return pd.DataFrame(dict(timestamp=[MINUTE], open=[1.0], high=[1.0], low=[1.0], close=[1.0], volume=[1.0]))
+    monkeypatch.setattr(base_exchange.CandleApi, 'get_df', staticmethod(get_df))
+
+    class API(object):
+        def get_orderbook(self, market_id):
+            requested.append(market_id)
+            return dict(orderbook=pd.DataFrame(dict(bid_price=[1.0], ask_price=[2.0])))
+    trade_.api = API()
+
+    feed_server.send(trade(9001000, 1.0, MINUTE + 1))
+    feed_server.send(orderbook(9000000, 9001000))
+    assert wait_for(lambda: feed.orderbook('btc') is not None and MINUTE in feed.builders['btc'].minutes)
+
+    clock.t = MINUTE + 61
+    assert trade_._fetch_candles('btc_1', date(MINUTE - 60))['close'].tolist() == [9001000]
+    assert trade_.get_orderbook(currency='btc')['bid_price'][0] == 9000000
+    assert requested == []
+
+    # the connection drops and the feed does not reconnect during the test
+    feed.reconnect = 60
+    feed_server.drop()
+    assert wait_for(lambda: not feed.connected)
+    assert trade_._fetch_candles('btc_1', date(MINUTE - 60))['close'].tolist() == [1.0]
+    assert trade_.get_orderbook(currency='btc')['bid_price'][0] == 1.0
+    assert requested == [('btc', 1, date(MINUTE - 60)), 'KRW-BTC']
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from coza.ta import kernels, momentum, trend, volume
+
+
+BACKENDS = [None, 'numpy'] + (['numba'] if kernels.numba is not None else [])
+
+FEATURES = [
+    ('nvi', lambda df: volume.negative_volume_index(df['close'], df['volume'], fillna=False)),
+    ('nvi_fillna', lambda df: volume.negative_volume_index(df['close'], df['volume'])),
+    ('obv', lambda df: volume.on_balance_volume(df['close'], df['volume'], fillna=False)),
+    ('tsi', lambda df: momentum.tsi(df['close'], fillna=False)),
+    ('stoch_rsi', lambda df: momentum.stochastic_rsi(df['close'], fillna=False)),
+    ('stoch_rsi_k_d', lambda df: momentum.stochastic_rsi_k_d(df['close'], fillna=False)),
+    ('kst', lambda df: trend.kst(df['close'], fillna=False)),
+    ('kst_sig', lambda df: trend.kst_sig(df['close'], fillna=False)),
+    ('ichimoku_a', lambda df: trend.ichimoku_a(df['high'], df['low'], fillna=False)),
+    ('ichimoku_b', lambda df: trend.ichimoku_b(df['high'], df['low'], fillna=False)),
+]
+
+
+@pytest.fixture
+def candles():
+    rng = np.random.RandomState(1)
+    close = np.round(100 + rng.randn(400).cumsum(), 1)
+    close[10:13] = close[9]                       # ties in close
+    vol = np.round(rng.rand(400) * 10, 0)         # ties in volume
+    df = pd.DataFrame(dict(high=close + 1, low=close - 1, close=close, volume=vol),
+                      index=pd.date_range('2018-01-01', periods=len(close), freq='min'))
+    df.iloc[[50, 51, 200], df.columns.get_loc('close')] = np.nan
+    df.iloc[120, df.columns.get_loc('volume')] = np.nan
+    df.iloc[300, df.columns.get_loc('high')] = np.nan
+    return df
+
+
+@pytest.fixture
+def backend():
+    default = kernels.BACKEND
+    yield
+    kernels.BACKEND = default
+
+
+def _arrays(value):
+    return [np.asarray(v, dtype=float) for v in (value if isinstance(value, tuple) else (value,))]
+
+
+@pytest.mark.parametrize('name, feature', FEATURES, ids=[f[0] for f in FEATURES])
+@pytest.mark.parametrize('name_backend', BACKENDS[1:])
+def test_backends_match_pandas(candles, backend, name, feature, name_backend):
+    kernels.BACKEND = None
+    expected = _arrays(feature(candles))
+    kernels.BACKEND = name_backend
+    actual = _arrays(feature(candles))
+
+    for a, e in zip(actual, expected):
+        np.testing.assert_array_equal(np.isnan(a), np.isnan(e))
+        np.testing.assert_allclose(a, e, rtol=1e-7, atol=1e-7, equal_nan=True)
+
+
+def test_nvi_recovers_after_missing_close(candles, backend):
+    for name in BACKENDS:
+        kernels.BACKEND = name
+        nvi = volume.negative_volume_index(candles['close'], candles['volume'], fillna=False)
+        assert not nvi.iloc[60:].isnull().any()
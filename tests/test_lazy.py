@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from coza.ta import momentum
+from coza.ta.lazy import LazyFeatures
+
+
+@pytest.fixture
+def candles():
+    rng = np.random.RandomState(0)
+    close = 100 + rng.randn(300).cumsum()
+    index = pd.date_range('2018-01-01', periods=len(close), freq='min', tz='Asia/Seoul')
+    return pd.DataFrame(dict(open=close, high=close + 1, low=close - 1, close=close, volume=rng.rand(len(close))),
+                        index=index)
+
+
+def test_stochastic_rsi_after_update(candles):
+    features = LazyFeatures(candles.iloc[:-5])
+    features.stochastic_rsi()
+    features.update(candles)
+
+    value = features.stochastic_rsi()
+    expected = momentum.stochastic_rsi(candles['close'])
+    assert value.index.equals(candles.index)
+    np.testing.assert_allclose(value.values, expected.values, rtol=1e-9, atol=1e-9)
+
+
+def test_stochastic_rsi_k_d_after_update(candles):
+    features = LazyFeatures(candles.iloc[:-5])
+    features.stochastic_rsi_k_d()
+    features.update(candles)
+
+    k, d = features.stochastic_rsi_k_d()
+    expected_k, expected_d = momentum.stochastic_rsi_k_d(candles['close'])
+    assert k.index.equals(candles.index) and d.index.equals(candles.index)
+    np.testing.assert_allclose(k.values, expected_k.values, rtol=1e-9, atol=1e-9)
+    np.testing.assert_allclose(d.values, expected_d.values, rtol=1e-9, atol=1e-9)
+
+
+def test_column_after_update(candles):
+    features = LazyFeatures(candles.iloc[:-5])
+    features['momentum_rsi']
+    features.update(candles)
+
+    value = features['momentum_rsi']
+    np.testing.assert_allclose(value.values, momentum.rsi(candles['close']).values, rtol=1e-9, atol=1e-9)
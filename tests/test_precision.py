@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from coza.ta import utils
+from coza.ta.wrapper import add_all_ta_features
+
+
+# set_precision: float32 features stay within these ratios of the largest
+# absolute float64 value of their column
+TOLERANCE = 1e-4
+LOOSE_TOLERANCE = 2e-3
+LOOSE = ('volume_adi', 'volume_cmf', 'trend_trix', 'trend_macd_diff')
+
+CANDLES = ('open', 'high', 'low', 'close', 'volume')
+
+
+@pytest.fixture
+def candles():
+    # KRW prices move by ticks of 1000 around 9,000,000, which float32 represents exactly
+    rng = np.random.RandomState(2)
+    close = np.round(9e3 * np.exp(np.cumsum(rng.randn(1000) * 1e-3))) * 1e3
+    open = np.concatenate(([close[0]], close[:-1]))
+    high = np.maximum(open, close) + np.round(rng.rand(1000) * 5) * 1e3
+    low = np.minimum(open, close) - np.round(rng.rand(1000) * 5) * 1e3
+    return pd.DataFrame(dict(open=open, high=high, low=low, close=close, volume=rng.rand(1000) * 20),
+                        index=pd.date_range('2018-01-01', periods=1000, freq='min'))
+
+
+@pytest.fixture
+def precision():
+    default = utils.get_precision()
+    yield utils.set_precision
+    utils.set_precision(None if default is None else default.name)
+
+
+def _features(df):
+    return add_all_ta_features(df.copy(), 'open', 'high', 'low', 'close', 'volume', fillna=True)
+
+
+def test_float32_within_documented_tolerance(candles, precision):
+    precision(None)
+    expected = _features(candles)
+
+    precision('float32')
+    actual = _features(utils.as_precision(candles))
+
+    features = [c for c in expected.columns if c not in CANDLES]
+    assert features
+    for column in features:
+        if expected[column].dtype.kind == 'f':
+            assert actual[column].dtype == np.float32, column
+        e = expected[column].values.astype(np.float64)
+        a = actual[column].values.astype(np.float64)
+        scale = np.nanmax(np.abs(e))
+        if not scale:
+            scale = 1.0
+        tolerance = LOOSE_TOLERANCE if column in LOOSE else TOLERANCE
+        np.testing.assert_array_equal(np.isnan(a), np.isnan(e), err_msg=column)
+        assert np.nanmax(np.abs(a - e)) / scale <= tolerance, column
+
+
+def test_as_precision_keeps_float64_by_default(candles, precision):
+    precision(None)
+    assert utils.as_precision(candles)['close'].dtype == np.float64
+    precision('float32')
+    assert utils.as_precision(candles)['close'].dtype == np.float32
+    assert utils.as_precision(candles)['volume'].dtype == np.float32
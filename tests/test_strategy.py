@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from coza.ta.strategy import DEAD_CROSS, GOLDEN_CROSS, MovingAverageCross, moving_average_cross
+
+
+def close(n, nans=()):
+    rng = np.random.RandomState(0)
+    close = pd.Series(1000000 + rng.randn(n).cumsum() * 1000)
+    close.iloc[list(nans)] = np.nan
+    return close
+
+
+def events(cross, close):
+    golden, dead = moving_average_cross(close, cross.short_win_size, cross.long_win_size)
+    expected = [GOLDEN_CROSS if g else DEAD_CROSS if d else None for g, d in zip(golden, dead)]
+    return cross.extend(close), expected
+
+
+@pytest.mark.parametrize('nans', [(), (500,), (500, 501, 1200), (0, 1999)])
+def test_stream_matches_batch(nans):
+    streamed, expected = events(MovingAverageCross(5, 20), close(2000, nans))
+    assert streamed == expected
+    assert GOLDEN_CROSS in streamed[1300:]
+
+
+def test_sums_resync():
+    # a long stream far from zero, the sliding sums would drift without resync
+    cross = MovingAverageCross(3, 7)
+    streamed, expected = events(cross, close(20000, (10000,)))
+    assert streamed == expected
+    window = list(cross.window)
+    assert cross.long_sum == pytest.approx(sum(window[-7:]), rel=1e-12)